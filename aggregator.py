@@ -1,11 +1,10 @@
 import json
-import logging
 import os
+import queue
 import threading
 import time
 
 import eth_abi
-import requests
 import yaml
 from eigensdk.chainio.clients.builder import BuildAllConfig, build_all
 from eigensdk.chainio.utils import nums_to_bytes
@@ -22,14 +21,33 @@ from eth_account import Account
 from flask import Flask, jsonify, request
 from web3 import Web3
 
+from core.abi import load_abi, task_manager_codec
+from core.admission import AdmissionQueue
+from core.head_tracker import HeadTracker
+from core.log import configure_logging, get_logger
+from core.merkle import merkle_layers, merkle_proof, task_response_leaf
+from core.rpc import load_provider, share_provider
+from core.subgraph import SubgraphClient
+from core.task_source import InFlightLimiter, QueueSource, load_task_source
+from core.tracing import load_tracer
+
 TASK_CHALLENGE_WINDOW_BLOCK = 100
 BLOCK_TIME_SECONDS = 12
 AVS_NAME = "incredible-squaring"
 THRESHOLD_PERCENT = 50
+BATCH_GAS_PER_TASK = 60000
+NEW_TASK_GAS_PER_TASK = 50000
+OPERATOR_STAKE_FIELDS = ["id", "operatorId", "stake"]
+OPERATOR_KEY_FIELDS = [
+    "id",
+    "operatorId",
+    "pubkeyG1_X",
+    "pubkeyG1_Y",
+    "pubkeyG2_X",
+    "pubkeyG2_Y",
+]
 
-# change logging level to DEBUG for testing
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 
 
 # Define specific error types
@@ -67,6 +85,38 @@ class SignatureVerificationError(AggregatorError):
         return "400. Signature verification failed"
 
 
+class InvalidBatchError(AggregatorError):
+    """Task response batch is malformed error."""
+
+    def __str__(self):
+        return "400. Invalid task response batch"
+
+
+class TaskAlreadyRespondedError(AggregatorError):
+    """Task threshold has already been met error."""
+
+    def __str__(self):
+        return "400. Task has already been responded"
+
+
+class TaskExpiredError(AggregatorError):
+    """Task response window has passed error."""
+
+    def __str__(self):
+        return "400. Task response window has passed"
+
+
+class AggregatorOverloadedError(AggregatorError):
+    """Too many signatures are waiting for verification error."""
+
+    def __init__(self, retry_after):
+        super().__init__()
+        self.retry_after = retry_after
+
+    def __str__(self):
+        return "503. Aggregator overloaded, retry later"
+
+
 class InternalServerError(AggregatorError):
     """Internal server error."""
 
@@ -77,17 +127,60 @@ class InternalServerError(AggregatorError):
 class Aggregator:
     def __init__(self, config):
         self.config = config
-        self.web3 = Web3(Web3.HTTPProvider(self.config["eth_rpc_url"]))
+        self.log_sample_every = int(self.config.get("log_sample_every", 1))
+        self.tracer = load_tracer(self.config, "aggregator")
+        self.web3 = Web3(load_provider(self.config))
+        self.head_tracker = HeadTracker(
+            self.web3, float(self.config.get("head_poll_interval", 1))
+        )
+        self.admission = AdmissionQueue(
+            workers=int(self.config.get("verify_workers", 4)),
+            max_pending=int(self.config.get("admission_max_pending", 256)),
+        )
+        self.task_source = load_task_source(self.config)
+        self.in_flight = InFlightLimiter(
+            initial=int(self.config.get("task_in_flight_initial", 16)),
+            maximum=int(self.config.get("task_in_flight_max", 1024)),
+        )
         self._load_ecdsa_key()
         self._load_clients()
         self._load_task_manager()
         self.tasks = {}
         self.responses = {}
+        self.batch_responses = {}
+        self.responded_tasks = set()
+        self._ready_responses = []
+        self._ready_lock = threading.Lock()
+        self._pending_numbers = []
+        self._pending_since = None
+        self._pending_cond = threading.Condition()
         self.app = Flask(__name__)
         self.app.add_url_rule(
             "/signature", "signature", self.submit_signature, methods=["POST"]
         )
-        self.subgraph_url = "http://localhost:8000/subgraphs/name/avs-subgraph"
+        self.app.add_url_rule(
+            "/signatures", "signatures", self.submit_signatures, methods=["POST"]
+        )
+        self.app.add_url_rule(
+            "/signature/batch",
+            "batch_signature",
+            self.submit_batch_signature,
+            methods=["POST"],
+        )
+        if isinstance(self.task_source, QueueSource):
+            self.app.add_url_rule(
+                "/tasks", "tasks", self.submit_tasks, methods=["POST"]
+            )
+        self.subgraph = SubgraphClient(
+            self.config.get(
+                "subgraph_url", "http://localhost:8000/subgraphs/name/avs-subgraph"
+            ),
+            page_size=int(self.config.get("subgraph_page_size", 1000)),
+            shards=int(self.config.get("subgraph_shards", 4)),
+            timeout=float(self.config.get("subgraph_timeout", 10)),
+        )
+        self._operator_keys = {}
+        self._operator_keys_lock = threading.Lock()
         self._stop_flag = False
 
     def start(self):
@@ -95,11 +188,24 @@ class Aggregator:
         logger.debug("Starting aggregator.")
         logger.debug("Starting aggregator rpc server.")
 
+        self.head_tracker.start()
+        self.admission.start()
+
         # Start sending new tasks
         task_thread = threading.Thread(target=self.start_sending_new_tasks)
         task_thread.daemon = True
         task_thread.start()
 
+        if self._task_batch_size() > 1:
+            new_tasks_thread = threading.Thread(target=self.start_flushing_new_tasks)
+            new_tasks_thread.daemon = True
+            new_tasks_thread.start()
+
+        if self._response_batching():
+            flush_thread = threading.Thread(target=self.start_flushing_responses)
+            flush_thread.daemon = True
+            flush_thread.start()
+
         # Start the server
         self.start_server()
 
@@ -107,6 +213,11 @@ class Aggregator:
         """Stop the aggregator service."""
         logger.debug("Stopping aggregator.")
         self._stop_flag = True
+        with self._pending_cond:
+            self._pending_cond.notify_all()
+        self.admission.stop()
+        self.head_tracker.stop()
+        self.subgraph.close()
 
     def send_new_task(self, num_to_square):
         """Send a new task to the task manager contract."""
@@ -114,6 +225,7 @@ class Aggregator:
             "Aggregator sending new task", extra={"numberToSquare": num_to_square}
         )
 
+        started = time.time()
         try:
             # Send number to square to the task manager contract
             tx = self.task_manager.functions.createNewTask(
@@ -135,60 +247,260 @@ class Aggregator:
             )
             tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
             receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
-            event = self.task_manager.events.NewTaskCreated().process_log(
-                receipt["logs"][0]
-            )
-
-            task_index = event["args"]["taskIndex"]
-            self.tasks[task_index] = event["args"]["task"]
+            (task_index,) = self._track_created_tasks(receipt)
+            self.tracer.record("create_task", task_index, started, time.time())
 
-            logger.debug(f"Successfully sent the new task {task_index}")
+            logger.debug("Successfully sent the new task %s", task_index)
             return task_index
 
         except Exception as e:
             logger.error(f"Aggregator failed to send number to square: {str(e)}")
             return None
 
+    def send_new_tasks(self, nums_to_square):
+        """Create a task for each number in a single createNewTasks transaction."""
+        logger.debug(
+            "Aggregator sending new tasks", extra={"numbersToSquare": nums_to_square}
+        )
+
+        started = time.time()
+        try:
+            receipt = self._send_transaction(
+                self.task_manager.functions.createNewTasks(
+                    nums_to_square, THRESHOLD_PERCENT, nums_to_bytes([0])
+                ),
+                gas=2000000 + NEW_TASK_GAS_PER_TASK * len(nums_to_square),
+            )
+            task_indices = self._track_created_tasks(receipt)
+            self.tracer.record("create_task", task_indices, started, time.time())
+
+            logger.debug("Successfully sent the new tasks %s", task_indices)
+            return task_indices
+
+        except Exception as e:
+            logger.error(f"Aggregator failed to send numbers to square: {str(e)}")
+            return None
+
+    def _track_created_tasks(self, receipt):
+        """Record the tasks created in a transaction and return their indices."""
+        codec = task_manager_codec()
+        task_indices = []
+        for log in receipt["logs"]:
+            if (
+                log["topics"]
+                and bytes(log["topics"][0]) == codec.new_task_created_topic
+            ):
+                event = codec.decode_log(log)
+                self.tasks[event.task_index] = event.task
+                self.in_flight.started(
+                    event.task_index,
+                    event.task.task_created_block + self.task_response_window_block,
+                )
+                task_indices.append(event.task_index)
+        return task_indices
+
+    def queue_new_task(self, num_to_square):
+        """Queue a number to square until the next batch of tasks is flushed."""
+        with self._pending_cond:
+            if not self._pending_numbers:
+                self._pending_since = time.monotonic()
+            self._pending_numbers.append(num_to_square)
+            if len(self._pending_numbers) >= self._task_batch_size():
+                self._pending_cond.notify()
+
+    def start_flushing_new_tasks(self):
+        """Send queued numbers once the batch is full or the oldest one lingered."""
+        linger = int(self.config.get("task_batch_linger_ms", 1000)) / 1000
+        while not self._stop_flag:
+            with self._pending_cond:
+                while not self._stop_flag:
+                    if len(self._pending_numbers) >= self._task_batch_size():
+                        break
+                    if self._pending_numbers:
+                        remaining = self._pending_since + linger - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._pending_cond.wait(remaining)
+                    else:
+                        self._pending_cond.wait()
+                batch = self._pending_numbers[: self._task_batch_size()]
+                del self._pending_numbers[: len(batch)]
+                self._pending_since = time.monotonic()
+            if batch and self.send_new_tasks(batch) is None:
+                self.in_flight.cancel(len(batch))
+
+    def _task_batch_size(self):
+        return int(self.config.get("task_batch_size", 1))
+
     def start_sending_new_tasks(self):
-        """Start sending new tasks periodically."""
-        task_num = 0
+        """Send the numbers of the task source as new tasks.
+
+        A task is only taken from the source once a slot is free under the
+        in-flight limit, so a source faster than the operators and the chain
+        is held back instead of piling up tasks that would expire.
+        """
         while not self._stop_flag:
-            logger.debug("Sending new task")
-            self.send_new_task(task_num)
-            task_num += 1
-            time.sleep(10)
+            self.in_flight.expire(self.head_tracker.latest)
+            if not self.in_flight.acquire(timeout=1):
+                continue
+            num_to_square = self.task_source.next(timeout=1)
+            if num_to_square is None:
+                self.in_flight.cancel()
+                continue
+            if self._task_batch_size() > 1:
+                self.queue_new_task(num_to_square)
+            else:
+                logger.debug("Sending new task")
+                if self.send_new_task(num_to_square) is None:
+                    self.in_flight.cancel()
+
+    def submit_tasks(self):
+        """Queue numbers to square, posted as ``{"numbers": [...]}``."""
+        try:
+            numbers = [int(n) for n in request.get_json()["numbers"]]
+        except (KeyError, TypeError, ValueError):
+            return jsonify({"success": False, "error": "400. Invalid tasks"}), 400
+
+        for queued, number in enumerate(numbers):
+            try:
+                self.task_source.put(number)
+            except queue.Full:
+                return (
+                    jsonify(
+                        {
+                            "success": False,
+                            "error": "503. Task queue is full",
+                            "queued": queued,
+                        }
+                    ),
+                    503,
+                )
+        return jsonify({"success": True, "queued": len(numbers)}), 202
 
     @staticmethod
     def _verify_signature(data, operators):
         """Verify the operator's signature."""
-        if data["operator_id"] not in operators:
-            raise OperatorNotRegisteredError()
-
         encoded = eth_abi.encode(
             ["uint32", "uint256"], [data["task_index"], data["number_squared"]]
         )
         task_response_digest = Web3.keccak(encoded)
+        Aggregator._verify_operator_signature(data, task_response_digest, operators)
+
+    @staticmethod
+    def _verify_operator_signature(data, message, operators):
+        """Verify the operator's signature over a message."""
+        if data["operator_id"] not in operators:
+            raise OperatorNotRegisteredError()
 
         pub_key_g2 = operators[data["operator_id"]]["public_key_g2"]
         signature = Signature(data["signature"]["X"], data["signature"]["Y"])
-        verified = signature.verify(pub_key_g2, task_response_digest)
+        verified = signature.verify(pub_key_g2, message)
         if not verified:
             raise SignatureVerificationError()
 
+    @staticmethod
+    def _threshold_reached(operators, signer_operator_ids):
+        """Return signed stake, total stake and whether the threshold is met."""
+        signed_stake = sum(
+            operators[operator_id]["stake"] for operator_id in signer_operator_ids
+        )
+        total_stake = sum(operators[operator_id]["stake"] for operator_id in operators)
+        reached = not (
+            total_stake > 0 and signed_stake / total_stake < THRESHOLD_PERCENT / 100
+        )
+        return signed_stake, total_stake, reached
+
     def submit_signature(self):
         """Handle operator signature submission."""
-        try:
-            data = request.get_json()
-            logger.debug(f"Received signed task response: {data}")
+        body, status = self._process_signature(request.get_json())
+        return jsonify(body), status, self._retry_after_header(body)
 
-            task_index = data["task_index"]
+    def submit_signatures(self):
+        """Handle several operator signatures submitted in one request.
+
+        Every signature is processed as if posted to ``/signature``, the result
+        of each is returned in order with its status code.
+        """
+        results = []
+        for data in request.get_json():
+            body, status = self._process_signature(data)
+            results.append({**body, "status": status})
+        retry_after = max((r.get("retry_after", 0) for r in results), default=0)
+        return (
+            jsonify({"success": True, "results": results}),
+            200,
+            self._retry_after_header({"retry_after": retry_after}),
+        )
+
+    @staticmethod
+    def _retry_after_header(body):
+        if body.get("retry_after"):
+            return {"Retry-After": str(body["retry_after"])}
+        return {}
+
+    def _admit(self, task_indices, operator_id, responses):
+        """Reject a submission that cannot count towards a response.
+
+        Runs before any subgraph query or pairing check. Returns the last block
+        a response for the tasks can be mined in, which orders the accepted
+        submissions waiting for verification.
+        """
+        for task_index in task_indices:
             if task_index not in self.tasks:
                 raise TaskNotFoundError()
-
-            operators = self.operators_info(data["block_number"])
+        with self._ready_lock:
+            if all(i in self.responded_tasks for i in task_indices):
+                raise TaskAlreadyRespondedError()
+        if operator_id in responses:
+            raise OperatorAlreadyProcessedError()
+
+        deadline = (
+            min(self.tasks[i].task_created_block for i in task_indices)
+            + self.task_response_window_block
+        )
+        self._check_deadline(deadline)
+        return deadline
+
+    def _check_deadline(self, deadline):
+        # a response sent now is mined in the next block at the earliest
+        if self.head_tracker.latest >= deadline:
+            raise TaskExpiredError()
+
+    def _verify_admitted(self, data, deadline, message=None):
+        """Verify an admitted signature, unless its task expired in the queue."""
+        self._check_deadline(deadline)
+        operators = self.operators_info(data["block_number"])
+        if message is None:
             self._verify_signature(data, operators)
+        else:
+            self._verify_operator_signature(data, message, operators)
+        return operators
 
+    def _verify_in_turn(self, deadline, data, message=None):
+        try:
+            return self.admission.run(
+                deadline, self._verify_admitted, data, deadline, message
+            )
+        except queue.Full:
+            raise AggregatorOverloadedError(self.admission.retry_after())
+
+    def _process_signature(self, data):
+        """Process a signed task response, returning the response body and status."""
+        try:
+            logger.debug(
+                "Received signed task response: %s",
+                data,
+                sample_every=self.log_sample_every,
+            )
+
+            task_index = data["task_index"]
             operator_id = data["operator_id"]
+            deadline = self._admit(
+                [task_index], operator_id, self.responses.get(task_index, {})
+            )
+
+            with self.tracer.span("verify_signature", task_index):
+                operators = self._verify_in_turn(deadline, data)
 
             if task_index not in self.responses:
                 self.responses[task_index] = {}
@@ -206,88 +518,207 @@ class Aggregator:
                 )
             ]
 
-            signed_stake = sum(
-                operators[operator_id]["stake"] for operator_id in signer_operator_ids
-            )
-            total_stake = sum(
-                operators[operator_id]["stake"] for operator_id in operators
+            signed_stake, total_stake, reached = self._threshold_reached(
+                operators, signer_operator_ids
             )
 
             logger.debug(
                 "Signature processed successfully",
-                extra={
-                    "taskIndex": task_index,
-                    "operatorId": operator_id,
-                    "signedStake": signed_stake,
-                    "totalStake": total_stake,
-                    "threshold": THRESHOLD_PERCENT,
-                },
+                taskIndex=task_index,
+                operatorId=operator_id,
+                signedStake=signed_stake,
+                totalStake=total_stake,
+                threshold=THRESHOLD_PERCENT,
+                sample_every=self.log_sample_every,
             )
 
-            if total_stake > 0 and signed_stake / total_stake < THRESHOLD_PERCENT / 100:
-                return (
-                    jsonify(
-                        {
-                            "success": True,
-                            "message": "Signature accepted, threshold not yet reached",
-                        }
-                    ),
-                    200,
-                )
+            if not reached:
+                return {
+                    "success": True,
+                    "message": "Signature accepted, threshold not yet reached",
+                }, 200
 
             # Process the aggregated response
             signatures = [
                 self.responses[task_index][operator_id]["signature"]
                 for operator_id in signer_operator_ids
             ]
-            non_signers_pubkeys_g1 = [
-                operators[operator_id]["public_key_g1"]
-                for operator_id in operators
-                if operator_id not in signer_operator_ids
-            ]
-            quorum_apks_g1 = sum(
-                [operators[operator_id]["public_key_g1"] for operator_id in operators],
-                new_zero_g1_point(),
-            )
-            signers_apk_g2 = sum(
-                [
-                    operators[operator_id]["public_key_g2"]
-                    for operator_id in operators
-                    if operator_id in signer_operator_ids
-                ],
-                new_zero_g2_point(),
+            # the contract checks signatures against the stakes at the block the
+            # task was created in, whatever reference block the operators used
+            task_created_block = self.tasks[task_index].task_created_block
+
+            if not self._claim_task_response(task_index):
+                return {
+                    "success": True,
+                    "message": "Signature accepted, task already responded",
+                }, 200
+
+            with self.tracer.span("aggregate_signatures", task_index):
+                aggregated = self._aggregate_signatures(
+                    operators, signer_operator_ids, signatures, task_created_block
+                )
+            response = {
+                "task_index": data["task_index"],
+                "block_number": task_created_block,
+                "number_squared": data["number_squared"],
+                "number_to_be_squared": self.tasks[task_index].number_to_be_squared,
+                **aggregated,
+            }
+            if self._response_batching():
+                with self._ready_lock:
+                    self._ready_responses.append(response)
+                message = "Threshold reached, aggregated response queued"
+            else:
+                try:
+                    self._submit_aggregated_response(response)
+                except Exception:
+                    # let a later signature retry the submission
+                    with self._ready_lock:
+                        self.responded_tasks.discard(task_index)
+                    raise
+                message = "Threshold reached, aggregated response submitted"
+            return {"success": True, "message": message}, 200
+
+        except TaskNotFoundError as e:
+            logger.error(f"Task not found: {str(e)}")
+            return {"success": False, "error": str(e)}, 400
+        except (TaskAlreadyRespondedError, TaskExpiredError) as e:
+            logger.debug(f"Signature not needed: {str(e)}")
+            return {"success": False, "error": str(e)}, 400
+        except AggregatorOverloadedError as e:
+            logger.warning(f"Shedding signature: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e),
+                "retry_after": e.retry_after,
+            }, 503
+        except OperatorNotRegisteredError as e:
+            logger.error(f"Operator not registered: {str(e)}")
+            return {"success": False, "error": str(e)}, 400
+        except OperatorAlreadyProcessedError as e:
+            logger.error(f"Operator already processed: {str(e)}")
+            return {"success": False, "error": str(e)}, 400
+        except SignatureVerificationError as e:
+            logger.error(f"Signature verification failed: {str(e)}")
+            return {"success": False, "error": str(e)}, 400
+        except Exception as e:
+            logger.error(f"Internal server error: {str(e)}")
+            return {"success": False, "error": "500. Internal server error"}, 500
+
+    def submit_batch_signature(self):
+        """Handle operator signature submission over a batch of task responses.
+
+        The operator signs the merkle root of the responses, so a single pairing
+        check covers the whole batch. Signatures are aggregated per batch root.
+        """
+        try:
+            data = request.get_json()
+            logger.debug(
+                "Received signed task response batch: %s",
+                data,
+                sample_every=self.log_sample_every,
             )
-            signers_agg_sig_g1 = sum(
-                [Signature(signature["X"], signature["Y"]) for signature in signatures],
-                new_zero_g1_point(),
+
+            task_responses = data["task_responses"]
+            if not task_responses:
+                raise InvalidBatchError()
+            for task_response in task_responses:
+                if task_response["task_index"] not in self.tasks:
+                    raise TaskNotFoundError()
+
+            task_indices = [r["task_index"] for r in task_responses]
+            created_blocks = {
+                self.tasks[task_index].task_created_block for task_index in task_indices
+            }
+            if task_indices != sorted(set(task_indices)) or len(created_blocks) != 1:
+                raise InvalidBatchError()
+            operator_id = data["operator_id"]
+            deadline = self._admit(
+                task_indices,
+                operator_id,
+                self.batch_responses.get(data["batch_root"], {}),
             )
 
-            indices = self.clients.avs_registry_reader.get_check_signatures_indices(
-                data["block_number"],
-                [0],
-                [
-                    bytes.fromhex(operator_id[2:])
-                    for operator_id in operators
-                    if operator_id not in signer_operator_ids
-                ],
+            leaves = [
+                task_response_leaf(r["task_index"], r["number_squared"])
+                for r in task_responses
+            ]
+            layers = merkle_layers(leaves)
+            batch_root = layers[-1][0]
+            if Web3.to_hex(batch_root) != data["batch_root"]:
+                raise InvalidBatchError()
+
+            with self.tracer.span("verify_signature", task_indices):
+                operators = self._verify_in_turn(deadline, data, batch_root)
+
+            responses = self.batch_responses.setdefault(data["batch_root"], {})
+            if operator_id in responses:
+                raise OperatorAlreadyProcessedError()
+            responses[operator_id] = data
+
+            signer_operator_ids = list(responses)
+            signed_stake, total_stake, reached = self._threshold_reached(
+                operators, signer_operator_ids
             )
 
-            self._submit_aggregated_response(
-                {
-                    "task_index": data["task_index"],
-                    "block_number": data["block_number"],
-                    "number_squared": data["number_squared"],
-                    "number_to_be_squared": self.tasks[task_index]["numberToBeSquared"],
-                    "non_signers_pubkeys_g1": non_signers_pubkeys_g1,
-                    "quorum_apks_g1": [quorum_apks_g1],
-                    "signers_apk_g2": signers_apk_g2,
-                    "signers_agg_sig_g1": signers_agg_sig_g1,
-                    "non_signer_quorum_bitmap_indices": indices.non_signer_quorum_bitmap_indices,
-                    "quorum_apk_indices": indices.quorum_apk_indices,
-                    "total_stake_indices": indices.total_stake_indices,
-                    "non_signer_stake_indices": indices.non_signer_stake_indices,
-                }
+            logger.debug(
+                "Batch signature processed successfully",
+                batchRoot=data["batch_root"],
+                taskIndices=task_indices,
+                operatorId=operator_id,
+                signedStake=signed_stake,
+                totalStake=total_stake,
+                threshold=THRESHOLD_PERCENT,
+                sample_every=self.log_sample_every,
             )
+
+            if not reached:
+                return (
+                    jsonify(
+                        {
+                            "success": True,
+                            "message": "Signature accepted, threshold not yet reached",
+                        }
+                    ),
+                    200,
+                )
+
+            signatures = [
+                responses[operator_id]["signature"] for operator_id in responses
+            ]
+            task_created_block = created_blocks.pop()
+            if not self._claim_task_responses(task_indices):
+                return (
+                    jsonify(
+                        {
+                            "success": True,
+                            "message": "Signature accepted, batch already responded",
+                        }
+                    ),
+                    200,
+                )
+            try:
+                with self.tracer.span("aggregate_signatures", task_indices):
+                    aggregated = self._aggregate_signatures(
+                        operators, signer_operator_ids, signatures, task_created_block
+                    )
+                self._submit_aggregated_batch_response(
+                    {
+                        "batch_root": batch_root,
+                        "task_indices": task_indices,
+                        "numbers_squared": [
+                            r["number_squared"] for r in task_responses
+                        ],
+                        "proofs": [merkle_proof(layers, i) for i in range(len(leaves))],
+                        "block_number": task_created_block,
+                        **aggregated,
+                    }
+                )
+            except Exception:
+                # let a later signature retry the submission
+                with self._ready_lock:
+                    self.responded_tasks.difference_update(task_indices)
+                raise
             return (
                 jsonify(
                     {
@@ -298,9 +729,19 @@ class Aggregator:
                 200,
             )
 
-        except TaskNotFoundError as e:
-            logger.error(f"Task not found: {str(e)}")
+        except (TaskNotFoundError, InvalidBatchError) as e:
+            logger.error(f"Invalid task response batch: {str(e)}")
             return jsonify({"success": False, "error": str(e)}), 400
+        except (TaskAlreadyRespondedError, TaskExpiredError) as e:
+            logger.debug(f"Batch signature not needed: {str(e)}")
+            return jsonify({"success": False, "error": str(e)}), 400
+        except AggregatorOverloadedError as e:
+            logger.warning(f"Shedding batch signature: {str(e)}")
+            return (
+                jsonify({"success": False, "error": str(e)}),
+                503,
+                {"Retry-After": str(e.retry_after)},
+            )
         except OperatorNotRegisteredError as e:
             logger.error(f"Operator not registered: {str(e)}")
             return jsonify({"success": False, "error": str(e)}), 400
@@ -317,6 +758,137 @@ class Aggregator:
                 500,
             )
 
+    def _claim_task_response(self, task_index):
+        """Return whether the caller is the first to submit a response for a task."""
+        return self._claim_task_responses([task_index])
+
+    def _claim_task_responses(self, task_indices):
+        """Return whether the caller is the first to submit a response for tasks."""
+        with self._ready_lock:
+            if any(i in self.responded_tasks for i in task_indices):
+                return False
+            self.responded_tasks.update(task_indices)
+        for task_index in task_indices:
+            self.in_flight.completed(task_index)
+        return True
+
+    def _response_batching(self):
+        # respondToTasks is missing from the deployed task manager until the
+        # contracts and the anvil state are regenerated
+        return self.config.get("response_batching", "false") == "true"
+
+    def start_flushing_responses(self):
+        """Periodically submit the aggregated responses that reached threshold."""
+        interval = float(self.config.get("response_flush_interval", 1))
+        while not self._stop_flag:
+            time.sleep(interval)
+            self.flush_ready_responses()
+
+    def flush_ready_responses(self):
+        """Submit ready aggregated responses, one transaction per group.
+
+        Responses sharing a reference block and non-signer set are signed by
+        the same operators, so they are sent together through respondToTasks
+        and the contract runs the stake and apk checks once for the group.
+        """
+        with self._ready_lock:
+            ready, self._ready_responses = self._ready_responses, []
+
+        groups = {}
+        for response in ready:
+            key = (
+                response["block_number"],
+                tuple(g1_to_tupple(g1) for g1 in response["non_signers_pubkeys_g1"]),
+            )
+            groups.setdefault(key, []).append(response)
+
+        max_size = int(self.config.get("response_batch_max_size", 32))
+        for group in groups.values():
+            group.sort(key=lambda response: response["task_index"])
+            for i in range(0, len(group), max_size):
+                self._submit_response_group(group[i : i + max_size])
+
+    def _submit_response_group(self, group):
+        if len(group) > 1:
+            try:
+                self._submit_aggregated_responses(group)
+                return
+            except Exception as e:
+                logger.error(
+                    f"Failed to submit batched responses, submitting one by one: {str(e)}"
+                )
+        for response in group:
+            try:
+                self._submit_aggregated_response(response)
+            except Exception as e:
+                logger.error(
+                    f"Failed to submit aggregated response for task "
+                    f"{response['task_index']}: {str(e)}"
+                )
+                # let a later signature retry the submission
+                with self._ready_lock:
+                    self.responded_tasks.discard(response["task_index"])
+
+    def _aggregate_signatures(
+        self, operators, signer_operator_ids, signatures, task_created_block
+    ):
+        """Aggregate signer signatures and fetch the indices checkSignatures needs."""
+        non_signers_pubkeys_g1 = [
+            operators[operator_id]["public_key_g1"]
+            for operator_id in operators
+            if operator_id not in signer_operator_ids
+        ]
+        quorum_apks_g1 = sum(
+            [operators[operator_id]["public_key_g1"] for operator_id in operators],
+            new_zero_g1_point(),
+        )
+        signers_apk_g2 = sum(
+            [
+                operators[operator_id]["public_key_g2"]
+                for operator_id in operators
+                if operator_id in signer_operator_ids
+            ],
+            new_zero_g2_point(),
+        )
+        signers_agg_sig_g1 = sum(
+            [Signature(signature["X"], signature["Y"]) for signature in signatures],
+            new_zero_g1_point(),
+        )
+
+        indices = self.clients.avs_registry_reader.get_check_signatures_indices(
+            task_created_block,
+            [0],
+            [
+                bytes.fromhex(operator_id[2:])
+                for operator_id in operators
+                if operator_id not in signer_operator_ids
+            ],
+        )
+
+        return {
+            "non_signers_pubkeys_g1": non_signers_pubkeys_g1,
+            "quorum_apks_g1": [quorum_apks_g1],
+            "signers_apk_g2": signers_apk_g2,
+            "signers_agg_sig_g1": signers_agg_sig_g1,
+            "non_signer_quorum_bitmap_indices": indices.non_signer_quorum_bitmap_indices,
+            "quorum_apk_indices": indices.quorum_apk_indices,
+            "total_stake_indices": indices.total_stake_indices,
+            "non_signer_stake_indices": indices.non_signer_stake_indices,
+        }
+
+    @staticmethod
+    def _non_signer_stakes_and_signature(response):
+        return [
+            response["non_signer_quorum_bitmap_indices"],
+            [g1_to_tupple(g1) for g1 in response["non_signers_pubkeys_g1"]],
+            [g1_to_tupple(g1) for g1 in response["quorum_apks_g1"]],
+            g2_to_tupple(response["signers_apk_g2"]),
+            g1_to_tupple(response["signers_agg_sig_g1"]),
+            response["quorum_apk_indices"],
+            response["total_stake_indices"],
+            response["non_signer_stake_indices"],
+        ]
+
     def _submit_aggregated_response(self, response):
         """Submit aggregated response to the contract."""
         logger.debug(
@@ -331,23 +903,107 @@ class Aggregator:
             THRESHOLD_PERCENT,
         ]
         task_response = [response["task_index"], response["number_squared"]]
-        non_signers_stakes_and_signature = [
-            response["non_signer_quorum_bitmap_indices"],
-            [g1_to_tupple(g1) for g1 in response["non_signers_pubkeys_g1"]],
-            [g1_to_tupple(g1) for g1 in response["quorum_apks_g1"]],
-            g2_to_tupple(response["signers_apk_g2"]),
-            g1_to_tupple(response["signers_agg_sig_g1"]),
-            response["quorum_apk_indices"],
-            response["total_stake_indices"],
-            response["non_signer_stake_indices"],
+
+        with self.tracer.span("submit_response", response["task_index"]) as span:
+            receipt = self._send_transaction(
+                self.task_manager.functions.respondToTask(
+                    task, task_response, self._non_signer_stakes_and_signature(response)
+                ),
+                gas=2000000,
+            )
+            span["block"] = receipt["blockNumber"]
+        logger.debug(
+            "Aggregated response sent successfully",
+            extra={"txHash": receipt["transactionHash"].hex()},
+        )
+
+    def _submit_aggregated_batch_response(self, response):
+        """Submit an aggregated response for a batch of tasks to the contract."""
+        logger.debug(
+            "Submitting aggregated batch response to contract",
+            extra={"taskIndices": response["task_indices"]},
+        )
+
+        tasks = [
+            [
+                self.tasks[task_index].number_to_be_squared,
+                response["block_number"],
+                nums_to_bytes([0]),
+                THRESHOLD_PERCENT,
+            ]
+            for task_index in response["task_indices"]
+        ]
+        task_responses = [
+            [task_index, number_squared]
+            for task_index, number_squared in zip(
+                response["task_indices"], response["numbers_squared"]
+            )
         ]
 
-        tx = self.task_manager.functions.respondToTask(
-            task, task_response, non_signers_stakes_and_signature
-        ).build_transaction(
+        with self.tracer.span("submit_response", response["task_indices"]) as span:
+            receipt = self._send_transaction(
+                self.task_manager.functions.respondToTaskBatch(
+                    tasks,
+                    task_responses,
+                    response["proofs"],
+                    response["batch_root"],
+                    self._non_signer_stakes_and_signature(response),
+                ),
+                gas=2000000 + BATCH_GAS_PER_TASK * len(tasks),
+            )
+            span["block"] = receipt["blockNumber"]
+        logger.debug(
+            "Aggregated batch response sent successfully",
+            extra={"txHash": receipt["transactionHash"].hex()},
+        )
+
+    def _submit_aggregated_responses(self, responses):
+        """Submit aggregated responses of tasks signed by the same operators."""
+        task_indices = [response["task_index"] for response in responses]
+        logger.debug(
+            "Submitting aggregated responses to contract",
+            extra={"taskIndices": task_indices},
+        )
+
+        tasks = [
+            [
+                response["number_to_be_squared"],
+                response["block_number"],
+                nums_to_bytes([0]),
+                THRESHOLD_PERCENT,
+            ]
+            for response in responses
+        ]
+        task_responses = [
+            [response["task_index"], response["number_squared"]]
+            for response in responses
+        ]
+        signatures = [
+            g1_to_tupple(response["signers_agg_sig_g1"]) for response in responses
+        ]
+
+        with self.tracer.span("submit_response", task_indices) as span:
+            receipt = self._send_transaction(
+                self.task_manager.functions.respondToTasks(
+                    tasks,
+                    task_responses,
+                    signatures,
+                    self._non_signer_stakes_and_signature(responses[0]),
+                ),
+                gas=2000000 + BATCH_GAS_PER_TASK * len(responses),
+            )
+            span["block"] = receipt["blockNumber"]
+        logger.debug(
+            "Aggregated responses sent successfully",
+            extra={"txHash": receipt["transactionHash"].hex()},
+        )
+
+    def _send_transaction(self, contract_function, gas):
+        """Sign and send a contract call as the aggregator, waiting for the receipt."""
+        tx = contract_function.build_transaction(
             {
                 "from": self.aggregator_address,
-                "gas": 2000000,
+                "gas": gas,
                 "gasPrice": self.web3.to_wei("20", "gwei"),
                 "nonce": self.web3.eth.get_transaction_count(self.aggregator_address),
                 "chainId": self.web3.eth.chain_id,
@@ -357,11 +1013,7 @@ class Aggregator:
             tx, private_key=self.aggregator_ecdsa_private_key
         )
         tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
-        logger.debug(
-            "Aggregated response sent successfully",
-            extra={"txHash": receipt["transactionHash"].hex()},
-        )
+        return self.web3.eth.wait_for_transaction_receipt(tx_hash)
 
     def start_server(self):
         """Start the Flask server."""
@@ -399,64 +1051,78 @@ class Aggregator:
             delegation_manager_addr=self.config["delegation_manager_address"],
         )
         self.clients = build_all(cfg, self.aggregator_ecdsa_private_key)
+        # the clients share the aggregator's connections instead of their own
+        share_provider(self.clients, self.web3.provider)
 
     def _load_task_manager(self):
         """Load the task manager contract."""
         service_manager_address = self.clients.avs_registry_writer.service_manager_addr
-        with open("abis/IncredibleSquaringServiceManager.json") as f:
-            service_manager_abi = f.read()
         service_manager = self.web3.eth.contract(
-            address=service_manager_address, abi=service_manager_abi
+            address=service_manager_address,
+            abi=load_abi("IncredibleSquaringServiceManager"),
         )
 
         task_manager_address = (
             service_manager.functions.incredibleSquaringTaskManager().call()
         )
-        with open("abis/IncredibleSquaringTaskManager.json") as f:
-            task_manager_abi = f.read()
         self.task_manager = self.web3.eth.contract(
-            address=task_manager_address, abi=task_manager_abi
-        )
-
-    def operators_info(self, block):
-        query = f"""
-        {{
-            operators(block: {{ number: {block} }}) {{
-                id
-                operatorId
-                socket
-                stake
-                pubkeyG1_X
-                pubkeyG1_Y
-                pubkeyG2_X
-                pubkeyG2_Y
-            }}
-        }}
-        """
-        response = requests.post(
-            self.subgraph_url,
-            headers={"content-type": "application/json"},
-            json={"query": query},
+            address=task_manager_address, abi=load_abi("IncredibleSquaringTaskManager")
         )
-        response.raise_for_status()
+        self.task_response_window_block = (
+            self.task_manager.functions.getTaskResponseWindowBlock().call()
+        )
+
+    def operators_info(self, block, keys=True):
+        """The operators as of a block, keyed by operator id.
 
-        operators = response.json()["data"]["operators"]
+        Ids and stakes are read on every call. A registered BLS key never
+        changes, so with ``keys`` the key fields are only fetched for operators
+        missing from the local key cache.
+        """
+        operators = self.subgraph.fetch_all(
+            "operators", "Operator", OPERATOR_STAKE_FIELDS, block=block
+        )
+        if keys:
+            with self._operator_keys_lock:
+                missing = [
+                    op["id"]
+                    for op in operators
+                    if op["operatorId"] not in self._operator_keys
+                ]
+            if missing:
+                self._load_operator_keys(missing, block)
 
         for op in operators:
-            op["public_key_g1"] = G1Point(
-                op["pubkeyG1_X"],
-                op["pubkeyG1_Y"],
-            )
-            op["public_key_g2"] = G2Point(
-                op["pubkeyG2_X"][0],
-                op["pubkeyG2_X"][1],
-                op["pubkeyG2_Y"][0],
-                op["pubkeyG2_Y"][1],
-            )
             op["stake"] = float(op["stake"])
-
+            if keys:
+                op["public_key_g1"], op["public_key_g2"] = self._operator_keys[
+                    op["operatorId"]
+                ]
         return {op["operatorId"]: op for op in operators}
 
+    def _load_operator_keys(self, ids, block):
+        rows = self.subgraph.fetch_all(
+            "operators",
+            "Operator",
+            OPERATOR_KEY_FIELDS,
+            block=block,
+            where={"id_in": ids},
+        )
+        loaded = {
+            op["operatorId"]: (
+                G1Point(op["pubkeyG1_X"], op["pubkeyG1_Y"]),
+                G2Point(
+                    op["pubkeyG2_X"][0],
+                    op["pubkeyG2_X"][1],
+                    op["pubkeyG2_Y"][0],
+                    op["pubkeyG2_Y"][1],
+                ),
+            )
+            for op in rows
+        }
+        with self._operator_keys_lock:
+            self._operator_keys.update(loaded)
+
 
 if __name__ == "__main__":
     dir_path = os.path.dirname(os.path.abspath(__file__))
@@ -475,5 +1141,9 @@ if __name__ == "__main__":
     with open(avs_config_path, "r") as f:
         avs_config = yaml.load(f, Loader=yaml.BaseLoader)
 
+    configure_logging(
+        aggregator_config.get("log_level", "INFO"),
+        aggregator_config.get("log_format") == "json",
+    )
     aggregator = Aggregator(config={**aggregator_config, **avs_config})
     aggregator.start()
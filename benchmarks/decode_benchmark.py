@@ -0,0 +1,95 @@
+"""Compare web3's contract decoding of task manager logs and calldata with core.abi.
+
+Run from the repository root:
+
+    python -m benchmarks.decode_benchmark [iterations]
+"""
+
+import sys
+import time
+
+import eth_abi
+from web3 import Web3
+
+from core.abi import load_abi, task_manager_codec
+
+TASK = (7, 100, b"\x00", 50)
+NON_SIGNER_STAKES_AND_SIGNATURE = (
+    [1],
+    [(1, 2), (3, 4)],
+    [(5, 6)],
+    ([7, 8], [9, 10]),
+    (11, 12),
+    [0],
+    [0],
+    [[0]],
+)
+
+
+def _log(topics, data):
+    return {
+        "address": "0x" + "11" * 20,
+        "topics": topics,
+        "data": data,
+        "blockNumber": 101,
+        "blockHash": b"\x02" * 32,
+        "transactionHash": b"\x01" * 32,
+        "transactionIndex": 0,
+        "logIndex": 0,
+    }
+
+
+def _time(label, fn, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<40} {elapsed / iterations * 1e6:10.1f} us/op")
+    return elapsed
+
+
+def main(iterations):
+    codec = task_manager_codec()
+    task_manager = Web3().eth.contract(
+        address="0x" + "11" * 20, abi=load_abi("IncredibleSquaringTaskManager")
+    )
+
+    new_task_log = _log(
+        [codec.new_task_created_topic, (5).to_bytes(32, "big")],
+        eth_abi.encode(["(uint256,uint32,bytes,uint32)"], [TASK]),
+    )
+    task_responded_log = _log(
+        [codec.task_responded_topic],
+        eth_abi.encode(
+            ["(uint32,uint256)", "(uint32,bytes32)"], [(5, 49), (102, b"\x03" * 32)]
+        ),
+    )
+    calldata = task_manager.encode_abi(
+        "respondToTask", args=[TASK, (5, 49), NON_SIGNER_STAKES_AND_SIGNATURE]
+    )
+
+    cases = [
+        (
+            "NewTaskCreated",
+            lambda: task_manager.events.NewTaskCreated().process_log(new_task_log),
+            lambda: codec.decode_log(new_task_log),
+        ),
+        (
+            "TaskResponded",
+            lambda: task_manager.events.TaskResponded().process_log(task_responded_log),
+            lambda: codec.decode_log(task_responded_log),
+        ),
+        (
+            "respondToTask calldata",
+            lambda: task_manager.decode_function_input(calldata),
+            lambda: codec.decode_respond_call(bytes.fromhex(calldata[2:])),
+        ),
+    ]
+    for name, web3_decode, codec_decode in cases:
+        web3_elapsed = _time(f"{name} (web3)", web3_decode, iterations)
+        codec_elapsed = _time(f"{name} (core.abi)", codec_decode, iterations)
+        print(f"{name:<40} {web3_elapsed / codec_elapsed:10.1f}x faster\n")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
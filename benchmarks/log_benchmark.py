@@ -0,0 +1,75 @@
+"""Measure the cost of logging calls on the services' hot paths.
+
+Run from the repository root:
+
+    python -m benchmarks.log_benchmark [iterations]
+"""
+
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+
+from core.log import DeferredQueueHandler, get_logger
+
+RESPONSE = {
+    "task_id": 5,
+    "number_squared": 49,
+    "signature": {"X": "1" * 64, "Y": "2" * 64},
+    "block_number": 101,
+    "operator_id": "0x" + "ab" * 32,
+}
+
+
+def _time(label, fn, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<40} {elapsed / iterations * 1e6:10.2f} us/op")
+    return elapsed
+
+
+def main(iterations):
+    base = logging.getLogger("benchmarks.log")
+    base.propagate = False
+    logger = get_logger("benchmarks.log")
+
+    base.setLevel(logging.INFO)
+    _time(
+        "disabled debug (f-string)",
+        lambda: base.debug(f"Received signed task response: {RESPONSE}"),
+        iterations,
+    )
+    _time(
+        "disabled debug (deferred)",
+        lambda: logger.debug("Received signed task response: %s", RESPONSE),
+        iterations,
+    )
+
+    log_queue = queue.SimpleQueue()
+    base.handlers[:] = [DeferredQueueHandler(log_queue)]
+    base.setLevel(logging.DEBUG)
+    _time(
+        "enabled debug, 1 in 100 sampled",
+        lambda: logger.debug(
+            "Received signed task response: %s", RESPONSE, sample_every=100
+        ),
+        iterations,
+    )
+    _time(
+        "enabled debug, deferred queue handler",
+        lambda: logger.debug("Received signed task response: %s", RESPONSE),
+        iterations,
+    )
+    base.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    _time(
+        "enabled debug, stdlib queue handler",
+        lambda: logger.debug("Received signed task response: %s", RESPONSE),
+        iterations,
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -1,16 +1,29 @@
+import argparse
 import json
-import logging
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 
 import yaml
 from eigensdk.chainio.clients.builder import BuildAllConfig, build_all
 from eth_account import Account
+from web3 import Web3
 
-# change logging level to DEBUG for testing
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+from core.abi import load_abi, task_manager_codec
+from core.checkpoint import Checkpoint
+from core.ingestion import EventIngestor
+from core.join_buffer import JoinBuffer
+from core.log import configure_logging, get_logger
+from core.log_fetcher import LogFetcher
+from core.metrics import Counters
+from core.rpc import load_provider, share_provider
+from core.tracing import load_tracer
+from core.tx_cache import TransactionCache
+from core.tx_submitter import TransactionSubmitter
+
+logger = get_logger(__name__)
 
 
 @dataclass
@@ -36,6 +49,15 @@ class Task:
             "quorum_threshold_percentage": self.quorum_threshold_percentage,
         }
 
+    @classmethod
+    def from_json(cls, data):
+        return cls(
+            number_to_be_squared=data["number_to_be_squared"],
+            task_created_block=data["task_created_block"],
+            quorum_numbers=bytes.fromhex(data["quorum_numbers"]),
+            quorum_threshold_percentage=data["quorum_threshold_percentage"],
+        )
+
 
 @dataclass
 class TaskResponse:
@@ -72,7 +94,9 @@ class TaskResponseMetadata:
 class TaskResponseData:
     task_response: TaskResponse
     task_response_metadata: TaskResponseMetadata
-    non_signing_operator_pub_keys: list[dict]
+    # None until the responding transaction could be fetched
+    non_signing_operator_pub_keys: list[dict] | None
+    transaction_hash: str | None = None
 
     def to_json(self):
 
@@ -80,8 +104,22 @@ class TaskResponseData:
             "task_response": self.task_response.to_json(),
             "task_response_metadata": self.task_response_metadata.to_json(),
             "non_signing_operator_pub_keys": self.non_signing_operator_pub_keys,
+            "transaction_hash": self.transaction_hash,
         }
 
+    @classmethod
+    def from_json(cls, data):
+        metadata = data["task_response_metadata"]
+        return cls(
+            task_response=TaskResponse(**data["task_response"]),
+            task_response_metadata=TaskResponseMetadata(
+                task_responsed_block=metadata["task_responsed_block"],
+                hash_of_non_signers=bytes.fromhex(metadata["hash_of_non_signers"]),
+            ),
+            non_signing_operator_pub_keys=data["non_signing_operator_pub_keys"],
+            transaction_hash=data.get("transaction_hash"),
+        )
+
 
 # Define specific error types
 class ChallengerError(Exception):
@@ -117,6 +155,13 @@ class TaskResponseParsingError(ChallengerError):
         return "500. Failed to parse task response"
 
 
+class NonSignerKeysMissingError(ChallengerError):
+    """The responding transaction, and its non-signer keys, was not fetched yet."""
+
+    def __str__(self):
+        return "500. Non-signing operator keys not fetched yet"
+
+
 class NoErrorInTaskResponse(ChallengerError):
     """Task response is valid, no error found."""
 
@@ -124,15 +169,72 @@ class NoErrorInTaskResponse(ChallengerError):
         return "100. Task response is valid"
 
 
+class ChallengeWouldRevertError(ChallengerError):
+    """Simulating the challenge showed it would revert."""
+
+    def __init__(self, reason, message=""):
+        super().__init__(reason, message)
+        self.reason = reason
+        self.message = message
+
+    def __str__(self):
+        return f"400. Challenge would revert: {self.reason} ({self.message})"
+
+
+# revert messages of raiseAndResolveChallenge, mapped to the reason reported
+# in metrics and whether the challenge may succeed if retried later
+CHALLENGE_REVERT_REASONS = [
+    ("hasn't been responded to yet", "not_responded", True),
+    ("does not match the one recorded", "response_mismatch", False),
+    ("already been challenged successfully", "already_challenged", False),
+    ("challenge period for this task has already expired", "window_expired", False),
+    ("non-signing operators supplied by the challenger", "bad_non_signers", False),
+]
+GAS_ESTIMATE_MARGIN = 1.2
+# responding transactions fetched per JSON-RPC batch during an audit
+AUDIT_TX_BATCH_SIZE = 500
+
+
+def is_response_correct(number_to_be_squared: int, number_squared: int) -> bool:
+    return number_to_be_squared**2 == number_squared
+
+
+def classify_challenge_revert(message: str) -> tuple[str, bool]:
+    """Return ``(reason, retriable)`` for the revert message of a challenge."""
+    for fragment, reason, retriable in CHALLENGE_REVERT_REASONS:
+        if fragment in message:
+            return reason, retriable
+    return "unknown", True
+
+
 class Challenger:
     def __init__(self, config):
         self.config = config
         self._load_ecdsa_key()
         self._load_clients()
         self._load_task_manager()
-        self.tasks: dict[int, Task] = {}
-        self.task_responses: dict[int, TaskResponseData] = {}
-        self.challenge_hashes: dict[int, str] = {}
+        self.tx_cache = TransactionCache(
+            self.config.get("tx_cache_path", "data/challenger.tx-cache.db")
+        )
+        self.join_buffer = JoinBuffer(
+            history_size=int(self.config.get("resolved_history_size", 1000))
+        )
+        self._latest_block = 0
+        self.log_sample_every = int(self.config.get("log_sample_every", 1))
+        self.checkpoint = Checkpoint(
+            self.config.get("checkpoint_path", "data/challenger.checkpoint.json")
+        )
+        self.challenge_submitter = TransactionSubmitter(
+            self.eth_http_client,
+            self.challenger_address,
+            self.challenger_ecdsa_private_key,
+            poll_interval=float(self.config.get("receipt_poll_interval", 1)),
+        )
+        self.verifier = None
+        self.metrics = Counters()
+        self.tracer = load_tracer(self.config, "challenger")
+        self._challenges_in_flight = set()
+        self._challenges_lock = threading.Lock()
         self.task_response_channel = None
         self.new_task_created_channel = None
         self._stop_flag = False
@@ -141,73 +243,273 @@ class Challenger:
         """Start the challenger service."""
         logger.debug("Starting Challenger.")
 
-        # Subscribe to new tasks
-        new_task_sub = self.task_manager.events.NewTaskCreated.create_filter(
-            from_block="latest"
+        codec = task_manager_codec()
+        ingestor = EventIngestor(
+            self.eth_http_client,
+            self.task_manager.address,
+            codec.decode_log,
+            reorg_depth=int(self.config.get("reorg_depth", 64)),
+            min_poll_interval=float(self.config.get("min_poll_interval", 0.5)),
+            max_poll_interval=float(self.config.get("max_poll_interval", 12)),
+        )
+        new_task_events = []
+        task_response_events = []
+        ingestor.subscribe(
+            codec.new_task_created_topic,
+            new_task_events.append,
+            self._on_task_removed,
+        )
+        ingestor.subscribe(
+            codec.task_responded_topic,
+            task_response_events.append,
+            self._on_task_response_removed,
         )
 
-        # Subscribe to task responses
-        task_response_sub = self.task_manager.events.TaskResponded.create_filter(
-            from_block="latest"
+        self.challenge_submitter.start()
+        self.verifier = ThreadPoolExecutor(
+            max_workers=int(self.config.get("verify_workers", 4)),
+            thread_name_prefix="verifier",
         )
+        try:
+            self._resume_from_checkpoint(codec, ingestor)
+            self._poll(ingestor, new_task_events, task_response_events)
+        finally:
+            self.verifier.shutdown(wait=True)
+            self.verifier = None
+            self.challenge_submitter.stop()
+            self.tracer.close()
+
+    def _poll(self, ingestor, new_task_events, task_response_events) -> None:
+        def on_poll(_):
+            created = list(new_task_events)
+            responded = list(task_response_events)
+            new_task_events.clear()
+            task_response_events.clear()
+            self.fetch_missing_pub_keys()
+            self.process_new_task_created_events(created)
+            self.process_task_response_events(responded)
+
+            self._latest_block = max(self._latest_block, ingestor.last_block)
+            self.join_buffer.expire(self._latest_block)
+            self.save_checkpoint(ingestor.last_block)
 
         logger.debug("Listening for new events...")
-        while not self._stop_flag:
+        ingestor.run(lambda: self._stop_flag, on_poll)
+
+    def _on_task_removed(self, event) -> None:
+        logger.warning(f"Task {event.task_index} was removed by a reorg")
+        self.join_buffer.discard_task(event.task_index)
+
+    def _on_task_response_removed(self, event) -> None:
+        logger.warning(
+            f"Response to task {event.reference_task_index} was removed by a reorg"
+        )
+        self.join_buffer.discard_response(event.reference_task_index)
+
+    def process_new_task_created_events(self, events) -> None:
+        for event in events:
+            logger.debug(
+                "New task created log received",
+                taskIndex=event.task_index,
+                task=event.task,
+                sample_every=self.log_sample_every,
+            )
+            task_index = self.process_new_task_created_log(event)
+            self.check_task(task_index)
+
+    def process_task_response_events(self, events) -> None:
+        # the transactions of every response are fetched together in a single
+        # batch request, falling back to one request per response if the
+        # batch fails; responses whose transaction could still not be fetched
+        # are buffered without their non-signer keys, retried on every poll
+        try:
+            non_signing_operator_pub_keys = self.fetch_non_signing_operator_pub_keys(
+                [event.transaction_hash for event in events]
+            )
+        except Exception as e:
+            logger.error(f"Failed to fetch responding transactions: {str(e)}")
+            non_signing_operator_pub_keys = {}
+        for event in events:
             try:
-                # Handle new task created events
-                for event in new_task_sub.get_new_entries():
-                    logger.debug(
-                        "New task created log received",
-                        extra={
-                            "taskIndex": event["args"]["taskIndex"],
-                            "task": event["args"]["task"],
-                        },
-                    )
-                    task_index = self.process_new_task_created_log(event)
-
-                    if task_index in self.task_responses:
-                        try:
-                            self.call_challenge_module(task_index)
-                        except NoErrorInTaskResponse:
-                            logger.debug("No error found in task response")
-                        except ChallengerError as e:
-                            logger.error(f"Error in challenge module: {str(e)}")
-                        except Exception as e:
-                            logger.error(
-                                f"Unexpected error in challenge module: {str(e)}"
-                            )
-
-                # Handle task response events
-                for event in task_response_sub.get_new_entries():
-                    logger.debug(
-                        "Task response log received",
-                        extra={"taskResponse": event["args"]["taskResponse"]},
-                    )
-                    try:
-                        task_index = self.process_task_response_log(event)
-
-                        if task_index in self.tasks:
-                            try:
-                                self.call_challenge_module(task_index)
-                            except NoErrorInTaskResponse:
-                                logger.debug("No error found in task response")
-                            except ChallengerError as e:
-                                logger.error(f"Error in challenge module: {str(e)}")
-                            except Exception as e:
-                                logger.error(
-                                    f"Unexpected error in challenge module: {str(e)}"
-                                )
-                    except TaskResponseParsingError as e:
-                        logger.error(f"Failed to process task response: {str(e)}")
-                    except Exception as e:
-                        logger.error(
-                            f"Unexpected error processing task response: {str(e)}"
-                        )
-                time.sleep(3)
+                logger.debug(
+                    "Task response log received",
+                    taskIndex=event.reference_task_index,
+                    numberSquared=event.number_squared,
+                    sample_every=self.log_sample_every,
+                )
+                task_index = self.process_task_response_log(
+                    event,
+                    non_signing_operator_pub_keys.get(
+                        Web3.to_hex(event.transaction_hash)
+                    ),
+                )
+                self.check_task(task_index)
+            except TaskResponseParsingError as e:
+                logger.error(f"Failed to process task response: {str(e)}")
+            except Exception as e:
+                logger.error(f"Unexpected error processing task response: {str(e)}")
+
+    def fetch_missing_pub_keys(self) -> None:
+        """Fetch the non-signer keys of responses that lack them."""
+        missing = self._responses_missing_pub_keys()
+        if not missing:
+            return
+        try:
+            pub_keys = self.fetch_non_signing_operator_pub_keys(
+                [
+                    Web3.to_bytes(hexstr=response.transaction_hash)
+                    for _, response in missing
+                ]
+            )
+        except Exception as e:
+            logger.error(f"Failed to fetch responding transactions: {str(e)}")
+            return
+        self._fill_pub_keys(missing, pub_keys)
+
+    def _responses_missing_pub_keys(self):
+        _, responses = self.join_buffer.pending()
+        return [
+            (task_index, response)
+            for task_index, response, _ in responses
+            if response.non_signing_operator_pub_keys is None
+            and response.transaction_hash is not None
+        ]
+
+    def _fill_pub_keys(self, missing, pub_keys) -> None:
+        for task_index, response in missing:
+            keys = pub_keys.get(response.transaction_hash)
+            if keys is None:
+                continue
+            response.non_signing_operator_pub_keys = keys
+            self.check_task(task_index)
+
+    def save_checkpoint(self, block: int) -> None:
+        """Persist the last fully processed block and the pending joins."""
+        tasks, responses = self.join_buffer.pending()
+        self.checkpoint.save(
+            block,
+            {
+                "tasks": [
+                    [task_index, task.to_json(), expires_at_block]
+                    for task_index, task, expires_at_block in tasks
+                ],
+                "responses": [
+                    [task_index, response.to_json(), expires_at_block]
+                    for task_index, response, expires_at_block in responses
+                ],
+            },
+        )
+
+    def _resume_from_checkpoint(self, codec, ingestor) -> None:
+        """Restore the pending joins and catch up on the blocks missed since.
+
+        Blocks older than the response and challenge windows are skipped, as
+        nothing created in them can still be challenged, which bounds the
+        catch-up however long the challenger was down.
+        """
+        last_block = self.checkpoint.load()
+        if last_block is None:
+            ingestor.start_at(None)
+            return
+        state = self.checkpoint.state or {}
+        for task_index, task, expires_at_block in state.get("tasks", []):
+            self.join_buffer.add_task(
+                task_index, Task.from_json(task), expires_at_block
+            )
+        for task_index, response, expires_at_block in state.get("responses", []):
+            self.join_buffer.add_response(
+                task_index, TaskResponseData.from_json(response), expires_at_block
+            )
+
+        head = self.eth_http_client.eth.block_number
+        from_block = max(
+            last_block + 1,
+            head - self.task_response_window_block - self.task_challenge_window_block,
+        )
+        started = time.monotonic()
+        if from_block <= head:
+            created_events, responded_events = self._fetch_events(
+                codec, from_block, head
+            )
+            self.process_new_task_created_events(created_events)
+            self.process_task_response_events(responded_events)
+        else:
+            created_events, responded_events = [], []
+
+        # joins restored from the checkpoint may not have been verified yet
+        restored_tasks, _ = self.join_buffer.pending()
+        for task_index, _, _ in restored_tasks:
+            self.check_task(task_index)
+
+        self._latest_block = max(self._latest_block, head)
+        self.join_buffer.expire(self._latest_block)
+        self.save_checkpoint(head)
+        ingestor.start_at(head)
+        logger.info(
+            f"Resumed from block {last_block}: caught up on {len(created_events)} "
+            f"tasks and {len(responded_events)} responses in blocks "
+            f"{from_block}-{head} in {time.monotonic() - started:.2f}s"
+        )
 
+    def _fetch_events(self, codec, from_block: int, to_block: int):
+        """Fetch and decode the ``(created, responded)`` events of a block range.
+
+        Both event types are fetched in parallel with chunked getLogs calls.
+        """
+
+        def fetch(topic):
+            fetcher = LogFetcher(
+                self.eth_http_client,
+                self.task_manager.address,
+                [topic],
+                chunk_size=int(self.config.get("log_fetch_chunk_size", 2000)),
+                max_chunk_size=int(self.config.get("log_fetch_max_chunk_size", 10000)),
+                workers=int(self.config.get("log_fetch_workers", 8)),
+            )
+            return [
+                codec.decode_log(log) for log in fetcher.fetch(from_block, to_block)
+            ]
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            created_logs = executor.submit(fetch, codec.new_task_created_topic)
+            responded_logs = executor.submit(fetch, codec.task_responded_topic)
+            return created_logs.result(), responded_logs.result()
+
+    def check_task(self, task_index: int) -> None:
+        """Run the challenge module once both a task and its response are known.
+
+        Verification runs on the verifier pool while the challenger is started,
+        so polling carries on meanwhile. The task is resolved, and leaves the
+        join buffer, when its response is found correct or a challenge against
+        it was mined.
+        """
+        if self.join_buffer.joined(task_index) is None:
+            return
+        if self.verifier is not None:
+            self.verifier.submit(self._verify_task, task_index)
+        else:
+            self._verify_task(task_index)
+
+    def _verify_task(self, task_index: int) -> None:
+        with self.tracer.span("call_challenge_module", task_index) as span:
+            try:
+                self.call_challenge_module(task_index)
+                span["verdict"] = "challenged"
+            except NoErrorInTaskResponse:
+                logger.debug("No error found in task response")
+                self.join_buffer.resolve(task_index)
+                span["verdict"] = "correct"
+            except ChallengeWouldRevertError as e:
+                logger.warning(f"Dropped challenge for task {task_index}: {str(e)}")
+                if e.reason == "already_challenged":
+                    self.join_buffer.resolve(task_index)
+                span["verdict"] = "dropped"
+            except ChallengerError as e:
+                logger.error(f"Error in challenge module: {str(e)}")
+                span["error"] = type(e).__name__
             except Exception as e:
-                logger.error(f"Error in event processing: {str(e)}")
-                time.sleep(5)
+                logger.error(f"Unexpected error in challenge module: {str(e)}")
+                span["error"] = type(e).__name__
 
     def stop(self):
         """Stop the challenger service."""
@@ -215,75 +517,103 @@ class Challenger:
         self._stop_flag = True
 
     def process_new_task_created_log(self, new_task_created_log) -> int:
-        """Process new task creation log."""
-        task_index = new_task_created_log["args"]["taskIndex"]
+        """Process a decoded new task creation log."""
+        task_index = new_task_created_log.task_index
+        created_task = new_task_created_log.task
         task = Task(
-            number_to_be_squared=new_task_created_log["args"]["task"][
-                "numberToBeSquared"
-            ],
-            task_created_block=new_task_created_log["args"]["task"]["taskCreatedBlock"],
-            quorum_numbers=new_task_created_log["args"]["task"]["quorumNumbers"],
-            quorum_threshold_percentage=new_task_created_log["args"]["task"][
-                "quorumThresholdPercentage"
-            ],
+            number_to_be_squared=created_task.number_to_be_squared,
+            task_created_block=created_task.task_created_block,
+            quorum_numbers=created_task.quorum_numbers,
+            quorum_threshold_percentage=created_task.quorum_threshold_percentage,
+        )
+        # a task can be responded to within the response window, and its
+        # response challenged within the challenge window after that
+        self.join_buffer.add_task(
+            task_index,
+            task,
+            task.task_created_block
+            + self.task_response_window_block
+            + self.task_challenge_window_block,
         )
-        self.tasks[task_index] = task
+        self._latest_block = max(self._latest_block, new_task_created_log.block_number)
         logger.debug(
-            f"Processed new task {task_index} with number to be squared: {task.number_to_be_squared}"
+            "Processed new task %s with number to be squared: %s",
+            task_index,
+            task.number_to_be_squared,
+            sample_every=self.log_sample_every,
         )
         return int(task_index)
 
-    def process_task_response_log(self, task_response_log) -> int:
-        """Process task response log."""
-        # Get the inputs necessary for raising a challenge
-        non_signing_operator_pub_keys = self.get_non_signing_operator_pub_keys(
-            task_response_log
-        )
+    def process_task_response_log(
+        self, task_response_log, non_signing_operator_pub_keys=None
+    ) -> int:
+        """Process a decoded task response log.
+
+        Without ``non_signing_operator_pub_keys``, which are needed to raise a
+        challenge, the response is kept with its transaction hash so the keys
+        can be fetched later.
+        """
+        transaction_hash = Web3.to_hex(task_response_log.transaction_hash)
+        if non_signing_operator_pub_keys is None:
+            logger.warning(
+                f"Non-signer keys of the response to task "
+                f"{task_response_log.reference_task_index} not fetched, "
+                "retrying on the next poll"
+            )
         task_response = TaskResponse(
-            number_squared=task_response_log["args"]["taskResponse"]["numberSquared"],
-            reference_task_index=task_response_log["args"]["taskResponse"][
-                "referenceTaskIndex"
-            ],
+            number_squared=task_response_log.number_squared,
+            reference_task_index=task_response_log.reference_task_index,
         )
         task_response_metadata = TaskResponseMetadata(
-            task_responsed_block=task_response_log["args"]["taskResponseMetadata"][
-                "taskResponsedBlock"
-            ],
-            hash_of_non_signers=task_response_log["args"]["taskResponseMetadata"][
-                "hashOfNonSigners"
-            ],
+            task_responsed_block=task_response_log.task_responsed_block,
+            hash_of_non_signers=task_response_log.hash_of_non_signers,
         )
         task_response_data = TaskResponseData(
             task_response=task_response,
             task_response_metadata=task_response_metadata,
             non_signing_operator_pub_keys=non_signing_operator_pub_keys,
+            transaction_hash=transaction_hash,
         )
 
-        task_index = task_response_log["args"]["taskResponse"]["referenceTaskIndex"]
-        self.task_responses[task_index] = task_response_data
+        task_index = task_response_log.reference_task_index
+        self.join_buffer.add_response(
+            task_index,
+            task_response_data,
+            task_response_metadata.task_responsed_block
+            + self.task_challenge_window_block,
+        )
+        self._latest_block = max(self._latest_block, task_response_log.block_number)
         logger.debug(
-            f"Processed task response for task {task_index} with number squared: {task_response.number_squared}"
+            "Processed task response for task %s with number squared: %s",
+            task_index,
+            task_response.number_squared,
+            sample_every=self.log_sample_every,
         )
         return int(task_index)
 
     def call_challenge_module(self, task_index: int) -> None:
         """Call the challenge module for a given task."""
-        if task_index not in self.tasks:
+        joined = self.join_buffer.joined(task_index)
+        if joined is None:
             raise TaskNotFoundError()
+        task, task_response_data = joined
 
-        number_to_be_squared = self.tasks[task_index].number_to_be_squared
-        answer_in_response = self.task_responses[
-            task_index
-        ].task_response.number_squared
-        true_answer = number_to_be_squared**2
+        number_to_be_squared = task.number_to_be_squared
+        answer_in_response = task_response_data.task_response.number_squared
 
         # Check if the answer in the response submitted by aggregator is correct
-        if true_answer != answer_in_response:
+        if not is_response_correct(number_to_be_squared, answer_in_response):
             logger.debug(
                 "The number squared is not correct",
-                extra={"expectedAnswer": true_answer, "gotAnswer": answer_in_response},
+                extra={
+                    "expectedAnswer": number_to_be_squared**2,
+                    "gotAnswer": answer_in_response,
+                },
             )
 
+            if task_response_data.non_signing_operator_pub_keys is None:
+                raise NonSignerKeysMissingError()
+
             # Raise challenge
             self.raise_challenge(task_index)
             return None
@@ -291,75 +621,264 @@ class Challenger:
             logger.debug("The number squared is correct")
             raise NoErrorInTaskResponse()
 
-    def get_non_signing_operator_pub_keys(self, task_response_log) -> list[dict]:
-        """Get public keys of non-signing operators."""
-        tx = self.eth_http_client.eth.get_transaction(
-            task_response_log["transactionHash"]
+    def audit(self, from_block=None, to_block=None, challenge=True) -> list[dict]:
+        """Verify every task response emitted between two blocks.
+
+        Task and response logs are fetched with chunked, parallel getLogs
+        calls and joined by task index. A report entry is returned for each
+        wrong answer, and those still inside their challenge window are
+        challenged unless ``challenge`` is false. Responses to tasks created
+        before ``from_block`` cannot be joined and are only counted.
+        Challenge windows are checked against the chain head, whatever range
+        is audited. By default the range covers the tasks whose responses
+        can still be challenged, up to the head.
+        """
+        head = self.eth_http_client.eth.block_number
+        if from_block is None:
+            from_block = max(
+                0,
+                head
+                - self.task_response_window_block
+                - self.task_challenge_window_block,
+            )
+        if to_block is None:
+            to_block = head
+        started = time.monotonic()
+        codec = task_manager_codec()
+
+        created_events, responses = self._fetch_events(codec, from_block, to_block)
+        tasks = {event.task_index: event for event in created_events}
+
+        wrong = []
+        unmatched = 0
+        for response in responses:
+            created = tasks.get(response.reference_task_index)
+            if created is None:
+                unmatched += 1
+            elif not is_response_correct(
+                created.task.number_to_be_squared, response.number_squared
+            ):
+                wrong.append((created, response))
+
+        report = []
+        challengeable = []
+        for created, response in wrong:
+            # a challenge sent now is mined in the next block at the earliest
+            in_window = (
+                response.task_responsed_block + self.task_challenge_window_block > head
+            )
+            if in_window:
+                challengeable.append((created, response))
+            report.append(
+                {
+                    "task_index": created.task_index,
+                    "number_to_be_squared": created.task.number_to_be_squared,
+                    "number_squared": response.number_squared,
+                    "task_responsed_block": response.task_responsed_block,
+                    "transaction_hash": Web3.to_hex(response.transaction_hash),
+                    "challengeable": in_window,
+                }
+            )
+
+        logger.info(
+            f"Audited {len(responses)} responses to {len(tasks)} tasks in blocks "
+            f"{from_block}-{to_block} in {time.monotonic() - started:.2f}s: "
+            f"{len(wrong)} wrong, {len(challengeable)} challengeable, "
+            f"{unmatched} without their task in range"
         )
-        input_data = tx["input"]
-        func_obj, func_params = self.task_manager.decode_function_input(input_data)
-        non_signer_pubkeys = func_params["nonSignerStakesAndSignature"][
-            "nonSignerPubkeys"
-        ]
-        result = []
-        for pubkey in non_signer_pubkeys:
-            key_dict = {"X": pubkey["X"], "Y": pubkey["Y"]}
-            result.append(key_dict)
+        if challenge and challengeable:
+            self._challenge_audited(challengeable)
+        return report
+
+    def _challenge_audited(self, challengeable) -> None:
+        """Challenge wrong responses found by an audit and wait for the receipts."""
+        self.challenge_submitter.start()
+        try:
+            for i in range(0, len(challengeable), AUDIT_TX_BATCH_SIZE):
+                chunk = challengeable[i : i + AUDIT_TX_BATCH_SIZE]
+                pub_keys = self.fetch_non_signing_operator_pub_keys(
+                    [response.transaction_hash for _, response in chunk]
+                )
+                for created, response in chunk:
+                    self.process_new_task_created_log(created)
+                    task_index = self.process_task_response_log(
+                        response, pub_keys.get(Web3.to_hex(response.transaction_hash))
+                    )
+                    self._verify_task(task_index)
+
+            deadline = time.monotonic() + float(
+                self.config.get("audit_receipt_timeout", 120)
+            )
+            while self.challenge_submitter.pending() and time.monotonic() < deadline:
+                time.sleep(1)
+        finally:
+            self.challenge_submitter.stop()
+
+    def get_non_signing_operator_pub_keys(self, task_response_log):
+        """Get public keys of non-signing operators, None if not fetched."""
+        tx_hash = task_response_log.transaction_hash
+        return self.fetch_non_signing_operator_pub_keys([tx_hash]).get(
+            Web3.to_hex(tx_hash)
+        )
+
+    def fetch_non_signing_operator_pub_keys(self, tx_hashes) -> dict[str, list[dict]]:
+        """Get the non-signer public keys of many responding transactions.
+
+        Keys are returned by hex transaction hash. Transactions missing from the
+        cache are fetched in one JSON-RPC batch request, decoded and cached. If
+        the batch fails they are fetched one by one, and those that fail again
+        are left out of the result.
+        """
+        tx_hashes = list(dict.fromkeys(Web3.to_hex(h) for h in tx_hashes))
+        result = self.tx_cache.get_many(tx_hashes)
+        missing = [tx_hash for tx_hash in tx_hashes if tx_hash not in result]
+        if not missing:
+            return result
+
+        try:
+            with self.eth_http_client.batch_requests() as batch:
+                for tx_hash in missing:
+                    batch.add(self.eth_http_client.eth.get_transaction(tx_hash))
+                transactions = batch.execute()
+        except Exception as e:
+            logger.warning(
+                f"Batch request for {len(missing)} transactions failed, "
+                f"fetching them one by one: {str(e)}"
+            )
+            transactions = [self._get_transaction(tx_hash) for tx_hash in missing]
+
+        fetched = {
+            tx_hash: self._decode_non_signer_pub_keys(tx)
+            for tx_hash, tx in zip(missing, transactions)
+            if tx is not None
+        }
+        self.tx_cache.put_many(fetched)
+        result.update(fetched)
         return result
 
+    def _get_transaction(self, tx_hash):
+        try:
+            return self.eth_http_client.eth.get_transaction(tx_hash)
+        except Exception as e:
+            logger.error(f"Failed to fetch transaction {tx_hash}: {str(e)}")
+            return None
+
+    @staticmethod
+    def _decode_non_signer_pub_keys(tx) -> list[dict]:
+        call = task_manager_codec().decode_respond_call(tx["input"])
+        return [{"X": x, "Y": y} for x, y in call.non_signer_pubkeys]
+
     def raise_challenge(self, task_index: int) -> None:
         """Raise a challenge for a given task."""
+        joined = self.join_buffer.joined(task_index)
+        if joined is None:
+            raise TaskNotFoundError()
+        task, task_response_data = joined
+        if not self._claim_challenge(task_index):
+            return
+
         logger.debug("Challenger raising challenge.", extra={"taskIndex": task_index})
-        logger.debug("Task", extra={"Task": self.tasks[task_index]})
+        logger.debug("Task", extra={"Task": task})
         logger.debug(
             "TaskResponse",
-            extra={"TaskResponse": self.task_responses[task_index].task_response},
+            extra={"TaskResponse": task_response_data.task_response},
         )
         logger.debug(
             "TaskResponseMetadata",
-            extra={
-                "TaskResponseMetadata": self.task_responses[
-                    task_index
-                ].task_response_metadata
-            },
+            extra={"TaskResponseMetadata": task_response_data.task_response_metadata},
         )
         logger.debug(
             "NonSigningOperatorPubKeys",
             extra={
-                "NonSigningOperatorPubKeys": self.task_responses[
-                    task_index
-                ].non_signing_operator_pub_keys
+                "NonSigningOperatorPubKeys": task_response_data.non_signing_operator_pub_keys
             },
         )
 
-        tx = self.task_manager.functions.raiseAndResolveChallenge(
-            self.tasks[task_index].to_tuple(),
-            self.task_responses[task_index].task_response.to_tuple(),
-            self.task_responses[task_index].task_response_metadata.to_tuple(),
-            self.task_responses[task_index].non_signing_operator_pub_keys,
-        ).build_transaction(
-            {
-                "from": self.challenger_address,
-                "gas": 2000000,
-                "gasPrice": self.eth_http_client.to_wei("20", "gwei"),
-                "nonce": self.eth_http_client.eth.get_transaction_count(
-                    self.challenger_address
-                ),
-                "chainId": self.eth_http_client.eth.chain_id,
-            }
+        contract_function = self._challenge_function(
+            self.task_manager, task, task_response_data
         )
-        signed_tx = self.eth_http_client.eth.account.sign_transaction(
-            tx, private_key=self.challenger_ecdsa_private_key
-        )
-        tx_hash = self.eth_http_client.eth.send_raw_transaction(
-            signed_tx.raw_transaction
+        try:
+            gas = self._preflight_challenge(contract_function)
+            tx_hash = self.challenge_submitter.submit(
+                contract_function,
+                gas=gas,
+                on_receipt=lambda receipt: self._on_challenge_receipt(
+                    task_index, receipt
+                ),
+            )
+            self.metrics.inc("challenges_sent")
+        except Exception:
+            self._release_challenge(task_index)
+            raise
+        logger.debug("Challenge sent", extra={"challengeTxHash": tx_hash.hex()})
+
+    def _claim_challenge(self, task_index: int) -> bool:
+        """Mark a challenge in flight; False if one already is for the task."""
+        with self._challenges_lock:
+            if task_index in self._challenges_in_flight:
+                logger.debug(f"Challenge for task {task_index} already in flight")
+                return False
+            self._challenges_in_flight.add(task_index)
+            return True
+
+    def _release_challenge(self, task_index: int) -> None:
+        with self._challenges_lock:
+            self._challenges_in_flight.discard(task_index)
+
+    @staticmethod
+    def _challenge_function(task_manager, task, task_response_data):
+        return task_manager.functions.raiseAndResolveChallenge(
+            task.to_tuple(),
+            task_response_data.task_response.to_tuple(),
+            task_response_data.task_response_metadata.to_tuple(),
+            task_response_data.non_signing_operator_pub_keys,
         )
-        receipt = self.eth_http_client.eth.wait_for_transaction_receipt(tx_hash)
+
+    def _preflight_challenge(self, contract_function) -> int:
+        """Simulate a challenge at the latest block and return its gas limit.
+
+        The challenge is run through eth_call and its gas estimated first, so
+        one that would revert is never broadcast. Reverts whose cause may clear
+        up, like an RPC failure or a response not yet visible to the node, are
+        retried a few times before the challenge is dropped.
+        """
+        retries = int(self.config.get("challenge_preflight_retries", 3))
+        retry_delay = float(self.config.get("challenge_preflight_retry_delay", 2))
+        for attempt in range(retries + 1):
+            self.metrics.inc("challenges_simulated")
+            try:
+                contract_function.call(
+                    {"from": self.challenger_address}, block_identifier="latest"
+                )
+                gas = contract_function.estimate_gas(
+                    {"from": self.challenger_address}, block_identifier="latest"
+                )
+                return int(gas * GAS_ESTIMATE_MARGIN)
+            except Exception as e:
+                reason, retriable = classify_challenge_revert(str(e))
+                if not retriable or attempt == retries:
+                    self.metrics.inc("reverts_avoided")
+                    self.metrics.inc(f"reverts_avoided.{reason}")
+                    raise ChallengeWouldRevertError(reason, str(e)) from e
+                logger.debug(
+                    f"Challenge simulation failed ({reason}), retrying: {str(e)}"
+                )
+                time.sleep(retry_delay)
+
+    def _on_challenge_receipt(self, task_index: int, receipt) -> None:
+        self._release_challenge(task_index)
+        if receipt["status"] != 1:
+            self.metrics.inc("challenges_reverted")
+            logger.error(
+                f"Challenge for task {task_index} reverted: "
+                f"{receipt['transactionHash'].hex()}"
+            )
+            return
         logger.debug(
             "Challenge raised",
             extra={"challengeTxHash": receipt["transactionHash"].hex()},
         )
-        self.challenge_hashes[task_index] = receipt["transactionHash"].hex()
+        self.join_buffer.resolve(task_index, receipt["transactionHash"].hex())
 
     def _load_ecdsa_key(self):
         """Load the ECDSA private key"""
@@ -399,6 +918,7 @@ class Challenger:
             delegation_manager_addr=self.config["delegation_manager_address"],
         )
         self.clients = build_all(cfg, self.challenger_ecdsa_private_key)
+        share_provider(self.clients, load_provider(self.config))
         self.avs_registry_reader = self.clients.avs_registry_reader
         self.avs_registry_writer = self.clients.avs_registry_writer
         self.el_reader = self.clients.el_reader
@@ -409,19 +929,22 @@ class Challenger:
     def _load_task_manager(self):
         """Load the task manager contract."""
         service_manager_address = self.clients.avs_registry_writer.service_manager_addr
-        with open("abis/IncredibleSquaringServiceManager.json") as f:
-            service_manager_abi = f.read()
         service_manager = self.eth_http_client.eth.contract(
-            address=service_manager_address, abi=service_manager_abi
+            address=service_manager_address,
+            abi=load_abi("IncredibleSquaringServiceManager"),
         )
 
         task_manager_address = (
             service_manager.functions.incredibleSquaringTaskManager().call()
         )
-        with open("abis/IncredibleSquaringTaskManager.json") as f:
-            task_manager_abi = f.read()
         self.task_manager = self.eth_http_client.eth.contract(
-            address=task_manager_address, abi=task_manager_abi
+            address=task_manager_address, abi=load_abi("IncredibleSquaringTaskManager")
+        )
+        self.task_response_window_block = (
+            self.task_manager.functions.TASK_RESPONSE_WINDOW_BLOCK().call()
+        )
+        self.task_challenge_window_block = (
+            self.task_manager.functions.TASK_CHALLENGE_WINDOW_BLOCK().call()
         )
         logger.debug(f"Task manager loaded at address: {task_manager_address}")
 
@@ -443,5 +966,40 @@ if __name__ == "__main__":
     with open(avs_config_path, "r") as f:
         avs_config = yaml.load(f, Loader=yaml.BaseLoader)
 
+    parser = argparse.ArgumentParser(description="Incredible squaring challenger")
+    parser.add_argument(
+        "--audit",
+        action="store_true",
+        help="verify the task responses of a block range and exit",
+    )
+    parser.add_argument(
+        "--from-block",
+        type=int,
+        default=None,
+        help="first block to audit, by default the oldest still challengeable",
+    )
+    parser.add_argument("--to-block", type=int, default=None)
+    parser.add_argument(
+        "--no-challenge",
+        action="store_true",
+        help="only report wrong responses found by the audit",
+    )
+    parser.add_argument("--report", help="write the audit report to this JSON file")
+    args = parser.parse_args()
+
+    configure_logging(
+        challenger_config.get("log_level", "INFO"),
+        challenger_config.get("log_format") == "json",
+    )
     challenger = Challenger(config={**challenger_config, **avs_config})
-    challenger.start()
+    if args.audit:
+        report = challenger.audit(
+            args.from_block, args.to_block, challenge=not args.no_challenge
+        )
+        if args.report:
+            with open(args.report, "w") as f:
+                json.dump(report, f, indent=2)
+        else:
+            print(json.dumps(report, indent=2))
+    else:
+        challenger.start()
@@ -0,0 +1,335 @@
+import asyncio
+import os
+
+import yaml
+from web3 import AsyncWeb3, Web3
+
+from challenger import (
+    GAS_ESTIMATE_MARGIN,
+    Challenger,
+    ChallengeWouldRevertError,
+    TaskNotFoundError,
+    classify_challenge_revert,
+)
+from core.abi import load_abi, task_manager_codec
+from core.ingestion import AsyncEventIngestor
+from core.log import configure_logging, get_logger
+from core.rpc import load_async_provider
+
+logger = get_logger(__name__)
+
+
+class AsyncChallenger(Challenger):
+    """Runs the challenger loop on asyncio.
+
+    NewTaskCreated and TaskResponded events are read through an async web3
+    provider and processed concurrently; responding transactions are fetched
+    and challenges simulated, sent and awaited with async RPC calls, so a slow
+    call only holds back the task it belongs to. Every RPC call is bounded by
+    ``rpc_timeout`` and at most ``rpc_concurrency`` of them run at once.
+
+    Verdicts still come from ``call_challenge_module``; only the challenges it
+    raises are sent asynchronously.
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.async_web3 = AsyncWeb3(load_async_provider(self.config))
+        self.async_task_manager = self.async_web3.eth.contract(
+            address=self.task_manager.address,
+            abi=load_abi("IncredibleSquaringTaskManager"),
+        )
+        self.rpc_timeout = float(self.config.get("rpc_timeout", 10))
+        self._loop = None
+        self._rpc_slots = None
+        self._challenge_slots = None
+        self._nonce_lock = None
+        self._nonce = None
+        self._chain_id = None
+        self._challenges = set()
+
+    def start(self) -> None:
+        """Start the challenger service."""
+        asyncio.run(self.run())
+
+    async def run(self) -> None:
+        """Run the challenger until ``stop`` is called."""
+        logger.debug("Starting async Challenger.")
+
+        self._loop = asyncio.get_running_loop()
+        self._rpc_slots = asyncio.Semaphore(int(self.config.get("rpc_concurrency", 32)))
+        self._challenge_slots = asyncio.Semaphore(
+            int(self.config.get("max_in_flight_challenges", 16))
+        )
+        self._nonce_lock = asyncio.Lock()
+
+        codec = task_manager_codec()
+        ingestor = AsyncEventIngestor(
+            self.async_web3,
+            self.task_manager.address,
+            codec.decode_log,
+            reorg_depth=int(self.config.get("reorg_depth", 64)),
+            min_poll_interval=float(self.config.get("min_poll_interval", 0.5)),
+            max_poll_interval=float(self.config.get("max_poll_interval", 12)),
+        )
+        new_task_events = []
+        task_response_events = []
+        ingestor.subscribe(
+            codec.new_task_created_topic,
+            new_task_events.append,
+            self._on_task_removed,
+        )
+        ingestor.subscribe(
+            codec.task_responded_topic,
+            task_response_events.append,
+            self._on_task_response_removed,
+        )
+
+        async def on_poll(_):
+            created = list(new_task_events)
+            responded = list(task_response_events)
+            new_task_events.clear()
+            task_response_events.clear()
+            await self.fetch_missing_pub_keys_async()
+            await asyncio.gather(
+                self._process_new_task_created_events_async(created),
+                self._process_task_response_events_async(responded),
+            )
+
+            self._latest_block = max(self._latest_block, ingestor.last_block)
+            self.join_buffer.expire(self._latest_block)
+            self.save_checkpoint(ingestor.last_block)
+
+        try:
+            # the catch-up uses the synchronous client, off the event loop
+            await self._loop.run_in_executor(
+                None, self._resume_from_checkpoint, codec, ingestor
+            )
+            logger.debug("Listening for new events...")
+            await ingestor.run(lambda: self._stop_flag, on_poll)
+        finally:
+            await asyncio.gather(
+                *(
+                    asyncio.wrap_future(challenge)
+                    for challenge in list(self._challenges)
+                ),
+                return_exceptions=True,
+            )
+
+    async def _process_new_task_created_events_async(self, events) -> None:
+        self.process_new_task_created_events(events)
+
+    async def _process_task_response_events_async(self, events) -> None:
+        # responses whose transaction could not be fetched are buffered
+        # without their non-signer keys, retried on every poll
+        try:
+            non_signing_operator_pub_keys = (
+                await self.fetch_non_signing_operator_pub_keys_async(
+                    [event.transaction_hash for event in events]
+                )
+            )
+        except Exception as e:
+            logger.error(f"Failed to fetch responding transactions: {str(e)}")
+            non_signing_operator_pub_keys = {}
+        for event in events:
+            pub_keys = non_signing_operator_pub_keys.get(
+                Web3.to_hex(event.transaction_hash)
+            )
+            try:
+                task_index = self.process_task_response_log(event, pub_keys)
+                self.check_task(task_index)
+            except Exception as e:
+                logger.error(f"Unexpected error processing task response: {str(e)}")
+
+    async def fetch_missing_pub_keys_async(self) -> None:
+        """Fetch the non-signer keys of buffered responses that lack them."""
+        missing = self._responses_missing_pub_keys()
+        if not missing:
+            return
+        try:
+            pub_keys = await self.fetch_non_signing_operator_pub_keys_async(
+                [
+                    Web3.to_bytes(hexstr=response.transaction_hash)
+                    for _, response in missing
+                ]
+            )
+        except Exception as e:
+            logger.error(f"Failed to fetch responding transactions: {str(e)}")
+            return
+        self._fill_pub_keys(missing, pub_keys)
+
+    async def fetch_non_signing_operator_pub_keys_async(
+        self, tx_hashes
+    ) -> dict[str, list[dict]]:
+        """Get the non-signer public keys of many responding transactions.
+
+        Transactions missing from the cache are fetched concurrently; those that
+        fail or time out are left out of the result.
+        """
+        tx_hashes = list(dict.fromkeys(Web3.to_hex(h) for h in tx_hashes))
+        result = self.tx_cache.get_many(tx_hashes)
+        missing = [tx_hash for tx_hash in tx_hashes if tx_hash not in result]
+        if not missing:
+            return result
+
+        transactions = await asyncio.gather(
+            *(self._rpc(self.async_web3.eth.get_transaction(h)) for h in missing),
+            return_exceptions=True,
+        )
+        fetched = {}
+        for tx_hash, tx in zip(missing, transactions):
+            if isinstance(tx, Exception):
+                logger.error(f"Failed to fetch transaction {tx_hash}: {str(tx)}")
+                continue
+            fetched[tx_hash] = self._decode_non_signer_pub_keys(tx)
+        self.tx_cache.put_many(fetched)
+        result.update(fetched)
+        return result
+
+    def raise_challenge(self, task_index: int) -> None:
+        """Schedule a challenge for a given task on the event loop."""
+        challenge = asyncio.run_coroutine_threadsafe(
+            self.raise_challenge_async(task_index), self._loop
+        )
+        self._challenges.add(challenge)
+        challenge.add_done_callback(self._challenges.discard)
+
+    async def raise_challenge_async(self, task_index: int) -> None:
+        """Simulate, send and await a challenge for a given task."""
+        joined = self.join_buffer.joined(task_index)
+        if joined is None:
+            logger.error(f"Error in challenge module: {TaskNotFoundError()}")
+            return
+        task, task_response_data = joined
+        if not self._claim_challenge(task_index):
+            return
+
+        logger.debug(
+            "Challenger raising challenge.",
+            taskIndex=task_index,
+            sample_every=self.log_sample_every,
+        )
+        contract_function = self._challenge_function(
+            self.async_task_manager, task, task_response_data
+        )
+        try:
+            async with self._challenge_slots:
+                gas = await self._preflight_challenge_async(contract_function)
+                tx_hash = await self._send_transaction_async(contract_function, gas)
+                self.metrics.inc("challenges_sent")
+                logger.debug(
+                    "Challenge sent",
+                    challengeTxHash=tx_hash.hex(),
+                    sample_every=self.log_sample_every,
+                )
+                receipt = await self.async_web3.eth.wait_for_transaction_receipt(
+                    tx_hash,
+                    timeout=float(self.config.get("challenge_receipt_timeout", 120)),
+                    poll_latency=float(self.config.get("receipt_poll_interval", 1)),
+                )
+        except ChallengeWouldRevertError as e:
+            self._release_challenge(task_index)
+            logger.warning(f"Dropped challenge for task {task_index}: {str(e)}")
+            if e.reason == "already_challenged":
+                self.join_buffer.resolve(task_index)
+            return
+        except Exception as e:
+            self._release_challenge(task_index)
+            logger.error(f"Failed to raise challenge for task {task_index}: {str(e)}")
+            return
+        self._on_challenge_receipt(task_index, receipt)
+
+    async def _preflight_challenge_async(self, contract_function) -> int:
+        """Simulate a challenge at the latest block and return its gas limit."""
+        retries = int(self.config.get("challenge_preflight_retries", 3))
+        retry_delay = float(self.config.get("challenge_preflight_retry_delay", 2))
+        for attempt in range(retries + 1):
+            self.metrics.inc("challenges_simulated")
+            try:
+                await self._rpc(
+                    contract_function.call(
+                        {"from": self.challenger_address}, block_identifier="latest"
+                    )
+                )
+                gas = await self._rpc(
+                    contract_function.estimate_gas(
+                        {"from": self.challenger_address}, block_identifier="latest"
+                    )
+                )
+                return int(gas * GAS_ESTIMATE_MARGIN)
+            except Exception as e:
+                reason, retriable = classify_challenge_revert(str(e))
+                if not retriable or attempt == retries:
+                    self.metrics.inc("reverts_avoided")
+                    self.metrics.inc(f"reverts_avoided.{reason}")
+                    raise ChallengeWouldRevertError(reason, str(e)) from e
+                logger.debug(
+                    f"Challenge simulation failed ({reason}), retrying: {str(e)}"
+                )
+                await asyncio.sleep(retry_delay)
+
+    async def _send_transaction_async(self, contract_function, gas):
+        """Sign and send a contract call with a locally assigned nonce."""
+        async with self._nonce_lock:
+            if self._chain_id is None:
+                self._chain_id = await self._rpc(self.async_web3.eth.chain_id)
+            if self._nonce is None:
+                self._nonce = await self._rpc(
+                    self.async_web3.eth.get_transaction_count(
+                        self.challenger_address, "pending"
+                    )
+                )
+            tx = await self._rpc(
+                contract_function.build_transaction(
+                    {
+                        "from": self.challenger_address,
+                        "gas": gas,
+                        "gasPrice": Web3.to_wei("20", "gwei"),
+                        "nonce": self._nonce,
+                        "chainId": self._chain_id,
+                    }
+                )
+            )
+            signed_tx = self.async_web3.eth.account.sign_transaction(
+                tx, private_key=self.challenger_ecdsa_private_key
+            )
+            try:
+                tx_hash = await self._rpc(
+                    self.async_web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+                )
+            except Exception:
+                # the local nonce may have drifted from the node's, resync it
+                self._nonce = None
+                raise
+            self._nonce += 1
+            return tx_hash
+
+    async def _rpc(self, awaitable):
+        """Await an RPC call within the concurrency limit and the RPC timeout."""
+        async with self._rpc_slots:
+            return await asyncio.wait_for(awaitable, timeout=self.rpc_timeout)
+
+
+if __name__ == "__main__":
+    dir_path = os.path.dirname(os.path.abspath(__file__))
+
+    challenger_config_path = os.path.join(dir_path, "./config-files/challenger.yaml")
+    if not os.path.exists(challenger_config_path):
+        logger.error(f"Config file not found at: {challenger_config_path}")
+        raise FileNotFoundError(f"Config file not found at: {challenger_config_path}")
+    with open(challenger_config_path, "r") as f:
+        challenger_config = yaml.load(f, Loader=yaml.BaseLoader)
+
+    avs_config_path = os.path.join(dir_path, "./config-files/avs.yaml")
+    if not os.path.exists(avs_config_path):
+        logger.error(f"Config file not found at: {avs_config_path}")
+        raise FileNotFoundError(f"Config file not found at: {avs_config_path}")
+    with open(avs_config_path, "r") as f:
+        avs_config = yaml.load(f, Loader=yaml.BaseLoader)
+
+    configure_logging(
+        challenger_config.get("log_level", "INFO"),
+        challenger_config.get("log_format") == "json",
+    )
+    challenger = AsyncChallenger(config={**challenger_config, **avs_config})
+    challenger.start()
@@ -14,6 +14,7 @@ import {BLSSignatureChecker} from "@eigenlayer-middleware/src/BLSSignatureChecke
 import {OperatorStateRetriever} from "@eigenlayer-middleware/src/OperatorStateRetriever.sol";
 import {InstantSlasher} from "@eigenlayer-middleware/src/slashers/InstantSlasher.sol";
 import "@eigenlayer-middleware/src/libraries/BN254.sol";
+import {MerkleProof} from "@openzeppelin/contracts/utils/cryptography/MerkleProof.sol";
 // import {IStrategy} from "@eigenlayer/contracts/interfaces/IStrategy.sol";
 import "./IIncredibleSquaringTaskManager.sol";
 import {IAllocationManagerTypes} from "@eigenlayer/contracts/interfaces/IAllocationManager.sol";
@@ -101,17 +102,20 @@ contract IncredibleSquaringTaskManager is
         uint32 quorumThresholdPercentage,
         bytes calldata quorumNumbers
     ) external onlyTaskGenerator {
-        // create a new task struct
-        Task memory newTask;
-        newTask.numberToBeSquared = numberToBeSquared;
-        newTask.taskCreatedBlock = uint32(block.number);
-        newTask.quorumThresholdPercentage = quorumThresholdPercentage;
-        newTask.quorumNumbers = quorumNumbers;
+        _createNewTask(numberToBeSquared, quorumThresholdPercentage, quorumNumbers);
+    }
 
-        // store hash of task onchain, emit event, and increase taskNum
-        allTaskHashes[latestTaskNum] = keccak256(abi.encode(newTask));
-        emit NewTaskCreated(latestTaskNum, newTask);
-        latestTaskNum = latestTaskNum + 1;
+    // creates one task per number, all sharing the same quorums and threshold,
+    // and emits a NewTaskCreated event for each of them
+    function createNewTasks(
+        uint256[] calldata numbersToBeSquared,
+        uint32 quorumThresholdPercentage,
+        bytes calldata quorumNumbers
+    ) external onlyTaskGenerator {
+        require(numbersToBeSquared.length > 0, "No numbers to be squared");
+        for (uint256 i = 0; i < numbersToBeSquared.length; i++) {
+            _createNewTask(numbersToBeSquared[i], quorumThresholdPercentage, quorumNumbers);
+        }
     }
 
     // NOTE: this function responds to existing tasks.
@@ -120,52 +124,150 @@ contract IncredibleSquaringTaskManager is
         TaskResponse calldata taskResponse,
         NonSignerStakesAndSignature memory nonSignerStakesAndSignature
     ) external onlyAggregator {
-        uint32 taskCreatedBlock = task.taskCreatedBlock;
-        bytes calldata quorumNumbers = task.quorumNumbers;
-        uint32 quorumThresholdPercentage = task.quorumThresholdPercentage;
-
-        // check that the task is valid, hasn't been responsed yet, and is being responsed in time
-        require(
-            keccak256(abi.encode(task)) == allTaskHashes[taskResponse.referenceTaskIndex],
-            "supplied task does not match the one recorded in the contract"
-        );
-        // some logical checks
-        require(
-            allTaskResponses[taskResponse.referenceTaskIndex] == bytes32(0),
-            "Aggregator has already responded to the task"
-        );
-        require(
-            uint32(block.number) <= taskCreatedBlock + TASK_RESPONSE_WINDOW_BLOCK,
-            "Aggregator has responded to the task too late"
-        );
+        _checkTaskCanBeResponded(task, taskResponse);
 
         /* CHECKING SIGNATURES & WHETHER THRESHOLD IS MET OR NOT */
         // calculate message which operators signed
         bytes32 message = keccak256(abi.encode(taskResponse));
 
         // check the BLS signature
-        (QuorumStakeTotals memory quorumStakeTotals, bytes32 hashOfNonSigners) =
-            checkSignatures(message, quorumNumbers, taskCreatedBlock, nonSignerStakesAndSignature);
+        (QuorumStakeTotals memory quorumStakeTotals, bytes32 hashOfNonSigners) = checkSignatures(
+            message, task.quorumNumbers, task.taskCreatedBlock, nonSignerStakesAndSignature
+        );
+        _checkQuorumThreshold(
+            quorumStakeTotals, task.quorumNumbers, task.quorumThresholdPercentage
+        );
 
-        // check that signatories own at least a threshold percentage of each quourm
-        for (uint256 i = 0; i < quorumNumbers.length; i++) {
-            // we don't check that the quorumThresholdPercentages are not >100 because a greater value would trivially fail the check, implying
-            // signed stake > total stake
+        _recordTaskResponse(
+            taskResponse, TaskResponseMetadata(uint32(block.number), hashOfNonSigners)
+        );
+    }
+
+    // NOTE: this function responds to a batch of tasks created in the same block.
+    // Operators sign the merkle root of the batch's task responses (leaves are
+    // keccak256(abi.encode(taskResponse)), pairs are hashed sorted), so the signature
+    // is checked once for the whole batch and every response comes with an inclusion proof.
+    function respondToTaskBatch(
+        Task[] calldata tasks,
+        TaskResponse[] calldata taskResponses,
+        bytes32[][] calldata proofs,
+        bytes32 batchRoot,
+        NonSignerStakesAndSignature memory nonSignerStakesAndSignature
+    ) external onlyAggregator {
+        require(tasks.length > 0, "Batch must contain at least one task");
+        require(
+            tasks.length == taskResponses.length && tasks.length == proofs.length,
+            "Batch tasks, responses and proofs must have the same length"
+        );
+
+        Task calldata firstTask = tasks[0];
+        for (uint256 i = 0; i < tasks.length; i++) {
+            // sorted indices rule out responding to the same task twice in a batch
             require(
-                quorumStakeTotals.signedStakeForQuorum[i] * _THRESHOLD_DENOMINATOR
-                    >= quorumStakeTotals.totalStakeForQuorum[i] * uint8(quorumThresholdPercentage),
-                "Signatories do not own at least threshold percentage of a quorum"
+                i == 0
+                    || taskResponses[i].referenceTaskIndex
+                        > taskResponses[i - 1].referenceTaskIndex,
+                "Batched task responses must be sorted by task index"
+            );
+            require(
+                tasks[i].taskCreatedBlock == firstTask.taskCreatedBlock
+                    && tasks[i].quorumThresholdPercentage == firstTask.quorumThresholdPercentage
+                    && keccak256(tasks[i].quorumNumbers) == keccak256(firstTask.quorumNumbers),
+                "Batched tasks must share their creation block and quorum parameters"
+            );
+            _checkTaskCanBeResponded(tasks[i], taskResponses[i]);
+            require(
+                MerkleProof.verifyCalldata(
+                    proofs[i], batchRoot, keccak256(abi.encode(taskResponses[i]))
+                ),
+                "Task response is not included in the batch root"
             );
         }
 
+        (QuorumStakeTotals memory quorumStakeTotals, bytes32 hashOfNonSigners) = checkSignatures(
+            batchRoot,
+            firstTask.quorumNumbers,
+            firstTask.taskCreatedBlock,
+            nonSignerStakesAndSignature
+        );
+        _checkQuorumThreshold(
+            quorumStakeTotals, firstTask.quorumNumbers, firstTask.quorumThresholdPercentage
+        );
+
         TaskResponseMetadata memory taskResponseMetadata =
             TaskResponseMetadata(uint32(block.number), hashOfNonSigners);
-        // updating the storage with task responsea
-        allTaskResponses[taskResponse.referenceTaskIndex] =
-            keccak256(abi.encode(taskResponse, taskResponseMetadata));
+        for (uint256 i = 0; i < taskResponses.length; i++) {
+            _recordTaskResponse(taskResponses[i], taskResponseMetadata);
+        }
+    }
 
-        // emitting event
-        emit TaskResponded(taskResponse, taskResponseMetadata);
+    // NOTE: this function responds to several tasks created in the same block and signed
+    // by the same operators, each with its own aggregate signature. Sharing the non-signer
+    // set means the quorum stake totals and the signers' aggregate public key are the same
+    // for every task, so the registry lookups of checkSignatures run once and every other
+    // task only costs a pairing check of its own signature.
+    function respondToTasks(
+        Task[] calldata tasks,
+        TaskResponse[] calldata taskResponses,
+        BN254.G1Point[] calldata signatures,
+        NonSignerStakesAndSignature memory nonSignerStakesAndSignature
+    ) external onlyAggregator {
+        require(tasks.length > 0, "Batch must contain at least one task");
+        require(
+            tasks.length == taskResponses.length && tasks.length == signatures.length,
+            "Batch tasks, responses and signatures must have the same length"
+        );
+
+        Task calldata firstTask = tasks[0];
+        // the signers' aggregate public key is only rebuilt below for a single quorum
+        require(firstTask.quorumNumbers.length == 1, "Batched tasks must use a single quorum");
+        for (uint256 i = 0; i < tasks.length; i++) {
+            // sorted indices rule out responding to the same task twice in a batch
+            require(
+                i == 0
+                    || taskResponses[i].referenceTaskIndex
+                        > taskResponses[i - 1].referenceTaskIndex,
+                "Batched task responses must be sorted by task index"
+            );
+            require(
+                tasks[i].taskCreatedBlock == firstTask.taskCreatedBlock
+                    && tasks[i].quorumThresholdPercentage == firstTask.quorumThresholdPercentage
+                    && keccak256(tasks[i].quorumNumbers) == keccak256(firstTask.quorumNumbers),
+                "Batched tasks must share their creation block and quorum parameters"
+            );
+            _checkTaskCanBeResponded(tasks[i], taskResponses[i]);
+        }
+
+        // the first task goes through the full check, which also validates the quorum
+        // apks, non-signers and apkG2 shared by the rest of the batch
+        nonSignerStakesAndSignature.sigma = signatures[0];
+        (QuorumStakeTotals memory quorumStakeTotals, bytes32 hashOfNonSigners) = checkSignatures(
+            keccak256(abi.encode(taskResponses[0])),
+            firstTask.quorumNumbers,
+            firstTask.taskCreatedBlock,
+            nonSignerStakesAndSignature
+        );
+        _checkQuorumThreshold(
+            quorumStakeTotals, firstTask.quorumNumbers, firstTask.quorumThresholdPercentage
+        );
+
+        BN254.G1Point memory signersApk = _signersApk(nonSignerStakesAndSignature);
+        for (uint256 i = 1; i < tasks.length; i++) {
+            (bool pairingSuccessful, bool signatureIsValid) = trySignatureAndApkVerification(
+                keccak256(abi.encode(taskResponses[i])),
+                signersApk,
+                nonSignerStakesAndSignature.apkG2,
+                signatures[i]
+            );
+            require(pairingSuccessful, "Pairing precompile call failed");
+            require(signatureIsValid, "Signature of a batched task response is invalid");
+        }
+
+        TaskResponseMetadata memory taskResponseMetadata =
+            TaskResponseMetadata(uint32(block.number), hashOfNonSigners);
+        for (uint256 i = 0; i < taskResponses.length; i++) {
+            _recordTaskResponse(taskResponses[i], taskResponseMetadata);
+        }
     }
 
     function taskNumber() external view returns (uint32) {
@@ -289,4 +391,83 @@ contract IncredibleSquaringTaskManager is
     function getTaskResponseWindowBlock() external view returns (uint32) {
         return TASK_RESPONSE_WINDOW_BLOCK;
     }
+
+    function _createNewTask(
+        uint256 numberToBeSquared,
+        uint32 quorumThresholdPercentage,
+        bytes calldata quorumNumbers
+    ) internal {
+        // create a new task struct
+        Task memory newTask;
+        newTask.numberToBeSquared = numberToBeSquared;
+        newTask.taskCreatedBlock = uint32(block.number);
+        newTask.quorumThresholdPercentage = quorumThresholdPercentage;
+        newTask.quorumNumbers = quorumNumbers;
+
+        // store hash of task onchain, emit event, and increase taskNum
+        allTaskHashes[latestTaskNum] = keccak256(abi.encode(newTask));
+        emit NewTaskCreated(latestTaskNum, newTask);
+        latestTaskNum = latestTaskNum + 1;
+    }
+
+    function _checkTaskCanBeResponded(
+        Task calldata task,
+        TaskResponse calldata taskResponse
+    ) internal view {
+        // check that the task is valid, hasn't been responsed yet, and is being responsed in time
+        require(
+            keccak256(abi.encode(task)) == allTaskHashes[taskResponse.referenceTaskIndex],
+            "supplied task does not match the one recorded in the contract"
+        );
+        // some logical checks
+        require(
+            allTaskResponses[taskResponse.referenceTaskIndex] == bytes32(0),
+            "Aggregator has already responded to the task"
+        );
+        require(
+            uint32(block.number) <= task.taskCreatedBlock + TASK_RESPONSE_WINDOW_BLOCK,
+            "Aggregator has responded to the task too late"
+        );
+    }
+
+    function _checkQuorumThreshold(
+        QuorumStakeTotals memory quorumStakeTotals,
+        bytes calldata quorumNumbers,
+        uint32 quorumThresholdPercentage
+    ) internal pure {
+        // check that signatories own at least a threshold percentage of each quourm
+        for (uint256 i = 0; i < quorumNumbers.length; i++) {
+            // we don't check that the quorumThresholdPercentages are not >100 because a greater value would trivially fail the check, implying
+            // signed stake > total stake
+            require(
+                quorumStakeTotals.signedStakeForQuorum[i] * _THRESHOLD_DENOMINATOR
+                    >= quorumStakeTotals.totalStakeForQuorum[i] * uint8(quorumThresholdPercentage),
+                "Signatories do not own at least threshold percentage of a quorum"
+            );
+        }
+    }
+
+    // aggregate public key of the signers of a single quorum: the quorum apk minus the
+    // pubkeys of the non-signers, as computed by checkSignatures
+    function _signersApk(
+        NonSignerStakesAndSignature memory nonSignerStakesAndSignature
+    ) internal view returns (BN254.G1Point memory signersApk) {
+        signersApk = nonSignerStakesAndSignature.quorumApks[0];
+        for (uint256 i = 0; i < nonSignerStakesAndSignature.nonSignerPubkeys.length; i++) {
+            signersApk =
+                signersApk.plus(nonSignerStakesAndSignature.nonSignerPubkeys[i].negate());
+        }
+    }
+
+    function _recordTaskResponse(
+        TaskResponse calldata taskResponse,
+        TaskResponseMetadata memory taskResponseMetadata
+    ) internal {
+        // updating the storage with task responsea
+        allTaskResponses[taskResponse.referenceTaskIndex] =
+            keccak256(abi.encode(taskResponse, taskResponseMetadata));
+
+        // emitting event
+        emit TaskResponded(taskResponse, taskResponseMetadata);
+    }
 }
@@ -3,6 +3,7 @@ pragma solidity ^0.8.12;
 
 import "../src/IncredibleSquaringServiceManager.sol" as incsqsm;
 import {IncredibleSquaringTaskManager} from "../src/IncredibleSquaringTaskManager.sol";
+import {BN254} from "@eigenlayer-middleware/src/libraries/BN254.sol";
 import "@eigenlayer/contracts/permissions/PauserRegistry.sol";
 import "@eigenlayer/contracts/interfaces/IPauserRegistry.sol";
 import {BLSMockAVSDeployer} from "@eigenlayer-middleware/test/utils/BLSMockAVSDeployer.sol";
@@ -58,4 +59,59 @@ contract IncredibleSquaringTaskManagerTest is BLSMockAVSDeployer {
         tm.createNewTask(2, 100, quorumNumbers);
         assertEq(tm.latestTaskNum(), 1);
     }
+
+    function testCreateNewTasks() public {
+        bytes memory quorumNumbers = new bytes(0);
+        uint256[] memory numbersToBeSquared = new uint256[](3);
+        numbersToBeSquared[0] = 2;
+        numbersToBeSquared[1] = 3;
+        numbersToBeSquared[2] = 4;
+        cheats.prank(generator, generator);
+        tm.createNewTasks(numbersToBeSquared, 100, quorumNumbers);
+        assertEq(tm.latestTaskNum(), 3);
+    }
+
+    function testRespondToTaskBatchRejectsMismatchedLengths() public {
+        bytes memory quorumNumbers = new bytes(0);
+        cheats.prank(generator, generator);
+        tm.createNewTask(2, 100, quorumNumbers);
+
+        IncredibleSquaringTaskManager.Task[] memory tasks =
+            new IncredibleSquaringTaskManager.Task[](1);
+        tasks[0] = IncredibleSquaringTaskManager.Task(2, uint32(block.number), quorumNumbers, 100);
+        IncredibleSquaringTaskManager.TaskResponse[] memory taskResponses =
+            new IncredibleSquaringTaskManager.TaskResponse[](1);
+        taskResponses[0] = IncredibleSquaringTaskManager.TaskResponse(0, 4);
+        bytes32[][] memory proofs = new bytes32[][](0);
+        IncredibleSquaringTaskManager.NonSignerStakesAndSignature memory nonSignerStakesAndSignature;
+
+        cheats.prank(aggregator, aggregator);
+        cheats.expectRevert("Batch tasks, responses and proofs must have the same length");
+        tm.respondToTaskBatch(
+            tasks,
+            taskResponses,
+            proofs,
+            keccak256(abi.encode(taskResponses[0])),
+            nonSignerStakesAndSignature
+        );
+    }
+
+    function testRespondToTasksRejectsMismatchedLengths() public {
+        bytes memory quorumNumbers = new bytes(1);
+        cheats.prank(generator, generator);
+        tm.createNewTask(2, 100, quorumNumbers);
+
+        IncredibleSquaringTaskManager.Task[] memory tasks =
+            new IncredibleSquaringTaskManager.Task[](1);
+        tasks[0] = IncredibleSquaringTaskManager.Task(2, uint32(block.number), quorumNumbers, 100);
+        IncredibleSquaringTaskManager.TaskResponse[] memory taskResponses =
+            new IncredibleSquaringTaskManager.TaskResponse[](1);
+        taskResponses[0] = IncredibleSquaringTaskManager.TaskResponse(0, 4);
+        BN254.G1Point[] memory signatures = new BN254.G1Point[](0);
+        IncredibleSquaringTaskManager.NonSignerStakesAndSignature memory nonSignerStakesAndSignature;
+
+        cheats.prank(aggregator, aggregator);
+        cheats.expectRevert("Batch tasks, responses and signatures must have the same length");
+        tm.respondToTasks(tasks, taskResponses, signatures, nonSignerStakesAndSignature);
+    }
 }
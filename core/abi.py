@@ -0,0 +1,174 @@
+import functools
+import json
+import os
+from dataclasses import dataclass
+
+from eth_abi.decoding import ContextFramesBytesIO
+from eth_abi.registry import registry
+from web3 import Web3
+
+ABI_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "abis"
+)
+
+
+@functools.cache
+def load_abi(name):
+    """Parsed ABI of ``abis/<name>.json``, read from disk once per process."""
+    with open(os.path.join(ABI_DIR, f"{name}.json")) as f:
+        return json.load(f)
+
+
+def _canonical_type(param):
+    """Canonical ABI type of a parameter, e.g. ``(uint256,uint32)[]`` for a tuple array."""
+    abi_type = param["type"]
+    if not abi_type.startswith("tuple"):
+        return abi_type
+    components = ",".join(_canonical_type(c) for c in param["components"])
+    return f"({components}){abi_type[len('tuple'):]}"
+
+
+def _tuple_decoder(types):
+    decoder = registry.get_tuple_decoder(*types)
+    return lambda data: decoder(ContextFramesBytesIO(bytes(data)))
+
+
+@dataclass(slots=True, frozen=True)
+class TaskRecord:
+    number_to_be_squared: int
+    task_created_block: int
+    quorum_numbers: bytes
+    quorum_threshold_percentage: int
+
+    def to_tuple(self):
+        return (
+            self.number_to_be_squared,
+            self.task_created_block,
+            self.quorum_numbers,
+            self.quorum_threshold_percentage,
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class NewTaskCreatedLog:
+    task_index: int
+    task: TaskRecord
+    block_number: int
+    transaction_hash: bytes
+
+
+@dataclass(slots=True, frozen=True)
+class TaskRespondedLog:
+    reference_task_index: int
+    number_squared: int
+    task_responsed_block: int
+    hash_of_non_signers: bytes
+    block_number: int
+    transaction_hash: bytes
+
+
+@dataclass(slots=True, frozen=True)
+class RespondCall:
+    """Calldata of ``respondToTask`` and its batched variants."""
+
+    function_name: str
+    tasks: tuple
+    task_responses: tuple
+    non_signer_pubkeys: tuple
+
+
+class TaskManagerCodec:
+    """Decoders for the task manager logs and calldata, built once from its ABI.
+
+    Topics, selectors and eth_abi decoders are resolved up front, so decoding a
+    log is a table lookup plus a single decoder call, with no per-log walk of
+    the ABI as web3's contract event and function machinery does.
+    """
+
+    RESPOND_FUNCTIONS = ("respondToTask", "respondToTasks", "respondToTaskBatch")
+
+    def __init__(self, abi):
+        events = {e["name"]: e for e in abi if e["type"] == "event"}
+        functions = {f["name"]: f for f in abi if f["type"] == "function"}
+
+        self.new_task_created_topic = self._topic(events["NewTaskCreated"])
+        self.task_responded_topic = self._topic(events["TaskResponded"])
+        self._log_decoders = {
+            self.new_task_created_topic: (
+                self._data_decoder(events["NewTaskCreated"]),
+                self._new_task_created,
+            ),
+            self.task_responded_topic: (
+                self._data_decoder(events["TaskResponded"]),
+                self._task_responded,
+            ),
+        }
+
+        self._call_decoders = {}
+        for name in self.RESPOND_FUNCTIONS:
+            if name in functions:
+                types = [_canonical_type(p) for p in functions[name]["inputs"]]
+                selector = Web3.keccak(text=f"{name}({','.join(types)})")[:4]
+                self._call_decoders[bytes(selector)] = (name, _tuple_decoder(types))
+
+    @staticmethod
+    def _topic(event):
+        types = ",".join(_canonical_type(p) for p in event["inputs"])
+        return bytes(Web3.keccak(text=f"{event['name']}({types})"))
+
+    @staticmethod
+    def _data_decoder(event):
+        return _tuple_decoder(
+            [_canonical_type(p) for p in event["inputs"] if not p["indexed"]]
+        )
+
+    def decode_log(self, log):
+        """Decode a raw task manager log into its record."""
+        topics = log["topics"]
+        decoder, build = self._log_decoders[bytes(topics[0])]
+        return build(log, decoder(log["data"]))
+
+    @staticmethod
+    def _new_task_created(log, values):
+        (task,) = values
+        return NewTaskCreatedLog(
+            task_index=int.from_bytes(log["topics"][1], "big"),
+            task=TaskRecord(*task),
+            block_number=log["blockNumber"],
+            transaction_hash=bytes(log["transactionHash"]),
+        )
+
+    @staticmethod
+    def _task_responded(log, values):
+        (reference_task_index, number_squared), (responded_block, non_signers) = values
+        return TaskRespondedLog(
+            reference_task_index=reference_task_index,
+            number_squared=number_squared,
+            task_responsed_block=responded_block,
+            hash_of_non_signers=non_signers,
+            block_number=log["blockNumber"],
+            transaction_hash=bytes(log["transactionHash"]),
+        )
+
+    def decode_respond_call(self, calldata):
+        """Decode the calldata of a transaction that responded to tasks."""
+        calldata = bytes(calldata)
+        name, decoder = self._call_decoders[calldata[:4]]
+        args = decoder(calldata[4:])
+        # respondToTask takes a single task and response, the batched variants
+        # take arrays; every variant ends with the non-signer stakes and signature
+        tasks, task_responses = args[0], args[1]
+        if name == "respondToTask":
+            tasks, task_responses = (tasks,), (task_responses,)
+        return RespondCall(
+            function_name=name,
+            tasks=tuple(TaskRecord(*task) for task in tasks),
+            task_responses=tuple(task_responses),
+            non_signer_pubkeys=args[-1][1],
+        )
+
+
+@functools.cache
+def task_manager_codec():
+    """Codec for the task manager ABI, shared by every service in the process."""
+    return TaskManagerCodec(load_abi("IncredibleSquaringTaskManager"))
@@ -0,0 +1,109 @@
+import heapq
+import itertools
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class AdmissionQueue:
+    """Runs expensive work on a fixed pool of threads, most urgent first.
+
+    Every piece of work carries a priority, lower running sooner; callers use
+    the block its task expires at. At most ``max_pending`` pieces wait for a
+    worker: when full, new work more urgent than the least urgent waiting one
+    takes its place and the evicted caller gets ``queue.Full``, otherwise the
+    new work is refused with ``queue.Full`` right away.
+    """
+
+    def __init__(self, workers=4, max_pending=256):
+        if workers < 1:
+            raise ValueError("Admission queue needs at least one worker")
+        self.workers = workers
+        self.max_pending = max_pending
+        self.service_time = None
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._stopped = False
+
+    @property
+    def pending(self):
+        with self._cond:
+            return len(self._heap)
+
+    def start(self):
+        self._stopped = False
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._run, name=f"admission-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        with self._cond:
+            self._stopped = True
+            for entry in self._heap:
+                entry[2].set_exception(queue.Full())
+            self._heap = []
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def run(self, priority, fn, *args):
+        """Run ``fn(*args)`` on the pool and return its result.
+
+        Before ``start`` the work runs right away on the calling thread.
+        """
+        if not self._threads:
+            return fn(*args)
+        return self.submit(priority, fn, *args).result()
+
+    def submit(self, priority, fn, *args):
+        """Queue ``fn(*args)``, returning a future of its result."""
+        future = Future()
+        entry = (priority, next(self._seq), future, fn, args)
+        with self._cond:
+            if len(self._heap) >= self.max_pending:
+                worst = max(self._heap)
+                if worst[0] <= priority:
+                    raise queue.Full()
+                self._heap.remove(worst)
+                heapq.heapify(self._heap)
+                worst[2].set_exception(queue.Full())
+            heapq.heappush(self._heap, entry)
+            self._cond.notify()
+        return future
+
+    def retry_after(self):
+        """Whole seconds until the work waiting now should have run."""
+        with self._cond:
+            waiting = len(self._heap)
+        if self.service_time is None:
+            return 1
+        return max(1, math.ceil(waiting * self.service_time / self.workers))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                _, _, future, fn, args = heapq.heappop(self._heap)
+            if not future.set_running_or_notify_cancel():
+                continue
+            started = time.monotonic()
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+            elapsed = time.monotonic() - started
+            if self.service_time is None:
+                self.service_time = elapsed
+            else:
+                self.service_time = 0.8 * self.service_time + 0.2 * elapsed
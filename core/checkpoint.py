@@ -0,0 +1,89 @@
+import json
+import os
+import threading
+from collections import Counter
+
+
+class Checkpoint:
+    """Last processed block number, persisted as JSON.
+
+    A JSON-serializable ``state`` can be saved along with the block, for the
+    work that was still pending when the block was processed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._block = None
+        self._state = None
+
+    @property
+    def state(self):
+        """The state saved with the checkpoint by the last ``load`` or ``save``."""
+        return self._state
+
+    def load(self):
+        """Return the persisted block number, or None if there is no checkpoint."""
+        try:
+            with open(self.path) as f:
+                checkpoint = json.load(f)
+            self._block = int(checkpoint["block"])
+            self._state = checkpoint.get("state")
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            self._block = None
+            self._state = None
+        return self._block
+
+    def save(self, block, state=None):
+        """Persist ``block`` atomically; an unchanged checkpoint is not rewritten."""
+        if block == self._block and state == self._state:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        checkpoint = {"block": block}
+        if state is not None:
+            checkpoint["state"] = state
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(checkpoint, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        self._block = block
+        self._state = state
+
+
+class PendingBlocks:
+    """Blocks holding work that was taken in but is not yet durable.
+
+    A checkpoint may only move past a block once all of its work is recorded,
+    so ``safe_block`` caps the block to save at the one before the oldest
+    pending block.
+    """
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, block):
+        with self._lock:
+            self._counts[block] += 1
+
+    def done(self, block):
+        with self._lock:
+            self._counts[block] -= 1
+            if self._counts[block] <= 0:
+                del self._counts[block]
+
+    def expire(self, before_block):
+        """Give up on the work of blocks before ``before_block``."""
+        with self._lock:
+            for block in [b for b in self._counts if b < before_block]:
+                del self._counts[block]
+
+    def safe_block(self, block):
+        """``block``, or the block before the oldest pending one if earlier."""
+        if block is None:
+            return None
+        with self._lock:
+            if not self._counts:
+                return block
+            return min(block, min(self._counts) - 1)
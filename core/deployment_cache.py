@@ -0,0 +1,66 @@
+import json
+import os
+import threading
+
+
+class DeploymentCache:
+    """Local JSON record of deployment metadata resolved from the chain.
+
+    Entries are scoped to a chain id and a service manager address. A file
+    written for another chain or deployment reads as empty and is overwritten
+    on the next update, so a redeployed devnet never serves stale addresses.
+    """
+
+    def __init__(self, path, chain_id, service_manager_address):
+        self.path = path
+        self._scope = {
+            "chain_id": int(chain_id),
+            "service_manager_address": str(service_manager_address).lower(),
+        }
+        self._lock = threading.Lock()
+        self._values = self._read()
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        if any(data.get(key) != value for key, value in self._scope.items()):
+            return {}
+        return data.get("values", {})
+
+    def get(self, key, **scope):
+        """The cached value of ``key``.
+
+        A value stored with ``put`` is only returned for the same ``scope``.
+        """
+        with self._lock:
+            value = self._values.get(key)
+        if not scope:
+            return value
+        if not isinstance(value, dict) or value.get("scope") != scope:
+            return None
+        return value["value"]
+
+    def put(self, key, value, **scope):
+        """Store ``value`` under ``key`` for ``scope`` only.
+
+        For values that depend on more than the chain and deployment, like the
+        operator id, which also depends on the operator's address and BLS key.
+        """
+        self.update(**{key: {"scope": scope, "value": value}})
+
+    def update(self, **values):
+        """Store ``values`` and write the file atomically."""
+        with self._lock:
+            self._values.update(values)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({**self._scope, "values": self._values}, f)
+            os.replace(tmp_path, self.path)
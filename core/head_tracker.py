@@ -0,0 +1,49 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class HeadTracker:
+    """Keeps the latest block number in memory.
+
+    A single background thread polls the node, so readers get the chain head
+    without an RPC round-trip of their own.
+    """
+
+    def __init__(self, web3, poll_interval=1.0):
+        self.web3 = web3
+        self.poll_interval = poll_interval
+        self._latest = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def latest(self):
+        """The latest known block number, fetched on demand before the first poll."""
+        if self._latest is None:
+            self._latest = self.web3.eth.block_number
+        return self._latest
+
+    def start(self):
+        self._latest = self.web3.eth.block_number
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="head-tracker", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                block_number = self.web3.eth.block_number
+            except Exception as e:
+                logger.error(f"Failed to fetch latest block number: {str(e)}")
+                continue
+            self._latest = block_number
@@ -0,0 +1,307 @@
+import asyncio
+import inspect
+import logging
+import time
+from collections import OrderedDict
+
+from web3 import Web3
+
+logger = logging.getLogger(__name__)
+
+
+class EventIngestor:
+    """Polls a contract's logs with one eth_getLogs call per new block range.
+
+    Every subscribed topic is matched by the same call, and each decoded event
+    is handed to the handler subscribed to its topic. The hashes of recently
+    processed blocks are kept: when one of them changes, the chain reorganized,
+    so the events delivered from the abandoned blocks are handed to the removal
+    handlers in reverse order and the blocks after the common ancestor are
+    fetched again. Reorgs deeper than ``reorg_depth`` blocks are not detected.
+
+    The delay between polls follows the observed block time, bounded by
+    ``min_poll_interval`` and ``max_poll_interval``.
+    """
+
+    def __init__(
+        self,
+        web3,
+        address,
+        decode,
+        reorg_depth=64,
+        max_range=2000,
+        min_poll_interval=0.5,
+        max_poll_interval=12.0,
+    ):
+        self.web3 = web3
+        self.address = address
+        self.decode = decode
+        self.reorg_depth = reorg_depth
+        self.max_range = max_range
+        self.min_poll_interval = min_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.block_time = None
+        self._handlers = {}
+        self._block = None
+        self._hashes = OrderedDict()
+        self._delivered = OrderedDict()
+        self._head = None
+        self._head_seen_at = None
+
+    @property
+    def head(self):
+        """The highest block number seen at the chain head, or None before polling."""
+        return self._head
+
+    @property
+    def last_block(self):
+        """The last block whose events were delivered, or None before the first poll."""
+        return self._block
+
+    def subscribe(self, topic, on_event, on_removed=None):
+        """Deliver the decoded events of ``topic`` to ``on_event``.
+
+        ``on_removed`` receives the events of that topic dropped by a reorg.
+        """
+        self._handlers[bytes(topic)] = (on_event, on_removed)
+
+    def start_at(self, block):
+        """Deliver the events of the blocks after ``block`` on the next poll.
+
+        Without a start block, the first poll starts from the chain head.
+        """
+        self._block = block
+        self._hashes.clear()
+        self._delivered.clear()
+
+    def poll(self):
+        """Deliver the events of the blocks mined since the last poll.
+
+        Returns the number of events delivered.
+        """
+        head = self.web3.eth.get_block("latest")
+        if not self._observe_head(head):
+            return 0
+
+        ancestor = self._known_ancestor(head)
+        if ancestor is None:
+            for block_number in self._ancestor_candidates(head):
+                canonical = self.web3.eth.get_block(block_number)["hash"]
+                if canonical == self._hashes[block_number]:
+                    ancestor = block_number
+                    break
+            else:
+                ancestor = self._deep_reorg_ancestor()
+        if ancestor < self._block:
+            self._rollback(ancestor)
+
+        delivered = 0
+        while (block_range := self._next_range(head)) is not None:
+            logs = self.web3.eth.get_logs(self._log_filter(*block_range))
+            for event, on_event in self._record(logs):
+                try:
+                    on_event(event)
+                except Exception as e:
+                    logger.error(f"Error handling event: {str(e)}")
+            delivered += len(logs)
+            self._block = block_range[1]
+        self._finish(head)
+        return delivered
+
+    def next_poll_delay(self):
+        """Seconds until the next block is expected, within the poll bounds."""
+        if self.block_time is None:
+            delay = self.min_poll_interval
+        else:
+            delay = self._head_seen_at + self.block_time - time.monotonic()
+            if delay <= 0:
+                # the block is late, check again at a fraction of the block time
+                delay = self.block_time / 4
+        return min(self.max_poll_interval, max(self.min_poll_interval, delay))
+
+    def run(self, should_stop, on_poll=None):
+        """Poll until ``should_stop()`` returns true.
+
+        ``on_poll`` is called after every successful poll, with the number of
+        events it delivered.
+        """
+        while not should_stop():
+            try:
+                delivered = self.poll()
+                if on_poll is not None:
+                    on_poll(delivered)
+                time.sleep(self.next_poll_delay())
+            except Exception as e:
+                logger.error(f"Error ingesting events: {str(e)}")
+                time.sleep(self.max_poll_interval)
+
+    def _observe_head(self, head):
+        """Track the block time; False if this poll only sets the start block."""
+        head_number = head["number"]
+        now = time.monotonic()
+        if self._head is not None and head_number > self._head:
+            sample = (now - self._head_seen_at) / (head_number - self._head)
+            if self.block_time is None:
+                self.block_time = sample
+            else:
+                self.block_time = 0.8 * self.block_time + 0.2 * sample
+        if self._head is None or head_number > self._head:
+            self._head = head_number
+            self._head_seen_at = now
+
+        if self._block is None:
+            self._block = head_number
+            self._remember(head_number, head["hash"])
+            return False
+        return True
+
+    def _known_ancestor(self, head):
+        """The last processed block, if the head shows it is still canonical."""
+        if not self._hashes:
+            return self._block
+        known_hash = self._hashes.get(self._block)
+        if head["number"] == self._block and head["hash"] == known_hash:
+            return self._block
+        if head["number"] == self._block + 1 and head["parentHash"] == known_hash:
+            return self._block
+        return None
+
+    def _ancestor_candidates(self, head):
+        """Remembered blocks to compare with the canonical chain, newest first."""
+        return [
+            block_number
+            for block_number in reversed(self._hashes)
+            if block_number <= head["number"]
+        ]
+
+    def _deep_reorg_ancestor(self):
+        oldest = next(iter(self._hashes))
+        logger.warning(
+            f"Reorg deeper than the {len(self._hashes)} blocks remembered, "
+            f"replaying from block {oldest}"
+        )
+        return oldest - 1
+
+    def _next_range(self, head):
+        start = self._block + 1
+        if start > head["number"]:
+            return None
+        return start, min(start + self.max_range - 1, head["number"])
+
+    def _log_filter(self, from_block, to_block):
+        return {
+            "address": self.address,
+            "topics": [[Web3.to_hex(topic) for topic in self._handlers]],
+            "fromBlock": from_block,
+            "toBlock": to_block,
+        }
+
+    def _rollback(self, ancestor):
+        removed = []
+        while self._delivered and next(reversed(self._delivered)) > ancestor:
+            removed.extend(reversed(self._delivered.popitem()[1]))
+        while self._hashes and next(reversed(self._hashes)) > ancestor:
+            self._hashes.popitem()
+        logger.warning(
+            f"Reorg after block {ancestor}: rolling back {len(removed)} events "
+            f"from blocks {ancestor + 1}-{self._block}"
+        )
+        self._block = ancestor
+        for topic, event in removed:
+            on_removed = self._handlers[topic][1]
+            if on_removed is None:
+                continue
+            try:
+                on_removed(event)
+            except Exception as e:
+                logger.error(f"Error handling removed event: {str(e)}")
+
+    def _record(self, logs):
+        """Decode and remember logs, returning ``(event, on_event)`` pairs."""
+        delivered = []
+        for log in logs:
+            topic = bytes(log["topics"][0])
+            block_number = log["blockNumber"]
+            event = self.decode(log)
+            self._delivered.setdefault(block_number, []).append((topic, event))
+            self._remember(block_number, log["blockHash"])
+            delivered.append((event, self._handlers[topic][0]))
+        return delivered
+
+    def _remember(self, block_number, block_hash):
+        self._hashes[block_number] = bytes(block_hash)
+        self._hashes.move_to_end(block_number)
+
+    def _finish(self, head):
+        self._remember(head["number"], head["hash"])
+        self._prune()
+
+    def _prune(self):
+        oldest = self._block - self.reorg_depth
+        while self._hashes and next(iter(self._hashes)) <= oldest:
+            self._hashes.popitem(last=False)
+        while self._delivered and next(iter(self._delivered)) <= oldest:
+            self._delivered.popitem(last=False)
+
+
+class AsyncEventIngestor(EventIngestor):
+    """``EventIngestor`` for an ``AsyncWeb3`` client.
+
+    Event handlers and ``on_poll`` may be coroutine functions, in which case
+    they are awaited, so a slow consumer holds back the next log range.
+    Removal handlers are called synchronously.
+    """
+
+    async def poll(self):
+        """Deliver the events of the blocks mined since the last poll.
+
+        Returns the number of events delivered.
+        """
+        head = await self.web3.eth.get_block("latest")
+        if not self._observe_head(head):
+            return 0
+
+        ancestor = self._known_ancestor(head)
+        if ancestor is None:
+            for block_number in self._ancestor_candidates(head):
+                canonical = (await self.web3.eth.get_block(block_number))["hash"]
+                if canonical == self._hashes[block_number]:
+                    ancestor = block_number
+                    break
+            else:
+                ancestor = self._deep_reorg_ancestor()
+        if ancestor < self._block:
+            self._rollback(ancestor)
+
+        delivered = 0
+        while (block_range := self._next_range(head)) is not None:
+            logs = await self.web3.eth.get_logs(self._log_filter(*block_range))
+            for event, on_event in self._record(logs):
+                try:
+                    result = on_event(event)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    logger.error(f"Error handling event: {str(e)}")
+            delivered += len(logs)
+            self._block = block_range[1]
+        self._finish(head)
+        return delivered
+
+    async def run(self, should_stop, on_poll=None):
+        """Poll until ``should_stop()`` returns true.
+
+        ``on_poll`` is called after every successful poll, with the number of
+        events it delivered.
+        """
+        while not should_stop():
+            try:
+                delivered = await self.poll()
+                if on_poll is not None:
+                    result = on_poll(delivered)
+                    if inspect.isawaitable(result):
+                        await result
+                await asyncio.sleep(self.next_poll_delay())
+            except Exception as e:
+                logger.error(f"Error ingesting events: {str(e)}")
+                await asyncio.sleep(self.max_poll_interval)
@@ -0,0 +1,141 @@
+import threading
+from collections import OrderedDict
+
+
+class JoinBuffer:
+    """Joins tasks and their responses by task index with bounded memory.
+
+    Tasks and responses wait in the buffer until their counterpart arrives.
+    Each entry carries the last block at which it can still be acted on; once
+    the chain passes that block the entry is evicted and counted as orphaned.
+    Joined entries are moved to a resolved history of at most ``history_size``
+    entries once their verdict is final.
+    """
+
+    def __init__(self, history_size=1000):
+        self.history_size = history_size
+        self._tasks = {}
+        self._responses = {}
+        self._resolved = OrderedDict()
+        self._lock = threading.Lock()
+        self.orphaned_tasks = 0
+        self.orphaned_responses = 0
+
+    def add_task(self, task_index, task, expires_at_block):
+        """Buffer a task, returning ``(task, response)`` if its response is known."""
+        with self._lock:
+            if task_index in self._resolved:
+                return None
+            self._tasks[task_index] = (task, expires_at_block)
+            return self._pair(task_index)
+
+    def add_response(self, task_index, response, expires_at_block):
+        """Buffer a response, returning ``(task, response)`` if its task is known."""
+        with self._lock:
+            if task_index in self._resolved:
+                return None
+            self._responses[task_index] = (response, expires_at_block)
+            return self._pair(task_index)
+
+    def joined(self, task_index):
+        """``(task, response)`` of a buffered task whose response is known."""
+        with self._lock:
+            return self._pair(task_index)
+
+    def _pair(self, task_index):
+        if task_index in self._tasks and task_index in self._responses:
+            return self._tasks[task_index][0], self._responses[task_index][0]
+        return None
+
+    def discard_task(self, task_index):
+        """Drop a buffered task, e.g. one whose log was removed by a reorg."""
+        with self._lock:
+            self._tasks.pop(task_index, None)
+
+    def discard_response(self, task_index):
+        """Drop a buffered response, e.g. one whose log was removed by a reorg."""
+        with self._lock:
+            self._responses.pop(task_index, None)
+
+    def resolve(self, task_index, verdict=None):
+        """Move a joined task to the resolved history with its final verdict."""
+        with self._lock:
+            task = self._tasks.pop(task_index, (None,))[0]
+            response = self._responses.pop(task_index, (None,))[0]
+            self._resolved[task_index] = (task, response, verdict)
+            while len(self._resolved) > self.history_size:
+                self._resolved.popitem(last=False)
+
+    def expire(self, current_block):
+        """Evict the entries that can no longer be acted on at ``current_block``.
+
+        Evicted entries that never met their counterpart are counted as orphans.
+        """
+        with self._lock:
+            expired_tasks = [
+                task_index
+                for task_index, (_, expires_at_block) in self._tasks.items()
+                if expires_at_block < current_block
+            ]
+            expired_responses = [
+                task_index
+                for task_index, (_, expires_at_block) in self._responses.items()
+                if expires_at_block < current_block
+            ]
+            self.orphaned_tasks += sum(
+                1 for task_index in expired_tasks if task_index not in self._responses
+            )
+            self.orphaned_responses += sum(
+                1 for task_index in expired_responses if task_index not in self._tasks
+            )
+            for task_index in expired_tasks:
+                del self._tasks[task_index]
+            for task_index in expired_responses:
+                del self._responses[task_index]
+
+    def pending(self):
+        """Buffered entries as ``(tasks, responses)``.
+
+        Each is a list of ``(task_index, item, expires_at_block)`` tuples.
+        """
+        with self._lock:
+            return self._entries(self._tasks), self._entries(self._responses)
+
+    @staticmethod
+    def _entries(buffered):
+        return [
+            (task_index, item, expires_at_block)
+            for task_index, (item, expires_at_block) in buffered.items()
+        ]
+
+    def task(self, task_index):
+        """The buffered or resolved task, if any."""
+        with self._lock:
+            if task_index in self._tasks:
+                return self._tasks[task_index][0]
+            return self._resolved.get(task_index, (None, None, None))[0]
+
+    def response(self, task_index):
+        """The buffered or resolved response, if any."""
+        with self._lock:
+            if task_index in self._responses:
+                return self._responses[task_index][0]
+            return self._resolved.get(task_index, (None, None, None))[1]
+
+    def verdict(self, task_index):
+        """The verdict a resolved task was resolved with, if any."""
+        with self._lock:
+            return self._resolved.get(task_index, (None, None, None))[2]
+
+    def counts(self):
+        """Sizes of the buffer and cumulative orphan counts."""
+        with self._lock:
+            return {
+                "tasks": len(self._tasks),
+                "responses": len(self._responses),
+                "unmatched_tasks": len(self._tasks.keys() - self._responses.keys()),
+                "unmatched_responses": len(self._responses.keys() - self._tasks.keys()),
+                "resolved": len(self._resolved),
+                "orphaned_tasks": self.orphaned_tasks,
+                "orphaned_responses": self.orphaned_responses,
+            }
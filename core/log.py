@@ -0,0 +1,153 @@
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+
+# attributes every LogRecord has; anything else on a record came from ``extra``
+_RECORD_ATTRS = frozenset(
+    logging.LogRecord("", logging.INFO, "", 0, "", (), None).__dict__
+) | {"message", "asctime", "fields"}
+
+
+class StructuredLogger:
+    """Logger whose messages are formatted only if and when they are emitted.
+
+    Calls take the same arguments as ``logging.Logger`` ones, plus keyword
+    fields that are attached to the record as structured data:
+
+        logger.debug("Received signed task response", task_index=index)
+
+    Nothing is built for a level that is disabled beyond the call itself, and
+    ``%``-style arguments are only interpolated by the handler. High-volume
+    messages can be sampled with ``sample_every=n``, which emits one in every
+    ``n`` calls for that message.
+    """
+
+    __slots__ = ("logger", "_counters")
+
+    def __init__(self, logger):
+        self.logger = logger
+        self._counters = {}
+
+    def isEnabledFor(self, level):
+        return self.logger.isEnabledFor(level)
+
+    def debug(self, msg, *args, **fields):
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self._log(logging.DEBUG, msg, args, fields)
+
+    def info(self, msg, *args, **fields):
+        if self.logger.isEnabledFor(logging.INFO):
+            self._log(logging.INFO, msg, args, fields)
+
+    def warning(self, msg, *args, **fields):
+        if self.logger.isEnabledFor(logging.WARNING):
+            self._log(logging.WARNING, msg, args, fields)
+
+    def error(self, msg, *args, **fields):
+        if self.logger.isEnabledFor(logging.ERROR):
+            self._log(logging.ERROR, msg, args, fields)
+
+    def exception(self, msg, *args, **fields):
+        if self.logger.isEnabledFor(logging.ERROR):
+            fields.setdefault("exc_info", True)
+            self._log(logging.ERROR, msg, args, fields)
+
+    def _log(self, level, msg, args, fields):
+        sample_every = fields.pop("sample_every", 1)
+        if sample_every > 1:
+            counter = self._counters.get(msg)
+            if counter is None:
+                counter = self._counters.setdefault(msg, itertools.count())
+            if next(counter) % sample_every:
+                return
+            fields["sampled"] = sample_every
+        exc_info = fields.pop("exc_info", None)
+        extra = fields.pop("extra", None)
+        if extra:
+            fields.update(extra)
+        self.logger._log(
+            level,
+            msg,
+            args,
+            exc_info=exc_info,
+            extra={"fields": fields} if fields else None,
+            stacklevel=3,
+        )
+
+
+def get_logger(name):
+    return StructuredLogger(logging.getLogger(name))
+
+
+class StructuredFormatter(logging.Formatter):
+    """Appends the structured fields of a record to its message.
+
+    Fields are rendered as ``key=value`` pairs, or the whole record as one JSON
+    object per line with ``as_json``. Attributes set through a plain
+    ``extra`` dict are treated as fields too.
+    """
+
+    def __init__(self, as_json=False):
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s")
+        self.as_json = as_json
+
+    def format(self, record):
+        fields = getattr(record, "fields", None) or {
+            key: value
+            for key, value in record.__dict__.items()
+            if key not in _RECORD_ATTRS
+        }
+        if self.as_json:
+            entry = {
+                "time": self.formatTime(record),
+                "level": record.levelname,
+                "logger": record.name,
+                "message": record.getMessage(),
+                **fields,
+            }
+            if record.exc_info:
+                entry["exception"] = self.formatException(record.exc_info)
+            return json.dumps(entry, default=str)
+
+        line = super().format(record)
+        if fields:
+            pairs = " ".join(f"{key}={value}" for key, value in fields.items())
+            head, _, tail = line.partition("\n")
+            line = f"{head} {pairs}" + (f"\n{tail}" if tail else "")
+        return line
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queues records as they are, leaving all formatting to the listener.
+
+    The stdlib handler formats the message in the logging thread; here the
+    record, with its arguments and fields, is handed over untouched, so only
+    values that are not mutated afterwards should be logged.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def configure_logging(level="INFO", as_json=False):
+    """Send all logs through a queue to a stderr handler on a background thread.
+
+    Replaces the root handlers, so it is meant to be called once by the
+    entry point of a service. Returns the started ``QueueListener``.
+    """
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(StructuredFormatter(as_json=as_json))
+    listener = logging.handlers.QueueListener(
+        log_queue, handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    root.handlers[:] = [DeferredQueueHandler(log_queue)]
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    return listener
@@ -0,0 +1,71 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from web3 import Web3
+
+logger = logging.getLogger(__name__)
+
+
+class LogFetcher:
+    """Fetches logs over a block range with chunked, parallel eth_getLogs calls.
+
+    The chunk size adapts to the node: a failed request is split in half and
+    retried, shrinking the chunk size for the following requests, while every
+    successful request grows it again up to ``max_chunk_size``.
+    """
+
+    def __init__(
+        self,
+        web3,
+        address,
+        topics,
+        chunk_size=2000,
+        max_chunk_size=10000,
+        workers=4,
+    ):
+        self.web3 = web3
+        self.address = address
+        self.topics = [Web3.to_hex(topic) for topic in topics]
+        self.chunk_size = chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.workers = workers
+        self._lock = threading.Lock()
+
+    def fetch(self, from_block, to_block):
+        """Return the logs between both blocks, inclusive, in chain order."""
+        logs = []
+        start = from_block
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while start <= to_block:
+                ranges = []
+                while start <= to_block and len(ranges) < self.workers:
+                    end = min(start + self.chunk_size - 1, to_block)
+                    ranges.append((start, end))
+                    start = end + 1
+                for chunk in executor.map(lambda r: self._fetch_range(*r), ranges):
+                    logs.extend(chunk)
+        logs.sort(key=lambda log: (log["blockNumber"], log["logIndex"]))
+        return logs
+
+    def _fetch_range(self, start, end):
+        try:
+            logs = self.web3.eth.get_logs(
+                {
+                    "address": self.address,
+                    "topics": self.topics,
+                    "fromBlock": start,
+                    "toBlock": end,
+                }
+            )
+        except Exception as e:
+            if start == end:
+                raise
+            logger.debug(f"getLogs failed for blocks {start}-{end}, splitting: {e}")
+            with self._lock:
+                self.chunk_size = max(1, (end - start + 1) // 2)
+            middle = (start + end) // 2
+            return self._fetch_range(start, middle) + self._fetch_range(middle + 1, end)
+        with self._lock:
+            self.chunk_size = min(self.max_chunk_size, self.chunk_size * 2)
+        return list(logs)
@@ -0,0 +1,54 @@
+import eth_abi
+from web3 import Web3
+
+
+def task_response_leaf(reference_task_index, number_squared):
+    """Leaf of a task response, equal to the message signed for a single task."""
+    encoded = eth_abi.encode(
+        ["uint32", "uint256"], [reference_task_index, number_squared]
+    )
+    return Web3.keccak(encoded)
+
+
+def _hash_pair(a, b):
+    # pairs are hashed in sorted order, matching OpenZeppelin's MerkleProof
+    return Web3.keccak(a + b if a < b else b + a)
+
+
+def merkle_layers(leaves):
+    """Return every layer of the tree, from the leaves up to the root."""
+    if not leaves:
+        raise ValueError("Cannot build a merkle tree without leaves")
+    layers = [list(leaves)]
+    while len(layers[-1]) > 1:
+        layer = layers[-1]
+        parents = [
+            _hash_pair(layer[i], layer[i + 1]) for i in range(0, len(layer) - 1, 2)
+        ]
+        if len(layer) % 2:
+            # an odd node out is promoted to the next layer unchanged
+            parents.append(layer[-1])
+        layers.append(parents)
+    return layers
+
+
+def merkle_root(leaves):
+    return merkle_layers(leaves)[-1][0]
+
+
+def merkle_proof(layers, index):
+    """Sibling hashes proving that the leaf at ``index`` is part of the tree."""
+    proof = []
+    for layer in layers[:-1]:
+        sibling = index ^ 1
+        if sibling < len(layer):
+            proof.append(layer[sibling])
+        index //= 2
+    return proof
+
+
+def verify_merkle_proof(proof, root, leaf):
+    node = leaf
+    for sibling in proof:
+        node = _hash_pair(node, sibling)
+    return node == root
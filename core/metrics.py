@@ -0,0 +1,22 @@
+import threading
+from collections import Counter
+
+
+class Counters:
+    """Thread-safe named counters, read through ``snapshot``."""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def inc(self, name, amount=1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def get(self, name):
+        with self._lock:
+            return self._counts[name]
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
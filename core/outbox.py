@@ -0,0 +1,108 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class Outbox:
+    """On-disk record of signed task responses awaiting aggregator delivery.
+
+    A response is recorded before it is sent and marked as delivered once the
+    aggregator acknowledges it, so responses that were signed but not delivered
+    survive a restart and can be replayed without recomputing or re-signing.
+
+    A batch response is recorded once, under the index of its first task, and
+    every task it covers is indexed so ``contains`` finds each of them.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                task_index INTEGER PRIMARY KEY,
+                task_created_block INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                delivered INTEGER NOT NULL DEFAULT 0,
+                recorded_at REAL NOT NULL
+            )
+            """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS outbox_tasks (
+                task_index INTEGER PRIMARY KEY,
+                entry INTEGER NOT NULL
+            )
+            """)
+
+    def record(self, task_index, task_created_block, payload, task_indices=None):
+        """Persist a signed response before it is sent.
+
+        ``task_indices`` are the tasks the response covers, ``task_index``
+        alone by default.
+        """
+        covered = [(i, task_index) for i in (task_indices or [task_index])]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO outbox "
+                    "(task_index, task_created_block, payload, delivered, recorded_at) "
+                    "VALUES (?, ?, ?, 0, ?)",
+                    (task_index, task_created_block, json.dumps(payload), time.time()),
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO outbox_tasks (task_index, entry) "
+                    "VALUES (?, ?)",
+                    covered,
+                )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def mark_delivered(self, task_index):
+        """Mark a response as acknowledged by the aggregator."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET delivered = 1 WHERE task_index = ?", (task_index,)
+            )
+
+    def contains(self, task_index):
+        """Whether a response to the task was already signed."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM outbox_tasks WHERE task_index = ?", (task_index,)
+            ).fetchone()
+        return row is not None
+
+    def pending(self):
+        """Return ``(task_index, task_created_block, payload)`` of undelivered responses."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task_index, task_created_block, payload FROM outbox "
+                "WHERE delivered = 0 ORDER BY task_index"
+            ).fetchall()
+        return [(index, block, json.loads(payload)) for index, block, payload in rows]
+
+    def prune(self, before_block):
+        """Drop entries of tasks created before ``before_block``."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM outbox WHERE task_created_block < ?", (before_block,)
+            )
+            self._conn.execute(
+                "DELETE FROM outbox_tasks "
+                "WHERE entry NOT IN (SELECT task_index FROM outbox)"
+            )
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,87 @@
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class Stage:
+    """A pool of worker threads consuming a bounded queue.
+
+    Each worker takes an item from the queue, runs ``handler`` on it and, if the
+    handler returns something other than ``None``, hands the result to the next
+    stage. Items of a single task therefore always flow through the stages in
+    order, while different tasks are processed concurrently.
+    """
+
+    def __init__(self, name, handler, workers=1, queue_size=100):
+        if workers < 1:
+            raise ValueError(f"Stage {name} needs at least one worker")
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.next_stage = None
+        self._threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._run, name=f"{self.name}-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, item, timeout=None):
+        """Queue an item, blocking while the stage is full (backpressure)."""
+        self.queue.put(item, timeout=timeout)
+
+    def stop(self, timeout=None):
+        for _ in self._threads:
+            self.queue.put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is _STOP:
+                    return
+                result = self.handler(item)
+                if result is not None and self.next_stage is not None:
+                    self.next_stage.submit(result)
+            except Exception as e:
+                logger.error(f"Unexpected error in {self.name} stage: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+
+class Pipeline:
+    """A chain of stages, each with its own concurrency and bounded queue."""
+
+    def __init__(self, stages):
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        self.stages = stages
+        for stage, next_stage in zip(stages, stages[1:]):
+            stage.next_stage = next_stage
+
+    def start(self):
+        for stage in reversed(self.stages):
+            stage.start()
+
+    def submit(self, item, timeout=None):
+        self.stages[0].submit(item, timeout=timeout)
+
+    def stop(self, timeout=None):
+        # stop upstream first so in-flight items can drain into later stages
+        for stage in self.stages:
+            stage.stop(timeout)
+
+    def pending(self):
+        """Number of items waiting in stage queues."""
+        return sum(stage.queue.qsize() for stage in self.stages)
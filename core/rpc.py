@@ -0,0 +1,530 @@
+import asyncio
+import itertools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import AsyncHTTPProvider, Web3
+from web3._utils.encoding import FriendlyJsonSerde, Web3JsonEncoder
+from web3.providers.async_base import AsyncJSONBaseProvider
+from web3.providers.base import JSONBaseProvider
+
+logger = logging.getLogger(__name__)
+
+# methods without side effects: identical concurrent calls share one request,
+# and calls are batched and hedged
+READ_METHODS = frozenset(
+    {
+        "eth_blockNumber",
+        "eth_chainId",
+        "net_version",
+        "web3_clientVersion",
+        "eth_gasPrice",
+        "eth_maxPriorityFeePerGas",
+        "eth_feeHistory",
+        "eth_getBalance",
+        "eth_getCode",
+        "eth_getStorageAt",
+        "eth_getTransactionCount",
+        "eth_getBlockByNumber",
+        "eth_getBlockByHash",
+        "eth_getTransactionByHash",
+        "eth_getTransactionReceipt",
+        "eth_getLogs",
+        "eth_call",
+        "eth_estimateGas",
+    }
+)
+
+
+class EndpointState:
+    """The observed health of an RPC endpoint."""
+
+    def __init__(self, uri):
+        self.uri = uri
+        self.healthy = True
+        self.latency = None
+        self.in_flight = 0
+        self.block_number = None
+
+    def record(self, seconds):
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency = 0.8 * self.latency + 0.2 * seconds
+
+
+class Endpoint(EndpointState):
+    """An RPC endpoint with a keep-alive session and its observed health."""
+
+    def __init__(self, uri, pool_size):
+        super().__init__(uri)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+
+class AsyncEndpoint(EndpointState):
+    """An RPC endpoint reached through an async web3 HTTP provider."""
+
+    def __init__(self, uri, timeout):
+        super().__init__(uri)
+        # failover replaces the provider's own retries
+        self.provider = AsyncHTTPProvider(
+            uri,
+            request_kwargs={"timeout": aiohttp.ClientTimeout(total=timeout)},
+            exception_retry_configuration=None,
+        )
+
+
+def _rank_endpoints(endpoints):
+    """Healthy endpoints, or all if none is, least loaded and fastest first."""
+    healthy = [e for e in endpoints if e.healthy]
+    return sorted(
+        healthy or endpoints,
+        key=lambda e: (e.in_flight, e.latency if e.latency is not None else 0),
+    )
+
+
+def _mark_lagging(endpoints, max_block_lag):
+    """Mark the endpoints more than ``max_block_lag`` blocks behind as unhealthy."""
+    heads = [e.block_number for e in endpoints if e.block_number is not None]
+    if not heads:
+        return
+    for endpoint in endpoints:
+        if (
+            endpoint.block_number is not None
+            and endpoint.block_number < max(heads) - max_block_lag
+        ):
+            endpoint.healthy = False
+            logger.warning(
+                f"RPC endpoint {endpoint.uri} lags {max(heads) - endpoint.block_number} blocks"
+            )
+
+
+class MultiplexedHTTPProvider(JSONBaseProvider):
+    """Web3 provider multiplexing the calls of a service over several endpoints.
+
+    - Every endpoint keeps a pool of keep-alive connections.
+    - Identical read calls made concurrently share a single request.
+    - With ``batch_window`` set, read calls made within that many seconds of
+      each other are sent together as one JSON-RPC batch.
+    - Each request goes to the healthy endpoint with the fewest requests in
+      flight and the lowest latency; one that fails is retried on the next.
+    - With ``hedge_after`` set and more than one healthy endpoint, a read not
+      answered within that many seconds is also sent to a second endpoint and
+      the first answer wins.
+    - A background thread checks every endpoint each ``health_check_interval``
+      seconds; one that fails or lags more than ``max_block_lag`` blocks
+      behind the others is skipped until it recovers.
+    """
+
+    def __init__(
+        self,
+        endpoint_uris,
+        pool_size=32,
+        timeout=10.0,
+        batch_window=0.0,
+        max_batch_size=100,
+        hedge_after=None,
+        health_check_interval=10.0,
+        max_block_lag=5,
+    ):
+        super().__init__()
+        if not endpoint_uris:
+            raise ValueError("At least one RPC endpoint is required")
+        self.endpoints = [Endpoint(uri, pool_size) for uri in endpoint_uris]
+        self.timeout = timeout
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.hedge_after = hedge_after
+        self.health_check_interval = health_check_interval
+        self.max_block_lag = max_block_lag
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._coalesced = {}
+        self._requests = ThreadPoolExecutor(
+            max_workers=pool_size * len(self.endpoints), thread_name_prefix="rpc"
+        )
+        self._batches = queue.Queue()
+        # batches are sent from their own pool, as hedging them takes workers
+        # from the request pool
+        self._batch_senders = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix="rpc-batch"
+        )
+        self._stop_event = threading.Event()
+        if batch_window > 0:
+            threading.Thread(
+                target=self._run_batcher, name="rpc-batcher", daemon=True
+            ).start()
+        if health_check_interval > 0:
+            threading.Thread(
+                target=self._run_health_checks, name="rpc-health", daemon=True
+            ).start()
+
+    def __str__(self):
+        return f"RPC connection {', '.join(e.uri for e in self.endpoints)}"
+
+    def close(self):
+        self._stop_event.set()
+        self._requests.shutdown(wait=False)
+        self._batch_senders.shutdown(wait=False)
+
+    def make_request(self, method, params):
+        if method not in READ_METHODS:
+            return self._send([(method, params)], hedge=False)[0]
+
+        key = (method, FriendlyJsonSerde().json_encode(params, Web3JsonEncoder))
+        with self._lock:
+            shared = self._coalesced.get(key)
+            leader = shared is None
+            if leader:
+                shared = self._coalesced[key] = Future()
+        if not leader:
+            return dict(shared.result())
+
+        try:
+            if self.batch_window > 0:
+                pending = Future()
+                self._batches.put((method, params, pending))
+                response = pending.result()
+            else:
+                response = self._send([(method, params)], hedge=True)[0]
+            shared.set_result(response)
+            return dict(response)
+        except Exception as e:
+            shared.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._coalesced[key]
+
+    def make_batch_request(self, batch_requests):
+        hedge = all(method in READ_METHODS for method, _ in batch_requests)
+        return self._send(list(batch_requests), hedge=hedge)
+
+    def _run_batcher(self):
+        while not self._stop_event.is_set():
+            try:
+                batch = [self._batches.get(timeout=1)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._batches.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._batch_senders.submit(self._send_batch, batch)
+
+    def _send_batch(self, batch):
+        try:
+            responses = self._send(
+                [(method, params) for method, params, _ in batch], hedge=True
+            )
+        except Exception as e:
+            for _, _, pending in batch:
+                pending.set_exception(e)
+            return
+        for (_, _, pending), response in zip(batch, responses):
+            pending.set_result(response)
+
+    def _send(self, calls, hedge):
+        """Send calls as one request, failing over across endpoints."""
+        endpoints = self._ranked_endpoints()
+        if hedge and self.hedge_after and len(endpoints) > 1:
+            return self._send_hedged(calls, endpoints)
+
+        error = None
+        for endpoint in endpoints:
+            try:
+                return self._post(endpoint, calls)
+            except Exception as e:
+                error = e
+                logger.debug(f"RPC request to {endpoint.uri} failed: {str(e)}")
+        raise error
+
+    def _send_hedged(self, calls, endpoints):
+        attempts = [self._requests.submit(self._post, endpoints[0], calls)]
+        done, _ = wait(attempts, timeout=self.hedge_after)
+        if not done or attempts[0].exception() is not None:
+            attempts.append(self._requests.submit(self._post, endpoints[1], calls))
+
+        error = None
+        pending = set(attempts)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for attempt in done:
+                if attempt.exception() is None:
+                    return attempt.result()
+                error = attempt.exception()
+        for endpoint in endpoints[2:]:
+            try:
+                return self._post(endpoint, calls)
+            except Exception as e:
+                error = e
+        raise error
+
+    def _post(self, endpoint, calls):
+        ids = [next(self._ids) for _ in calls]
+        payload = [
+            {"jsonrpc": "2.0", "method": method, "params": params or [], "id": id_}
+            for (method, params), id_ in zip(calls, ids)
+        ]
+        body = FriendlyJsonSerde().json_encode(
+            payload if len(payload) > 1 else payload[0], Web3JsonEncoder
+        )
+
+        with self._lock:
+            endpoint.in_flight += 1
+        started = time.monotonic()
+        try:
+            response = endpoint.session.post(
+                endpoint.uri,
+                data=body,
+                headers={"Content-Type": "application/json"},
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            decoded = self.decode_rpc_response(response.content)
+        except Exception:
+            endpoint.healthy = False
+            raise
+        finally:
+            with self._lock:
+                endpoint.in_flight -= 1
+        endpoint.record(time.monotonic() - started)
+
+        if len(payload) == 1:
+            return [decoded]
+        if not isinstance(decoded, list):
+            # the endpoint rejected the batch as a whole, send the calls one by one
+            return [self._post(endpoint, [call])[0] for call in calls]
+        by_id = {item.get("id"): item for item in decoded}
+        return [by_id[id_] for id_ in ids]
+
+    def _ranked_endpoints(self):
+        with self._lock:
+            return _rank_endpoints(self.endpoints)
+
+    def _run_health_checks(self):
+        while not self._stop_event.wait(self.health_check_interval):
+            self.check_health()
+
+    def check_health(self):
+        """Probe every endpoint and mark those failing or lagging as unhealthy."""
+        for endpoint in self.endpoints:
+            try:
+                response = self._post(endpoint, [("eth_blockNumber", [])])[0]
+                endpoint.block_number = int(response["result"], 16)
+                endpoint.healthy = True
+            except Exception as e:
+                endpoint.block_number = None
+                logger.warning(f"RPC endpoint {endpoint.uri} is unhealthy: {str(e)}")
+        _mark_lagging(self.endpoints, self.max_block_lag)
+
+
+class AsyncMultiplexedHTTPProvider(AsyncJSONBaseProvider):
+    """Async web3 provider spreading the calls of a service over several endpoints.
+
+    The asyncio counterpart of ``MultiplexedHTTPProvider``, with the same
+    failover, hedging and health checks but without coalescing or batch
+    windows:
+
+    - Each request goes to the healthy endpoint with the fewest requests in
+      flight and the lowest latency; one that fails is retried on the next.
+    - With ``hedge_after`` set and more than one healthy endpoint, a read not
+      answered within that many seconds is also sent to a second endpoint and
+      the first answer wins.
+    - From the first request on, a background task checks every endpoint each
+      ``health_check_interval`` seconds; one that fails or lags more than
+      ``max_block_lag`` blocks behind the others is skipped until it recovers.
+    """
+
+    def __init__(
+        self,
+        endpoint_uris,
+        timeout=10.0,
+        hedge_after=None,
+        health_check_interval=10.0,
+        max_block_lag=5,
+    ):
+        super().__init__()
+        if not endpoint_uris:
+            raise ValueError("At least one RPC endpoint is required")
+        self.endpoints = [AsyncEndpoint(uri, timeout) for uri in endpoint_uris]
+        self.hedge_after = hedge_after
+        self.health_check_interval = health_check_interval
+        self.max_block_lag = max_block_lag
+        self._health_checks = None
+
+    def __str__(self):
+        return f"Async RPC connection {', '.join(e.uri for e in self.endpoints)}"
+
+    async def make_request(self, method, params):
+        return await self._send(
+            lambda provider: provider.make_request(method, params),
+            hedge=method in READ_METHODS,
+        )
+
+    async def make_batch_request(self, batch_requests):
+        hedge = all(method in READ_METHODS for method, _ in batch_requests)
+        return await self._send(
+            lambda provider: provider.make_batch_request(batch_requests), hedge
+        )
+
+    async def is_connected(self, show_traceback=False):
+        for endpoint in _rank_endpoints(self.endpoints):
+            if await endpoint.provider.is_connected(show_traceback):
+                return True
+        return False
+
+    async def disconnect(self):
+        if self._health_checks is not None:
+            self._health_checks.cancel()
+            self._health_checks = None
+        for endpoint in self.endpoints:
+            await endpoint.provider.disconnect()
+
+    async def _send(self, call, hedge):
+        """Run ``call`` on an endpoint's provider, failing over across endpoints."""
+        if self._health_checks is None and self.health_check_interval > 0:
+            self._health_checks = asyncio.ensure_future(self._run_health_checks())
+        endpoints = _rank_endpoints(self.endpoints)
+        if hedge and self.hedge_after and len(endpoints) > 1:
+            return await self._send_hedged(call, endpoints)
+
+        error = None
+        for endpoint in endpoints:
+            try:
+                return await self._call(endpoint, call)
+            except Exception as e:
+                error = e
+                logger.debug(f"RPC request to {endpoint.uri} failed: {str(e)}")
+        raise error
+
+    async def _send_hedged(self, call, endpoints):
+        attempts = [asyncio.ensure_future(self._call(endpoints[0], call))]
+        done, _ = await asyncio.wait(attempts, timeout=self.hedge_after)
+        if not done or attempts[0].exception() is not None:
+            attempts.append(asyncio.ensure_future(self._call(endpoints[1], call)))
+
+        error = None
+        pending = set(attempts)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for attempt in done:
+                    if attempt.exception() is None:
+                        return attempt.result()
+                    error = attempt.exception()
+        finally:
+            for attempt in pending:
+                attempt.cancel()
+        for endpoint in endpoints[2:]:
+            try:
+                return await self._call(endpoint, call)
+            except Exception as e:
+                error = e
+        raise error
+
+    async def _call(self, endpoint, call):
+        # every call runs on the event loop thread, no lock is needed
+        endpoint.in_flight += 1
+        started = time.monotonic()
+        try:
+            response = await call(endpoint.provider)
+        except Exception:
+            endpoint.healthy = False
+            raise
+        finally:
+            endpoint.in_flight -= 1
+        endpoint.record(time.monotonic() - started)
+        return response
+
+    async def _run_health_checks(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            await self.check_health()
+
+    async def check_health(self):
+        """Probe every endpoint and mark those failing or lagging as unhealthy."""
+
+        async def probe(endpoint):
+            try:
+                response = await self._call(
+                    endpoint,
+                    lambda provider: provider.make_request("eth_blockNumber", []),
+                )
+                endpoint.block_number = int(response["result"], 16)
+                endpoint.healthy = True
+            except Exception as e:
+                endpoint.block_number = None
+                logger.warning(f"RPC endpoint {endpoint.uri} is unhealthy: {str(e)}")
+
+        await asyncio.gather(*(probe(endpoint) for endpoint in self.endpoints))
+        _mark_lagging(self.endpoints, self.max_block_lag)
+
+
+def load_provider(config):
+    """Build the provider for the RPC endpoints of a service config.
+
+    ``eth_rpc_urls`` lists every endpoint; without it ``eth_rpc_url`` is used.
+    """
+    return MultiplexedHTTPProvider(
+        _endpoint_uris(config),
+        pool_size=int(config.get("rpc_pool_size", 32)),
+        timeout=float(config.get("rpc_timeout", 10)),
+        batch_window=float(config.get("rpc_batch_window", 0)),
+        max_batch_size=int(config.get("rpc_max_batch_size", 100)),
+        hedge_after=float(config.get("rpc_hedge_after", 0)) or None,
+        health_check_interval=float(config.get("rpc_health_check_interval", 10)),
+        max_block_lag=int(config.get("rpc_max_block_lag", 5)),
+    )
+
+
+def load_async_provider(config):
+    """Build the async provider for the RPC endpoints of a service config.
+
+    Endpoints, failover, hedging and health checks are configured as for
+    ``load_provider``; ``rpc_pool_size`` and the batch window do not apply.
+    """
+    return AsyncMultiplexedHTTPProvider(
+        _endpoint_uris(config),
+        timeout=float(config.get("rpc_timeout", 10)),
+        hedge_after=float(config.get("rpc_hedge_after", 0)) or None,
+        health_check_interval=float(config.get("rpc_health_check_interval", 10)),
+        max_block_lag=int(config.get("rpc_max_block_lag", 5)),
+    )
+
+
+def _endpoint_uris(config):
+    return config.get("eth_rpc_urls") or [config["eth_rpc_url"]]
+
+
+def share_provider(clients, provider):
+    """Point every web3 client built by ``eigensdk.build_all`` at ``provider``."""
+    owners = [
+        clients,
+        clients.el_reader,
+        clients.el_writer,
+        clients.avs_registry_reader,
+        clients.avs_registry_writer,
+    ]
+    owners += [getattr(owner, "transactor", None) for owner in owners]
+    for owner in owners:
+        for attr in ("eth_http_client", "web3"):
+            client = getattr(owner, attr, None)
+            if isinstance(client, Web3):
+                client.provider = provider
@@ -0,0 +1,107 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def shard_bounds(shards):
+    """Split the space of ``0x``-prefixed hex ids into ``shards`` ranges.
+
+    Returns ``(lower, upper)`` pairs, inclusive and exclusive, with no lower
+    bound on the first range and no upper bound on the last, so every id
+    falls in exactly one range.
+    """
+    cuts = [f"0x{i * 256 // shards:02x}" for i in range(1, shards)]
+    return list(zip([None] + cuts, cuts + [None]))
+
+
+class SubgraphClient:
+    """Reads entity collections from a graph-node subgraph.
+
+    Requests share a pool of keep-alive connections and ask for gzip
+    responses. Collections are read in full, past the subgraph's page size:
+    the id space is split into ``shards`` ranges fetched in parallel, and
+    each range is paged through with its last id as the cursor, which stays
+    cheap however far it goes, unlike ``skip``.
+    """
+
+    def __init__(self, url, page_size=1000, shards=4, timeout=10.0):
+        self.url = url
+        self.page_size = page_size
+        self.shards = shards
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=shards)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Accept-Encoding": "gzip"})
+        self._executor = ThreadPoolExecutor(
+            max_workers=shards, thread_name_prefix="subgraph"
+        )
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    def query(self, query, variables=None):
+        """Run a GraphQL query and return its data."""
+        response = self.session.post(
+            self.url,
+            json={"query": query, "variables": variables or {}},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        body = response.json()
+        if body.get("errors"):
+            raise RuntimeError(f"Subgraph query failed: {body['errors']}")
+        return body["data"]
+
+    def fetch_all(self, collection, entity, fields, block=None, where=None):
+        """Every ``entity`` of ``collection`` matching ``where``, ordered by id.
+
+        Only ``fields`` are fetched, plus ``id`` for the cursor. With ``block``
+        the collection is read as of that block.
+        """
+        fields = ["id"] + [field for field in fields if field != "id"]
+        pages = [
+            self._executor.submit(
+                self._fetch_range, collection, entity, fields, block, where, bounds
+            )
+            for bounds in shard_bounds(self.shards)
+        ]
+        return [row for page in pages for row in page.result()]
+
+    def _fetch_range(self, collection, entity, fields, block, where, bounds):
+        lower, upper = bounds
+        arguments = [
+            "where: $where",
+            "first: $first",
+            "orderBy: id",
+            "orderDirection: asc",
+        ]
+        parameters = [f"$where: {entity}_filter", "$first: Int"]
+        variables = {"first": self.page_size}
+        if block is not None:
+            arguments.insert(0, "block: $block")
+            parameters.insert(0, "$block: Block_height")
+            variables["block"] = {"number": block}
+        query = (
+            f"query({', '.join(parameters)}) {{ "
+            f"{collection}({', '.join(arguments)}) {{ {' '.join(fields)} }} }}"
+        )
+
+        rows = []
+        cursor = None
+        while True:
+            page_where = dict(where or {})
+            if cursor is not None:
+                page_where["id_gt"] = cursor
+            elif lower is not None:
+                page_where["id_gte"] = lower
+            if upper is not None:
+                page_where["id_lt"] = upper
+            page = self.query(query, {**variables, "where": page_where})[collection]
+            rows.extend(page)
+            if len(page) < self.page_size:
+                return rows
+            cursor = page[-1]["id"]
@@ -0,0 +1,238 @@
+import logging
+import os
+import queue
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class SequenceSource:
+    """Numbers 0, 1, 2... one every ``interval`` seconds."""
+
+    def __init__(self, interval=10.0, start=0):
+        self.interval = interval
+        self._number = start
+        self._due = time.monotonic()
+
+    def next(self, timeout=None):
+        """The next number to square, or None if none is due within ``timeout``."""
+        if not _wait_until(self._due, timeout):
+            return None
+        number = self._number
+        self._number += 1
+        self._due = max(self._due + self.interval, time.monotonic())
+        return number
+
+
+class RateSource:
+    """Numbers 0, 1, 2... at ``rate`` tasks per second on average.
+
+    ``shape`` sets how they are spread over time:
+
+    - ``constant``: evenly spaced
+    - ``burst``: ``burst_size`` at once, every ``burst_size / rate`` seconds
+    - ``poisson``: exponentially distributed gaps, as from independent users
+
+    A source held back by backpressure does not catch up on the tasks it
+    missed by more than one burst.
+    """
+
+    SHAPES = ("constant", "burst", "poisson")
+
+    def __init__(self, rate, shape="constant", burst_size=1, start=0):
+        if rate <= 0:
+            raise ValueError("Task rate must be positive")
+        if shape not in self.SHAPES:
+            raise ValueError(f"Unknown task rate shape {shape}")
+        self.rate = rate
+        self.shape = shape
+        self.burst_size = burst_size if shape == "burst" else 1
+        self._number = start
+        self._due = time.monotonic()
+
+    def next(self, timeout=None):
+        """The next number to square, or None if none is due within ``timeout``."""
+        if not _wait_until(self._due, timeout):
+            return None
+        number = self._number
+        self._number += 1
+
+        if self.shape == "poisson":
+            gap = random.expovariate(self.rate)
+        elif self._number % self.burst_size == 0:
+            gap = self.burst_size / self.rate
+        else:
+            gap = 0.0
+        self._due = max(self._due + gap, time.monotonic() - self.burst_size / self.rate)
+        return number
+
+
+class FileSource:
+    """Numbers appended to a queue file, one per line.
+
+    The file is followed like ``tail -f`` from its start; it may not exist
+    yet. Lines that are not integers are skipped.
+    """
+
+    def __init__(self, path, poll_interval=0.5):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._offset = 0
+        self._partial = b""
+        self._numbers = []
+
+    def next(self, timeout=None):
+        """The next number to square, or None if none is queued within ``timeout``."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._numbers:
+            self._read()
+            if self._numbers:
+                break
+            if (
+                deadline is not None
+                and time.monotonic() + self.poll_interval > deadline
+            ):
+                return None
+            time.sleep(self.poll_interval)
+        return self._numbers.pop(0)
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        self._offset += len(chunk)
+        *lines, self._partial = (self._partial + chunk).split(b"\n")
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                self._numbers.append(int(line))
+            except ValueError:
+                logger.warning(f"Skipping invalid task in {self.path}: {line!r}")
+
+
+class QueueSource:
+    """Numbers pushed with ``put``, e.g. by an HTTP endpoint."""
+
+    def __init__(self, max_size=10000):
+        self._queue = queue.Queue(maxsize=max_size)
+
+    def put(self, number):
+        """Queue a number, raising ``queue.Full`` if the queue is full."""
+        self._queue.put_nowait(number)
+
+    def next(self, timeout=None):
+        """The next number to square, or None if none is queued within ``timeout``."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+def load_task_source(config):
+    """Build the task source named by ``task_source`` in a service config."""
+    kind = config.get("task_source", "sequence")
+    if kind == "sequence":
+        return SequenceSource(float(config.get("new_task_interval", 10)))
+    if kind == "rate":
+        return RateSource(
+            float(config.get("task_rate", 1)),
+            shape=config.get("task_rate_shape", "constant"),
+            burst_size=int(config.get("task_burst_size", 1)),
+        )
+    if kind == "file":
+        return FileSource(config.get("task_source_path", "data/tasks.txt"))
+    if kind == "endpoint":
+        return QueueSource(int(config.get("task_queue_size", 10000)))
+    raise ValueError(f"Unknown task source {kind}")
+
+
+def _wait_until(due, timeout):
+    """Sleep until ``due``, or for at most ``timeout``; True if ``due`` passed."""
+    remaining = due - time.monotonic()
+    if remaining <= 0:
+        return True
+    if timeout is not None and remaining > timeout:
+        time.sleep(timeout)
+        return False
+    time.sleep(remaining)
+    return True
+
+
+class InFlightLimiter:
+    """Closed-loop limit on the tasks created but not yet at threshold.
+
+    A slot is acquired before a task is sent and held until its signatures
+    reach the threshold or its response window passes. The limit follows
+    AIMD: every task reaching threshold raises it by ``1 / limit`` (one slot
+    per limit's worth of tasks), and every expiry round multiplies it by
+    ``decrease``, so the number of tasks in flight settles just under what
+    the operators and the aggregator can answer in time.
+    """
+
+    def __init__(self, initial=16, minimum=1, maximum=1024, decrease=0.5):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self._reserved = 0
+        self._tasks = {}
+        self._cond = threading.Condition()
+
+    @property
+    def in_flight(self):
+        with self._cond:
+            return self._reserved + len(self._tasks)
+
+    def acquire(self, count=1, timeout=None):
+        """Reserve slots for tasks about to be sent; False on timeout."""
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: self._reserved + len(self._tasks) + count
+                <= max(int(self.limit), count),
+                timeout,
+            )
+            if ready:
+                self._reserved += count
+            return ready
+
+    def cancel(self, count=1):
+        """Give back slots of tasks that were not created."""
+        with self._cond:
+            self._reserved = max(0, self._reserved - count)
+            self._cond.notify_all()
+
+    def started(self, task_index, deadline):
+        """Turn a reserved slot into a created task, due by block ``deadline``."""
+        with self._cond:
+            self._reserved = max(0, self._reserved - 1)
+            self._tasks[task_index] = deadline
+
+    def completed(self, task_index):
+        """Free the slot of a task that reached threshold."""
+        with self._cond:
+            if self._tasks.pop(task_index, None) is None:
+                return
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+    def expire(self, block):
+        """Free the slots of tasks past their deadline, returning their count."""
+        with self._cond:
+            expired = [i for i, deadline in self._tasks.items() if deadline <= block]
+            if not expired:
+                return 0
+            for task_index in expired:
+                del self._tasks[task_index]
+            self.limit = max(self.minimum, self.limit * self.decrease)
+            self._cond.notify_all()
+        logger.warning(
+            f"{len(expired)} tasks expired before reaching threshold, "
+            f"in-flight limit lowered to {int(self.limit)}"
+        )
+        return len(expired)
@@ -0,0 +1,173 @@
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Tracer:
+    """Appends the spans of task lifecycles to a JSON lines file.
+
+    Each line is one span: the service and stage that produced it, the task
+    indices it covers and its wall-clock start and end in seconds. Spans of
+    every service are merged by task index offline, so the services should
+    share a clock (they do when run on one host). Without a path nothing is
+    recorded.
+    """
+
+    def __init__(self, path, service, flush_interval=1.0):
+        self.service = service
+        self.flush_interval = flush_interval
+        self._file = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(path, "a", buffering=1 << 16)
+        self._lock = threading.Lock()
+        self._next_flush = time.monotonic() + flush_interval
+
+    @property
+    def enabled(self):
+        return self._file is not None
+
+    @contextmanager
+    def span(self, name, tasks, **fields):
+        """Record the duration of the ``with`` block as a span of ``tasks``.
+
+        The yielded dict can be updated with fields only known inside the
+        block. A span left by an exception is recorded with its type.
+        """
+        if self._file is None:
+            yield fields
+            return
+        start = time.time()
+        try:
+            yield fields
+        except Exception as e:
+            fields["error"] = type(e).__name__
+            raise
+        finally:
+            self.record(name, tasks, start, time.time(), **fields)
+
+    def record(self, name, tasks, start, end, **fields):
+        """Record a span of ``tasks`` (a task index or a list of them)."""
+        if self._file is None:
+            return
+        entry = {
+            "service": self.service,
+            "span": name,
+            "tasks": list(tasks) if isinstance(tasks, (list, tuple)) else [tasks],
+            "start": round(start, 6),
+            "end": round(end, 6),
+            **fields,
+        }
+        line = json.dumps(entry, separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            now = time.monotonic()
+            if now >= self._next_flush:
+                self._file.flush()
+                self._next_flush = now + self.flush_interval
+
+    def close(self):
+        if self._file is None:
+            return
+        with self._lock:
+            self._file.close()
+            self._file = None
+
+
+def load_tracer(config, service):
+    """Build the tracer of a service from its ``trace_path`` config."""
+    return Tracer(
+        config.get("trace_path") or None,
+        service,
+        flush_interval=float(config.get("trace_flush_interval", 1)),
+    )
+
+
+def load_spans(paths):
+    """Read the spans of trace files, skipping lines cut short by a crash."""
+    spans = []
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                try:
+                    spans.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return spans
+
+
+def task_timelines(spans):
+    """Merge spans into the critical path of each task.
+
+    A task's timeline is its hops (``service.span``) ordered by start time.
+    When several spans share a hop, e.g. one per operator, the one ending
+    last is kept, as the task could not move on before it. Each hop carries
+    its ``wait``, the time since the previous hop ended, and ``duration``.
+    """
+    hops = {}
+    for span in spans:
+        hop = f"{span['service']}.{span['span']}"
+        for task_index in span["tasks"]:
+            task_hops = hops.setdefault(task_index, {})
+            known = task_hops.get(hop)
+            if known is None or span["end"] > known["end"]:
+                task_hops[hop] = span
+
+    timelines = {}
+    for task_index, task_hops in hops.items():
+        ordered = sorted(task_hops.items(), key=lambda item: item[1]["start"])
+        origin = ordered[0][1]["start"]
+        previous_end = origin
+        timeline = []
+        for hop, span in ordered:
+            timeline.append(
+                {
+                    "hop": hop,
+                    "offset": span["start"] - origin,
+                    "wait": max(0.0, span["start"] - previous_end),
+                    "duration": span["end"] - span["start"],
+                    "error": span.get("error"),
+                }
+            )
+            previous_end = max(previous_end, span["end"])
+        timelines[task_index] = {"hops": timeline, "total": previous_end - origin}
+    return timelines
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list of values."""
+    ordered = sorted(values)
+    rank = min(len(ordered), max(1, math.ceil(fraction * len(ordered))))
+    return ordered[rank - 1]
+
+
+def hop_percentiles(timelines, fractions=(0.5, 0.9, 0.99)):
+    """Percentiles of the wait and duration of every hop, and of the total."""
+    samples = {}
+    for timeline in timelines.values():
+        for hop in timeline["hops"]:
+            hop_samples = samples.setdefault(hop["hop"], {"wait": [], "duration": []})
+            hop_samples["wait"].append(hop["wait"])
+            hop_samples["duration"].append(hop["duration"])
+    totals = [timeline["total"] for timeline in timelines.values()]
+    if totals:
+        samples["total"] = {"duration": totals}
+
+    return {
+        hop: {
+            "count": len(hop_samples["duration"]),
+            **{
+                f"{kind}_p{round(fraction * 100)}": percentile(values, fraction)
+                for kind, values in hop_samples.items()
+                for fraction in fractions
+            },
+        }
+        for hop, hop_samples in samples.items()
+    }
@@ -0,0 +1,55 @@
+import json
+import os
+import sqlite3
+import threading
+
+
+class TransactionCache:
+    """On-disk cache of values decoded from transactions, keyed by tx hash.
+
+    Transactions are immutable once mined, so entries never expire and data
+    decoded before a restart is served without fetching the transaction again.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS tx_cache (
+                tx_hash TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+            """)
+
+    def get_many(self, tx_hashes):
+        """Return ``{tx_hash: value}`` for the hashes present in the cache."""
+        tx_hashes = list(tx_hashes)
+        if not tx_hashes:
+            return {}
+        placeholders = ",".join("?" * len(tx_hashes))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT tx_hash, value FROM tx_cache WHERE tx_hash IN ({placeholders})",
+                tx_hashes,
+            ).fetchall()
+        return {tx_hash: json.loads(value) for tx_hash, value in rows}
+
+    def put_many(self, values):
+        """Store ``{tx_hash: value}`` entries in a single transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tx_cache (tx_hash, value) VALUES (?, ?)",
+                [(tx_hash, json.dumps(value)) for tx_hash, value in values.items()],
+            )
+            self._conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
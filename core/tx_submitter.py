@@ -0,0 +1,98 @@
+import logging
+import threading
+
+from web3.exceptions import TransactionNotFound
+
+logger = logging.getLogger(__name__)
+
+
+class TransactionSubmitter:
+    """Sends transactions without waiting for them to be mined.
+
+    Nonces are assigned locally, so several transactions can be in flight at
+    once, and a background thread polls for receipts and hands each one to the
+    callback given when its transaction was submitted.
+    """
+
+    def __init__(self, web3, address, private_key, poll_interval=1.0):
+        self.web3 = web3
+        self.address = address
+        self.private_key = private_key
+        self.poll_interval = poll_interval
+        self._nonce = None
+        self._chain_id = None
+        self._nonce_lock = threading.Lock()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="tx-receipts", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, contract_function, gas, on_receipt=None):
+        """Sign and send a contract call, returning its transaction hash."""
+        with self._nonce_lock:
+            if self._chain_id is None:
+                self._chain_id = self.web3.eth.chain_id
+            if self._nonce is None:
+                self._nonce = self.web3.eth.get_transaction_count(
+                    self.address, "pending"
+                )
+            tx = contract_function.build_transaction(
+                {
+                    "from": self.address,
+                    "gas": gas,
+                    "gasPrice": self.web3.to_wei("20", "gwei"),
+                    "nonce": self._nonce,
+                    "chainId": self._chain_id,
+                }
+            )
+            signed_tx = self.web3.eth.account.sign_transaction(
+                tx, private_key=self.private_key
+            )
+            try:
+                tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            except Exception:
+                # the local nonce may have drifted from the node's, resync it
+                self._nonce = None
+                raise
+            self._nonce += 1
+
+        with self._pending_lock:
+            self._pending[tx_hash] = on_receipt
+        return tx_hash
+
+    def pending(self):
+        with self._pending_lock:
+            return len(self._pending)
+
+    def _run(self):
+        while not self._stop_event.wait(self.poll_interval):
+            with self._pending_lock:
+                pending = list(self._pending.items())
+            for tx_hash, on_receipt in pending:
+                try:
+                    receipt = self.web3.eth.get_transaction_receipt(tx_hash)
+                except TransactionNotFound:
+                    continue
+                except Exception as e:
+                    logger.error(f"Failed to fetch receipt of {tx_hash.hex()}: {e}")
+                    continue
+                with self._pending_lock:
+                    self._pending.pop(tx_hash, None)
+                if on_receipt is not None:
+                    try:
+                        on_receipt(receipt)
+                    except Exception as e:
+                        logger.error(f"Receipt callback failed: {str(e)}")
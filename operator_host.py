@@ -0,0 +1,273 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import yaml
+from web3 import Web3
+
+from core.abi import task_manager_codec
+from core.checkpoint import Checkpoint, PendingBlocks
+from core.head_tracker import HeadTracker
+from core.ingestion import EventIngestor
+from core.log import configure_logging, get_logger
+from core.pipeline import Pipeline, Stage
+from core.rpc import load_provider
+from core.tracing import load_tracer
+from squaring_operator import OUTBOX_PRUNE_INTERVAL_SECONDS, SquaringOperator
+
+logger = get_logger(__name__)
+
+
+class OperatorHost:
+    """Runs several operator identities in a single process.
+
+    Every identity keeps its own keys, operator id and outbox, but they share
+    one NewTaskCreated feed, one head tracker, one RPC provider (used by every
+    identity's clients too) and one HTTP session to the aggregator. Each task
+    event is signed by every identity and the signatures are delivered in a
+    single request to ``/signatures``. Like a single operator, the host
+    checkpoints the blocks whose tasks every identity recorded and backfills
+    the tasks created while it was down.
+    """
+
+    def __init__(self, config, operator_configs):
+        if not operator_configs:
+            raise ValueError("Operator host requires at least one operator config")
+        self.config = config
+        self.http = requests.Session()
+        self.web3 = Web3(load_provider(config))
+        self.head_tracker = None
+        self.pipeline = None
+        self.task_response_window_block = None
+        self.checkpoint = Checkpoint(
+            config.get("checkpoint_path", "data/operator-host.checkpoint.json")
+        )
+        self.pending_blocks = PendingBlocks()
+        self.tracer = load_tracer(config, "operator")
+        self.log_sample_every = int(config.get("log_sample_every", 1))
+        self._stop_flag = False
+
+        with ThreadPoolExecutor(max_workers=len(operator_configs)) as executor:
+            self.operators = list(
+                executor.map(
+                    lambda operator_config: SquaringOperator(
+                        operator_config, web3=self.web3, http=self.http
+                    ),
+                    operator_configs,
+                )
+            )
+
+        self.task_manager = self.operators[0].task_manager
+        logger.info(f"Hosting {len(self.operators)} operators")
+
+    def stop(self):
+        """Stop the operator host"""
+        logger.debug("Stopping operator host...")
+        self._stop_flag = True
+
+    def start(self):
+        """Start the operator host"""
+        logger.debug("Starting operator host...")
+
+        codec = task_manager_codec()
+        ingestor = EventIngestor(
+            self.web3,
+            self.task_manager.address,
+            codec.decode_log,
+            reorg_depth=int(self.config.get("reorg_depth", 64)),
+            min_poll_interval=float(self.config.get("min_poll_interval", 0.5)),
+            max_poll_interval=float(self.config.get("max_poll_interval", 12)),
+        )
+        new_task_events = []
+        ingestor.subscribe(codec.new_task_created_topic, new_task_events.append)
+        self.task_response_window_block = (
+            self.task_manager.functions.getTaskResponseWindowBlock().call()
+        )
+        self.head_tracker = HeadTracker(
+            self.web3, float(self.config.get("head_poll_interval", 1))
+        )
+        self.head_tracker.start()
+        for operator in self.operators:
+            operator.head_tracker = self.head_tracker
+            operator.task_response_window_block = self.task_response_window_block
+
+        self.pipeline = self._build_pipeline()
+        self.pipeline.start()
+        for operator in self.operators:
+            operator.replay_outbox()
+        # polling picks up right after the last backfilled block
+        head = self.head_tracker.latest
+        self.backfill(head)
+        ingestor.start_at(head)
+
+        next_prune = time.monotonic() + OUTBOX_PRUNE_INTERVAL_SECONDS
+
+        def on_poll(_):
+            nonlocal next_prune
+            events = list(new_task_events)
+            new_task_events.clear()
+            for event in events:
+                logger.debug(
+                    "New task created: %s", event, sample_every=self.log_sample_every
+                )
+            self._take_in(events)
+            self.save_checkpoint(ingestor.last_block)
+
+            if time.monotonic() >= next_prune:
+                for operator in self.operators:
+                    operator.prune_outbox(self.head_tracker.latest)
+                next_prune = time.monotonic() + OUTBOX_PRUNE_INTERVAL_SECONDS
+
+        logger.debug("Listening for new tasks...")
+        try:
+            ingestor.run(lambda: self._stop_flag, on_poll)
+        finally:
+            self.pipeline.stop()
+            self.head_tracker.stop()
+            self.tracer.close()
+            for operator in self.operators:
+                operator.tracer.close()
+
+    def backfill(self, to_block):
+        """Hand the tasks created while the host was down to the pipeline."""
+        pending = self.operators[0].task_events_since(
+            self.checkpoint.load(), to_block, self._signed_by_all
+        )
+        self._take_in(pending)
+        return {event.task_index for event in pending}
+
+    def _signed_by_all(self, task_index):
+        return all(operator.outbox.contains(task_index) for operator in self.operators)
+
+    def save_checkpoint(self, last_block):
+        """Checkpoint the polled blocks whose tasks every operator recorded."""
+        self.pending_blocks.expire(
+            self.head_tracker.latest - self.task_response_window_block
+        )
+        block = self.pending_blocks.safe_block(last_block)
+        if block is not None:
+            self.checkpoint.save(block)
+
+    def _take_in(self, events):
+        for event in events:
+            self.pending_blocks.add(event.block_number)
+            self.pipeline.submit(event)
+
+    def _build_pipeline(self):
+        """Build the sign -> send pipeline shared by all hosted operators."""
+        queue_size = int(self.config.get("pipeline_queue_size", 100))
+        return Pipeline(
+            [
+                Stage(
+                    "sign",
+                    self._sign_stage,
+                    int(self.config.get("sign_workers", 4)),
+                    queue_size,
+                ),
+                Stage(
+                    "send",
+                    self._send_stage,
+                    int(self.config.get("send_workers", 16)),
+                    queue_size,
+                ),
+            ]
+        )
+
+    def _sign_stage(self, event):
+        # operators that signed the task before a restart are skipped
+        signed_responses = [
+            (operator, operator.sign_task_response(operator.process_task_event(event)))
+            for operator in self.operators
+            if not operator.outbox.contains(event.task_index)
+        ]
+        return event, signed_responses
+
+    def _send_stage(self, item):
+        event, signed_responses = item
+        task_created_block = event.task.task_created_block
+        deliveries = [
+            (
+                operator,
+                operator.record_task_response(signed_response, task_created_block),
+            )
+            for operator, signed_response in signed_responses
+        ]
+        self.pending_blocks.done(event.block_number)
+        if not deliveries:
+            return
+
+        # Wait briefly to ensure the aggregator has processed the task
+        time.sleep(3)
+
+        self.deliver_task_responses(deliveries)
+
+    def deliver_task_responses(self, deliveries):
+        """Post ``(operator, payload)`` responses of hosted operators in one request.
+
+        Responses stay pending in their operator's outbox if the request fails.
+        Those an overloaded aggregator sheds are posted again after the delay it
+        sets in ``Retry-After``, up to ``delivery_retries`` times.
+        """
+        url = f'http://{self.config["aggregator_server_ip_port_address"]}/signatures'
+        retries = int(self.config.get("delivery_retries", 2))
+        for attempt in range(retries + 1):
+            payloads = [data for _, data in deliveries]
+            try:
+                with self.tracer.span("deliver", payloads[0]["task_index"]) as span:
+                    response = self.http.post(url, json=payloads)
+                    span["status"] = response.status_code
+                response.raise_for_status()
+                results = response.json()["results"]
+            except Exception as e:
+                logger.error(f"Error sending task responses: {str(e)}")
+                return False
+
+            shed = []
+            for (operator, data), result in zip(deliveries, results):
+                retry_after = SquaringOperator._retry_after(
+                    result["status"], response.headers
+                )
+                if retry_after is not None and attempt < retries:
+                    shed.append((operator, data))
+                else:
+                    operator.acknowledge_delivery(data, result["status"], result)
+            if not shed:
+                break
+            retry_after = SquaringOperator._retry_after(503, response.headers)
+            logger.debug(
+                f"Aggregator overloaded, retrying {len(shed)} responses "
+                f"in {retry_after}s"
+            )
+            deliveries = shed
+            time.sleep(retry_after)
+        return True
+
+
+def _load_yaml(path):
+    if not os.path.exists(path):
+        logger.error(f"Config file not found at: {path}")
+        raise FileNotFoundError(f"Config file not found at: {path}")
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=yaml.BaseLoader)
+
+
+if __name__ == "__main__":
+    dir_path = os.path.dirname(os.path.abspath(__file__))
+
+    host_config = _load_yaml(
+        os.path.join(dir_path, "./config-files/operator-host.yaml")
+    )
+    avs_config = _load_yaml(os.path.join(dir_path, "./config-files/avs.yaml"))
+    operator_configs = [
+        {**_load_yaml(os.path.join(dir_path, path)), **avs_config}
+        for path in host_config["operator_configs"]
+    ]
+
+    configure_logging(
+        host_config.get("log_level", "INFO"), host_config.get("log_format") == "json"
+    )
+    host = OperatorHost(
+        config={**operator_configs[0], **host_config}, operator_configs=operator_configs
+    )
+    host.start()
@@ -1,7 +1,7 @@
 import json
-import logging
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import eth_abi
 import requests
@@ -13,35 +13,83 @@ from eth_account import Account
 from eth_typing import Address
 from web3 import Web3
 
-# change logging level to DEBUG for testing
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+from core.abi import load_abi, task_manager_codec
+from core.checkpoint import Checkpoint, PendingBlocks
+from core.deployment_cache import DeploymentCache
+from core.head_tracker import HeadTracker
+from core.ingestion import EventIngestor
+from core.log import configure_logging, get_logger
+from core.log_fetcher import LogFetcher
+from core.merkle import merkle_root, task_response_leaf
+from core.outbox import Outbox
+from core.pipeline import Pipeline, Stage
+from core.rpc import load_provider, share_provider
+from core.tracing import load_tracer
+
+OUTBOX_PRUNE_INTERVAL_SECONDS = 600
+
+logger = get_logger(__name__)
 
 
 class SquaringOperator:
-    def __init__(self, config):
+    def __init__(self, config, web3=None, http=None):
         self.config = config
         self.times_failing = int(config.get("times_failing", 0))
+        self.log_sample_every = int(config.get("log_sample_every", 1))
+        self.tracer = load_tracer(config, "operator")
         self.bls_key_pair = None
         self.operator_ecdsa_private_key = None
         self.operator_address = None
         self.clients = None
         self.task_manager = None
-        self.web3 = None
+        self.web3 = web3
         self.operator_id = None
+        self.pipeline = None
+        self.outbox = None
+        self.head_tracker = None
+        self.task_response_window_block = None
+        self.deployment_cache = None
+        self.checkpoint = None
+        self.pending_blocks = PendingBlocks()
+        self.http = http or requests.Session()
+        self.startup_timings = {}
         self._stop_flag = False
 
-        self._load_bls_key()
-        self._load_ecdsa_key()
-        self._load_clients()
-        self._load_task_manager()
+        started = time.monotonic()
+        self._load_web3()
+        self._load_checkpoint()
+        # key decryption, client construction and contract lookups are
+        # independent of each other apart from the clients needing the ecdsa key
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            ecdsa_key = executor.submit(self._timed, "ecdsa_key", self._load_ecdsa_key)
+            loads = [
+                executor.submit(self._timed, "bls_key", self._load_bls_key),
+                executor.submit(self._timed, "task_manager", self._load_task_manager),
+                executor.submit(self._timed, "outbox", self._load_outbox),
+            ]
+            ecdsa_key.result()
+            loads.append(executor.submit(self._timed, "clients", self._load_clients))
+            for load in loads:
+                load.result()
 
         if config.get("register_operator_on_startup") == "true":
-            self.register_operator_on_startup()
+            self._timed("registration", self.register_operator_on_startup)
 
         # operator id can only be loaded after registration
-        self._load_operator_id()
-        logger.debug("Operator initialized successfully")
+        self._timed("operator_id", self._load_operator_id)
+        breakdown = ", ".join(
+            f"{name}={seconds:.3f}s" for name, seconds in self.startup_timings.items()
+        )
+        logger.info(
+            f"Operator initialized in {time.monotonic() - started:.3f}s ({breakdown})"
+        )
+
+    def _timed(self, name, load):
+        started = time.monotonic()
+        try:
+            return load()
+        finally:
+            self.startup_timings[name] = time.monotonic() - started
 
     def register_operator_on_startup(self):
         """Register operator with EigenLayer and AVS on startup"""
@@ -73,53 +121,300 @@ class SquaringOperator:
         if self.task_manager is None:
             raise RuntimeError("Task manager not loaded")
 
-        event_filter = self.task_manager.events.NewTaskCreated.create_filter(
-            from_block="latest"
+        codec = task_manager_codec()
+        ingestor = EventIngestor(
+            self.web3,
+            self.task_manager.address,
+            codec.decode_log,
+            reorg_depth=int(self.config.get("reorg_depth", 64)),
+            min_poll_interval=float(self.config.get("min_poll_interval", 0.5)),
+            max_poll_interval=float(self.config.get("max_poll_interval", 12)),
+        )
+        new_task_events = []
+        ingestor.subscribe(
+            codec.new_task_created_topic, new_task_events.append, self._on_task_removed
+        )
+        self.task_response_window_block = (
+            self.task_manager.functions.getTaskResponseWindowBlock().call()
         )
+        self.head_tracker = HeadTracker(
+            self.web3, float(self.config.get("head_poll_interval", 1))
+        )
+        self.head_tracker.start()
+
+        self.pipeline = self._build_pipeline()
+        self.pipeline.start()
+        self.replay_outbox()
+        # polling picks up right after the last backfilled block
+        head = self.head_tracker.latest
+        self.backfill(head)
+        ingestor.start_at(head)
+
+        next_prune = time.monotonic() + OUTBOX_PRUNE_INTERVAL_SECONDS
+
+        def on_poll(_):
+            nonlocal next_prune
+            events = list(new_task_events)
+            new_task_events.clear()
+            for event in events:
+                logger.debug(
+                    "New task created: %s", event, sample_every=self.log_sample_every
+                )
+            for item in self._take_in(events):
+                self.pipeline.submit(item)
+            self.save_checkpoint(ingestor.last_block)
+
+            if time.monotonic() >= next_prune:
+                self.prune_outbox(self.head_tracker.latest)
+                next_prune = time.monotonic() + OUTBOX_PRUNE_INTERVAL_SECONDS
 
         logger.debug("Listening for new tasks...")
-        while not self._stop_flag:
-            try:
-                for event in event_filter.get_new_entries():
-                    logger.debug(f"New task created: {event}")
-                    try:
-                        task_response = self.process_task_event(event)
-                        signed_response = self.sign_task_response(task_response)
-                        self.send_signed_task_response(signed_response)
-                    except Exception as e:
-                        logger.error(f"Unexpected error handling task: {str(e)}")
-
-                time.sleep(3)
-            except Exception as e:
-                logger.error(f"Error in event processing loop: {str(e)}")
-                time.sleep(5)
+        try:
+            ingestor.run(lambda: self._stop_flag, on_poll)
+        finally:
+            self.pipeline.stop()
+            self.head_tracker.stop()
+            self.tracer.close()
+
+    def _on_task_removed(self, event):
+        # a response signed for the task cannot be taken back, the aggregator
+        # and the contract reject it if the task is not created again
+        logger.warning(f"Task {event.task_index} was removed by a reorg")
+
+    def backfill(self, to_block):
+        """Hand the tasks created while the operator was down to the pipeline.
+
+        Returns the indices of the backfilled tasks.
+        """
+        pending = self.missed_task_events(to_block)
+        for item in self._take_in(pending):
+            self.pipeline.submit(item)
+        return {event.task_index for event in pending}
+
+    def missed_task_events(self, to_block):
+        """Task events created since the checkpoint that still need a response."""
+        return self.task_events_since(
+            self.checkpoint.load(), to_block, self.outbox.contains
+        )
+
+    def task_events_since(self, last_block, to_block, signed):
+        """Task events created after ``last_block`` that still need a response.
+
+        Logs are fetched from the block after ``last_block`` up to ``to_block``,
+        but no further back than the response window as older tasks can no
+        longer be responded to. Tasks that expired or for which ``signed``
+        returns true are skipped.
+        """
+        if last_block is None:
+            return []
+        from_block = max(last_block + 1, to_block - self.task_response_window_block)
+        if from_block > to_block:
+            return []
+
+        started = time.monotonic()
+        codec = task_manager_codec()
+        fetcher = LogFetcher(
+            self.web3,
+            self.task_manager.address,
+            [codec.new_task_created_topic],
+            chunk_size=int(self.config.get("backfill_chunk_size", 2000)),
+            max_chunk_size=int(self.config.get("backfill_max_chunk_size", 10000)),
+            workers=int(self.config.get("backfill_workers", 4)),
+        )
+        events = [codec.decode_log(log) for log in fetcher.fetch(from_block, to_block)]
+        pending = [
+            event
+            for event in events
+            if not self._task_expired(event, to_block) and not signed(event.task_index)
+        ]
+        logger.info(
+            f"Backfilling {len(pending)} of {len(events)} tasks created in blocks "
+            f"{from_block}-{to_block}, fetched in {time.monotonic() - started:.2f}s"
+        )
+        return pending
+
+    def save_checkpoint(self, last_block):
+        """Checkpoint the polled blocks whose tasks are all in the outbox.
+
+        Tasks still in the pipeline hold the checkpoint back, so a restart
+        backfills them, unless their response window is over.
+        """
+        if self.task_response_window_block is not None:
+            self.pending_blocks.expire(
+                self._latest_block() - self.task_response_window_block
+            )
+        block = self.pending_blocks.safe_block(last_block)
+        if block is not None:
+            self.checkpoint.save(block)
+
+    def _task_expired(self, event, current_block):
+        # the contract accepts responses up to the end of the response window
+        return (
+            event.task.task_created_block + self.task_response_window_block
+            < current_block
+        )
+
+    def _build_pipeline(self):
+        """Build the compute -> sign -> send pipeline for task events.
+
+        Every stage has its own worker count and bounded queue, configurable via
+        ``<stage>_workers`` and ``pipeline_queue_size``. A task moves through the
+        stages in order; a full queue blocks the stage feeding it. With
+        ``batch_signing`` enabled the items are batches of task events.
+        """
+        queue_size = int(self.config.get("pipeline_queue_size", 100))
+        if self._batch_signing():
+            handlers = (
+                self._compute_batch_stage,
+                self._sign_batch_stage,
+                self._send_batch_stage,
+            )
+        else:
+            handlers = (self._compute_stage, self._sign_stage, self._send_stage)
+        return Pipeline(
+            [
+                Stage(
+                    "compute",
+                    handlers[0],
+                    workers=int(self.config.get("compute_workers", 1)),
+                    queue_size=queue_size,
+                ),
+                Stage(
+                    "sign",
+                    handlers[1],
+                    workers=int(self.config.get("sign_workers", 4)),
+                    queue_size=queue_size,
+                ),
+                Stage(
+                    "send",
+                    handlers[2],
+                    workers=int(self.config.get("send_workers", 16)),
+                    queue_size=queue_size,
+                ),
+            ]
+        )
+
+    def _batch_signing(self):
+        return self.config.get("batch_signing") == "true"
+
+    def _take_in(self, events):
+        """Hold the checkpoint at the blocks of new task events and batch them."""
+        for event in events:
+            self.pending_blocks.add(event.block_number)
+        return self._pipeline_items(events)
+
+    def _recorded(self, events):
+        for event in events:
+            self.pending_blocks.done(event.block_number)
+
+    def _pipeline_items(self, events):
+        """Turn polled task events into pipeline items.
+
+        In batch mode, events are grouped into batches of tasks that share their
+        creation block and quorum parameters, as the contract requires for a
+        batch response, of at most ``batch_max_size`` tasks each.
+        """
+        if not self._batch_signing():
+            return events
+
+        batch_max_size = int(self.config.get("batch_max_size", 64))
+        groups = {}
+        for event in events:
+            key = (
+                event.task.task_created_block,
+                event.task.quorum_numbers,
+                event.task.quorum_threshold_percentage,
+            )
+            groups.setdefault(key, []).append(event)
+
+        batches = []
+        for group in groups.values():
+            group.sort(key=lambda event: event.task_index)
+            for i in range(0, len(group), batch_max_size):
+                batches.append(group[i : i + batch_max_size])
+        return batches
+
+    def _compute_stage(self, event):
+        return event, self.process_task_event(event)
+
+    def _sign_stage(self, item):
+        event, task_response = item
+        return event, self.sign_task_response(task_response)
+
+    def _send_stage(self, item):
+        event, signed_response = item
+        data = self.record_task_response(signed_response, event.task.task_created_block)
+        self._recorded([event])
+
+        # Wait briefly to ensure the aggregator has processed the task
+        time.sleep(3)
+
+        self._deliver_task_response(data)
+
+    def _compute_batch_stage(self, events):
+        return events, [self.process_task_event(event) for event in events]
+
+    def _sign_batch_stage(self, item):
+        events, task_responses = item
+        return events, self.sign_task_response_batch(task_responses)
+
+    def _send_batch_stage(self, item):
+        events, signed_batch = item
+        data = self.record_task_response_batch(
+            signed_batch, events[0].task.task_created_block
+        )
+        self._recorded(events)
+
+        # Wait briefly to ensure the aggregator has processed the tasks
+        time.sleep(3)
+
+        self._deliver_task_response(data)
+
+    def replay_outbox(self):
+        """Resend signed responses that were not delivered before a restart.
+
+        Only responses to tasks still inside their response window are resent,
+        the rest can no longer be aggregated and are dropped from the outbox.
+        """
+        if self.outbox is None:
+            return
+
+        self.prune_outbox(self._latest_block())
+        pending = self.outbox.pending()
+        if pending:
+            logger.info(f"Replaying {len(pending)} undelivered task responses")
+        for _, _, data in pending:
+            self._deliver_task_response(data)
+
+    def prune_outbox(self, current_block):
+        if self.outbox is None or self.task_response_window_block is None:
+            return
+        pruned = self.outbox.prune(current_block - self.task_response_window_block)
+        if pruned:
+            logger.debug(f"Pruned {pruned} expired outbox entries")
 
     def process_task_event(self, event):
-        """Process a new task event and generate a task response"""
+        """Process a decoded NewTaskCreated log and generate a task response"""
         logger.debug(
             "Processing new task",
-            extra={
-                "numberToBeSquared": event["args"]["task"]["numberToBeSquared"],
-                "taskIndex": event["args"]["taskIndex"],
-                "taskCreatedBlock": event["args"]["task"]["taskCreatedBlock"],
-                "quorumNumbers": event["args"]["task"]["quorumNumbers"],
-                "QuorumThresholdPercentage": event["args"]["task"][
-                    "quorumThresholdPercentage"
-                ],
-            },
+            numberToBeSquared=event.task.number_to_be_squared,
+            taskIndex=event.task_index,
+            taskCreatedBlock=event.task.task_created_block,
+            sample_every=self.log_sample_every,
         )
 
-        task_index = event["args"]["taskIndex"]
-        number_to_be_squared = event["args"]["task"]["numberToBeSquared"]
-        number_squared = number_to_be_squared**2
+        task_index = event.task_index
+        with self.tracer.span("process_task_event", task_index):
+            number_to_be_squared = event.task.number_to_be_squared
+            number_squared = number_to_be_squared**2
 
-        # Optional: Simulate failures if configured
-        if self.times_failing > 0:
-            import random
+            # Optional: Simulate failures if configured
+            if self.times_failing > 0:
+                import random
 
-            if random.randint(0, 99) < self.times_failing:
-                number_squared = 908243203843
-                logger.debug("Operator computed wrong task result")
+                if random.randint(0, 99) < self.times_failing:
+                    number_squared = 908243203843
+                    logger.debug("Operator computed wrong task result")
 
         task_response = {
             "referenceTaskIndex": task_index,
@@ -133,16 +428,21 @@ class SquaringOperator:
         if self.bls_key_pair is None:
             raise RuntimeError("BLS key pair not loaded")
 
-        encoded = eth_abi.encode(
-            ["uint32", "uint256"],
-            [task_response["referenceTaskIndex"], task_response["numberSquared"]],
-        )
-        hash_bytes = Web3.keccak(encoded)
-        signature = self.bls_key_pair.sign_message(msg_bytes=hash_bytes).to_json()
+        with self.tracer.span(
+            "sign_task_response", task_response["referenceTaskIndex"]
+        ):
+            encoded = eth_abi.encode(
+                ["uint32", "uint256"],
+                [task_response["referenceTaskIndex"], task_response["numberSquared"]],
+            )
+            hash_bytes = Web3.keccak(encoded)
+            signature = self.bls_key_pair.sign_message(msg_bytes=hash_bytes).to_json()
 
         logger.debug(
-            f"Signature generated, task id: {task_response['referenceTaskIndex']}, "
-            f"number squared: {task_response['numberSquared']}"
+            "Signature generated, task id: %s, number squared: %s",
+            task_response["referenceTaskIndex"],
+            task_response["numberSquared"],
+            sample_every=self.log_sample_every,
         )
 
         signed_response = {
@@ -153,10 +453,52 @@ class SquaringOperator:
 
         return signed_response
 
-    def send_signed_task_response(self, signed_response):
-        """Send a signed task response to the aggregator"""
+    def sign_task_response_batch(self, task_responses):
+        """Sign the merkle root of a batch of task responses with the operator's BLS key
+
+        Leaves are the messages that would be signed for each task on its own,
+        so a single signature attests to every response in the batch.
+        """
+        if self.bls_key_pair is None:
+            raise RuntimeError("BLS key pair not loaded")
+
+        task_indices = [r["referenceTaskIndex"] for r in task_responses]
+        with self.tracer.span("sign_task_response", task_indices):
+            leaves = [
+                task_response_leaf(
+                    task_response["referenceTaskIndex"], task_response["numberSquared"]
+                )
+                for task_response in task_responses
+            ]
+            batch_root = merkle_root(leaves)
+            signature = self.bls_key_pair.sign_message(msg_bytes=batch_root).to_json()
+
+        logger.debug("Batch signature generated for %d tasks", len(task_responses))
+
+        return {
+            "taskResponses": task_responses,
+            "batchRoot": Web3.to_hex(batch_root),
+            "blsSignature": signature,
+            "operatorId": self.operator_id.hex() if self.operator_id else None,
+        }
+
+    def send_signed_task_response(self, signed_response, task_created_block=None):
+        """Send a signed task response to the aggregator
+
+        If the block the task was created in is known, the response is recorded
+        in the outbox first so it can be replayed after a restart.
+        """
         logger.debug("Submitting task response to aggregator")
 
+        data = self.record_task_response(signed_response, task_created_block)
+
+        # Wait briefly to ensure the aggregator has processed the task
+        time.sleep(3)
+
+        self._deliver_task_response(data)
+
+    def record_task_response(self, signed_response, task_created_block=None):
+        """Build the aggregator payload of a signed response and record it in the outbox"""
         if self.web3 is None:
             raise RuntimeError("Web3 instance not loaded")
 
@@ -164,22 +506,141 @@ class SquaringOperator:
             "task_index": signed_response["taskResponse"]["referenceTaskIndex"],
             "number_squared": signed_response["taskResponse"]["numberSquared"],
             "signature": signed_response["blsSignature"],
-            "block_number": self.web3.eth.block_number,
+            "block_number": self._reference_block(task_created_block),
             "operator_id": "0x" + (signed_response["operatorId"] or ""),
         }
 
-        # Wait briefly to ensure the aggregator has processed the task
+        if self.outbox is not None and task_created_block is not None:
+            self.outbox.record(data["task_index"], task_created_block, data)
+        return data
+
+    def send_signed_task_response_batch(self, signed_batch, task_created_block=None):
+        """Send a signed batch of task responses to the aggregator"""
+        logger.debug("Submitting task response batch to aggregator")
+
+        data = self.record_task_response_batch(signed_batch, task_created_block)
+
+        # Wait briefly to ensure the aggregator has processed the tasks
         time.sleep(3)
 
+        self._deliver_task_response(data)
+
+    def record_task_response_batch(self, signed_batch, task_created_block=None):
+        """Build the aggregator payload of a signed batch and record it in the outbox"""
+        if self.web3 is None:
+            raise RuntimeError("Web3 instance not loaded")
+
+        data = {
+            "task_responses": [
+                {
+                    "task_index": task_response["referenceTaskIndex"],
+                    "number_squared": task_response["numberSquared"],
+                }
+                for task_response in signed_batch["taskResponses"]
+            ],
+            "batch_root": signed_batch["batchRoot"],
+            "signature": signed_batch["blsSignature"],
+            "block_number": self._reference_block(task_created_block),
+            "operator_id": "0x" + (signed_batch["operatorId"] or ""),
+        }
+
+        if self.outbox is not None and task_created_block is not None:
+            self.outbox.record(
+                self._outbox_key(data),
+                task_created_block,
+                data,
+                self._task_indices(data),
+            )
+        return data
+
+    @staticmethod
+    def _outbox_key(data):
+        # a batch is recorded under the index of its first task, and indexed
+        # under every task it covers
+        if "batch_root" in data:
+            return data["task_responses"][0]["task_index"]
+        return data["task_index"]
+
+    @staticmethod
+    def _task_indices(data):
+        if "batch_root" in data:
+            return [r["task_index"] for r in data["task_responses"]]
+        return data["task_index"]
+
+    def _reference_block(self, task_created_block):
+        """Block the aggregator should look the operator set up at.
+
+        With ``reference_block: task_created`` (the default) every signature for
+        a task carries the block the task was created in, ``latest`` uses the
+        chain head instead.
+        """
+        reference = self.config.get("reference_block", "task_created")
+        if reference == "task_created" and task_created_block is not None:
+            return task_created_block
+        return self._latest_block()
+
+    def _latest_block(self):
+        if self.head_tracker is not None:
+            return self.head_tracker.latest
+        return self.web3.eth.block_number
+
+    def _deliver_task_response(self, data):
+        """Post a task response to the aggregator and mark it delivered.
+
+        Client errors are final, so the response is marked as delivered unless
+        the request failed or the aggregator returned a server error. An
+        overloaded aggregator is asked again after the delay it sets in
+        ``Retry-After``, up to ``delivery_retries`` times.
+        """
+        retries = int(self.config.get("delivery_retries", 2))
+        for attempt in range(retries + 1):
+            try:
+                with self.tracer.span("deliver", self._task_indices(data)) as span:
+                    response = self.http.post(self._delivery_url(data), json=data)
+                    span["status"] = response.status_code
+            except Exception as e:
+                logger.error(f"Unknown error sending task response: {str(e)}")
+                return False
+
+            retry_after = self._retry_after(response.status_code, response.headers)
+            if retry_after is None or attempt == retries:
+                break
+            logger.debug(f"Aggregator overloaded, retrying in {retry_after}s")
+            time.sleep(retry_after)
+
+        return self.acknowledge_delivery(data, response.status_code, response.text)
+
+    @staticmethod
+    def _retry_after(status_code, headers):
+        """Seconds to wait before posting again, or None if it should not be."""
+        if status_code != 503 or "Retry-After" not in headers:
+            return None
         try:
-            url = f'http://{self.config["aggregator_server_ip_port_address"]}/signature'
-            response = requests.post(url, json=data)
-            response.raise_for_status()
+            return float(headers["Retry-After"])
+        except ValueError:
+            return None
+
+    def _delivery_url(self, data):
+        path = "/signature/batch" if "batch_root" in data else "/signature"
+        return f'http://{self.config["aggregator_server_ip_port_address"]}{path}'
+
+    def acknowledge_delivery(self, data, status_code, text):
+        """Mark a posted task response delivered unless the aggregator failed on it."""
+        if status_code >= 500:
+            logger.error(f"Aggregator failed to process task response: {text}")
+            return False
+        if status_code >= 400:
+            logger.error(f"Aggregator rejected task response: {text}")
+        else:
             logger.debug(
-                f"Successfully sent task response to aggregator, response: {response.text}"
+                "Successfully sent task response to aggregator, response: %s",
+                text,
+                sample_every=self.log_sample_every,
             )
-        except Exception as e:
-            logger.error(f"Unknown error sending task response: {str(e)}")
+
+        if self.outbox is not None:
+            self.outbox.mark_delivered(self._outbox_key(data))
+        return True
 
     def register_operator_with_eigenlayer(self):
         if self.clients is None:
@@ -337,55 +798,101 @@ class SquaringOperator:
             delegation_manager_addr=self.config["delegation_manager_address"],
         )
         self.clients = build_all(cfg, self.operator_ecdsa_private_key)
-        self.web3 = Web3(Web3.HTTPProvider(self.config["eth_rpc_url"]))
+        share_provider(self.clients, self.web3.provider)
         logger.debug("Successfully loaded AVS clients")
 
+    def _load_web3(self):
+        """Create the web3 instance, without any RPC call, unless one was given"""
+        if self.web3 is None:
+            self.web3 = Web3(load_provider(self.config))
+
+    def _load_deployment_cache(self):
+        """Open the deployment cache scoped to the connected chain"""
+        if self.web3 is None:
+            raise RuntimeError("Web3 instance not loaded")
+
+        cache_path = self.config.get(
+            "deployment_cache_path",
+            f"data/{self.config['operator_address']}.deployment.json",
+        )
+        self.deployment_cache = DeploymentCache(
+            cache_path, self.web3.eth.chain_id, self.config["service_manager_address"]
+        )
+
     def _load_task_manager(self):
         """Load the task manager contract"""
-        if self.clients is None:
-            raise RuntimeError("Clients not loaded")
         if self.web3 is None:
             raise RuntimeError("Web3 instance not loaded")
 
-        service_manager_address = self.clients.avs_registry_writer.service_manager_addr
-
-        service_manager_abi_path = "abis/IncredibleSquaringServiceManager.json"
-        if not os.path.exists(service_manager_abi_path):
-            logger.error(
-                f"Service manager ABI file not found at: {service_manager_abi_path}"
-            )
+        self._load_deployment_cache()
+        task_manager_address = self.deployment_cache.get("task_manager_address")
+        if task_manager_address is None:
+            task_manager_address = self._resolve_task_manager_address()
+            self.deployment_cache.update(task_manager_address=task_manager_address)
 
-        with open(service_manager_abi_path) as f:
-            service_manager_abi = f.read()
+        self.task_manager = self.web3.eth.contract(
+            address=task_manager_address,
+            abi=load_abi("IncredibleSquaringTaskManager"),
+        )
+        logger.debug(f"Task manager loaded at address: {task_manager_address}")
 
-        service_manager = self.web3.eth.contract(
-            address=service_manager_address, abi=service_manager_abi
+    def _resolve_task_manager_address(self):
+        """Look up the task manager address through the service manager"""
+        service_manager_address = Web3.to_checksum_address(
+            self.config["service_manager_address"]
         )
 
-        task_manager_address = (
-            service_manager.functions.incredibleSquaringTaskManager().call()
+        service_manager = self.web3.eth.contract(
+            address=service_manager_address,
+            abi=load_abi("IncredibleSquaringServiceManager"),
         )
 
-        task_manager_abi_path = "abis/IncredibleSquaringTaskManager.json"
-        if not os.path.exists(task_manager_abi_path):
-            logger.error(f"Task manager ABI file not found at: {task_manager_abi_path}")
+        return service_manager.functions.incredibleSquaringTaskManager().call()
 
-        with open(task_manager_abi_path) as f:
-            task_manager_abi = f.read()
+    def _load_checkpoint(self):
+        """Open the checkpoint of the last block polled for tasks"""
+        self.checkpoint = Checkpoint(
+            self.config.get(
+                "checkpoint_path",
+                f"data/{self.config['operator_address']}.checkpoint.json",
+            )
+        )
 
-        self.task_manager = self.web3.eth.contract(
-            address=task_manager_address, abi=task_manager_abi
+    def _load_outbox(self):
+        """Open the outbox of signed task responses"""
+        outbox_path = self.config.get(
+            "outbox_path", f"data/{self.config['operator_address']}.outbox.db"
         )
-        logger.debug(f"Task manager loaded at address: {task_manager_address}")
+        self.outbox = Outbox(outbox_path)
+        logger.debug(f"Outbox opened at: {outbox_path}")
 
     def _load_operator_id(self):
         """Load the operator ID"""
         if self.clients is None:
             raise RuntimeError("Clients not loaded")
 
-        self.operator_id = self.clients.avs_registry_reader.get_operator_id(
-            self.config["operator_address"]
+        # the id belongs to this address and BLS key, a changed config or a
+        # re-registration under another key must not reuse it
+        scope = {
+            "operator_address": self.config["operator_address"].lower(),
+            "bls_public_key": self.bls_key_pair.pub_g1.getStr().decode(),
+        }
+        cached_operator_id = (
+            self.deployment_cache.get("operator_id", **scope)
+            if self.deployment_cache
+            else None
         )
+        if cached_operator_id is not None:
+            self.operator_id = bytes.fromhex(cached_operator_id)
+        else:
+            self.operator_id = self.clients.avs_registry_reader.get_operator_id(
+                self.config["operator_address"]
+            )
+            # an unregistered operator has a zero id, which may still change
+            if self.deployment_cache and self.operator_id and any(self.operator_id):
+                self.deployment_cache.put(
+                    "operator_id", self.operator_id.hex(), **scope
+                )
         logger.debug(
             f"Loaded operator ID: {self.operator_id.hex() if self.operator_id else None}"
         )
@@ -408,5 +915,9 @@ if __name__ == "__main__":
     with open(avs_config_path, "r") as f:
         avs_config = yaml.load(f, Loader=yaml.BaseLoader)
 
+    configure_logging(
+        operator_config.get("log_level", "INFO"),
+        operator_config.get("log_format") == "json",
+    )
     operator = SquaringOperator(config={**operator_config, **avs_config})
     operator.start()
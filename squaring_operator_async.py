@@ -0,0 +1,238 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+import yaml
+from web3 import AsyncWeb3
+
+from core.abi import load_abi, task_manager_codec
+from core.ingestion import AsyncEventIngestor
+from core.log import configure_logging, get_logger
+from core.rpc import load_async_provider
+from squaring_operator import OUTBOX_PRUNE_INTERVAL_SECONDS, SquaringOperator
+
+logger = get_logger(__name__)
+
+
+class AsyncSquaringOperator(SquaringOperator):
+    """Runs the operator loop on asyncio.
+
+    Keys, clients, registration, signing and the outbox are shared with
+    ``SquaringOperator``; only the run loop differs. Task events are read with
+    an async web3 provider and responses are posted with an async HTTP client,
+    while BLS signing and outbox writes run on a thread pool. Up to
+    ``max_in_flight_tasks`` tasks are handled concurrently, so intake, signing
+    and delivery of different tasks overlap.
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.async_web3 = AsyncWeb3(load_async_provider(self.config))
+        self.async_task_manager = self.async_web3.eth.contract(
+            address=self.task_manager.address,
+            abi=load_abi("IncredibleSquaringTaskManager"),
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=int(self.config.get("sign_workers", 4)),
+            thread_name_prefix="sign",
+        )
+        self._head_block = None
+
+    def start(self):
+        """Start the operator service"""
+        asyncio.run(self.run())
+
+    async def run(self):
+        """Run the operator until ``stop`` is called"""
+        logger.debug("Starting async Operator...")
+
+        if self.task_manager is None:
+            raise RuntimeError("Task manager not loaded")
+
+        codec = task_manager_codec()
+        ingestor = AsyncEventIngestor(
+            self.async_web3,
+            self.task_manager.address,
+            codec.decode_log,
+            reorg_depth=int(self.config.get("reorg_depth", 64)),
+            min_poll_interval=float(self.config.get("min_poll_interval", 0.5)),
+            max_poll_interval=float(self.config.get("max_poll_interval", 12)),
+        )
+        queue = asyncio.Queue(maxsize=int(self.config.get("pipeline_queue_size", 100)))
+        new_task_events = []
+        ingestor.subscribe(
+            codec.new_task_created_topic, new_task_events.append, self._on_task_removed
+        )
+        self.task_response_window_block = (
+            await self.async_task_manager.functions.getTaskResponseWindowBlock().call()
+        )
+        self._head_block = await self.async_web3.eth.block_number
+
+        async with aiohttp.ClientSession() as session:
+            workers = [
+                asyncio.create_task(self._task_worker(queue, session))
+                for _ in range(int(self.config.get("max_in_flight_tasks", 64)))
+            ]
+            try:
+                await self._replay_outbox_async(session)
+                # polling picks up right after the last backfilled block
+                loop = asyncio.get_running_loop()
+                missed = await loop.run_in_executor(
+                    None, self.missed_task_events, self._head_block
+                )
+                for item in self._take_in(missed):
+                    await queue.put(item)
+                ingestor.start_at(self._head_block)
+
+                next_prune = time.monotonic() + OUTBOX_PRUNE_INTERVAL_SECONDS
+
+                async def on_poll(_):
+                    nonlocal next_prune
+                    self._head_block = ingestor.head
+                    events = list(new_task_events)
+                    new_task_events.clear()
+                    for event in events:
+                        logger.debug(
+                            "New task created: %s",
+                            event,
+                            sample_every=self.log_sample_every,
+                        )
+                    for item in self._take_in(events):
+                        await queue.put(item)
+                    self.save_checkpoint(ingestor.last_block)
+
+                    if time.monotonic() >= next_prune:
+                        self.prune_outbox(self._head_block)
+                        next_prune = time.monotonic() + OUTBOX_PRUNE_INTERVAL_SECONDS
+
+                logger.debug("Listening for new tasks...")
+                await ingestor.run(lambda: self._stop_flag, on_poll)
+                await queue.join()
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                self.executor.shutdown(wait=True)
+                self.tracer.close()
+
+    async def _task_worker(self, queue, session):
+        while True:
+            item = await queue.get()
+            try:
+                if isinstance(item, list):
+                    await self._handle_task_batch(item, session)
+                else:
+                    await self._handle_task(item, session)
+            except Exception as e:
+                logger.error(f"Error handling task: {str(e)}")
+            finally:
+                queue.task_done()
+
+    async def _handle_task(self, event, session):
+        loop = asyncio.get_running_loop()
+        task_response = self.process_task_event(event)
+        signed_response = await loop.run_in_executor(
+            self.executor, self.sign_task_response, task_response
+        )
+        data = await loop.run_in_executor(
+            self.executor,
+            self.record_task_response,
+            signed_response,
+            event.task.task_created_block,
+        )
+        self._recorded([event])
+
+        # Wait briefly to ensure the aggregator has processed the task
+        await asyncio.sleep(3)
+
+        await self._deliver_task_response_async(session, data)
+
+    async def _handle_task_batch(self, events, session):
+        loop = asyncio.get_running_loop()
+        task_responses = [self.process_task_event(event) for event in events]
+        signed_batch = await loop.run_in_executor(
+            self.executor, self.sign_task_response_batch, task_responses
+        )
+        data = await loop.run_in_executor(
+            self.executor,
+            self.record_task_response_batch,
+            signed_batch,
+            events[0].task.task_created_block,
+        )
+        self._recorded(events)
+
+        # Wait briefly to ensure the aggregator has processed the tasks
+        await asyncio.sleep(3)
+
+        await self._deliver_task_response_async(session, data)
+
+    async def _replay_outbox_async(self, session):
+        """Resend the signed responses that were not delivered before a restart."""
+        if self.outbox is None:
+            return
+
+        self.prune_outbox(self._head_block)
+        pending = self.outbox.pending()
+        if pending:
+            logger.info(f"Replaying {len(pending)} undelivered task responses")
+        await asyncio.gather(
+            *(
+                self._deliver_task_response_async(session, data)
+                for _, _, data in pending
+            )
+        )
+
+    async def _deliver_task_response_async(self, session, data):
+        """Post a task response to the aggregator and mark it delivered."""
+        retries = int(self.config.get("delivery_retries", 2))
+        for attempt in range(retries + 1):
+            try:
+                with self.tracer.span("deliver", self._task_indices(data)) as span:
+                    async with session.post(
+                        self._delivery_url(data), json=data
+                    ) as response:
+                        status_code = span["status"] = response.status
+                        text = await response.text()
+            except Exception as e:
+                logger.error(f"Unknown error sending task response: {str(e)}")
+                return False
+
+            retry_after = self._retry_after(status_code, response.headers)
+            if retry_after is None or attempt == retries:
+                break
+            logger.debug(f"Aggregator overloaded, retrying in {retry_after}s")
+            await asyncio.sleep(retry_after)
+
+        return self.acknowledge_delivery(data, status_code, text)
+
+    def _latest_block(self):
+        if self._head_block is not None:
+            return self._head_block
+        return super()._latest_block()
+
+
+if __name__ == "__main__":
+    dir_path = os.path.dirname(os.path.abspath(__file__))
+
+    operator_config_path = os.path.join(dir_path, "./config-files/operator1.yaml")
+    if not os.path.exists(operator_config_path):
+        logger.error(f"Config file not found at: {operator_config_path}")
+        raise FileNotFoundError(f"Config file not found at: {operator_config_path}")
+    with open(operator_config_path, "r") as f:
+        operator_config = yaml.load(f, Loader=yaml.BaseLoader)
+
+    avs_config_path = os.path.join(dir_path, "./config-files/avs.yaml")
+    if not os.path.exists(avs_config_path):
+        logger.error(f"Config file not found at: {avs_config_path}")
+        raise FileNotFoundError(f"Config file not found at: {avs_config_path}")
+    with open(avs_config_path, "r") as f:
+        avs_config = yaml.load(f, Loader=yaml.BaseLoader)
+
+    configure_logging(
+        operator_config.get("log_level", "INFO"),
+        operator_config.get("log_format") == "json",
+    )
+    operator = AsyncSquaringOperator(config={**operator_config, **avs_config})
+    operator.start()
@@ -0,0 +1,74 @@
+import eth_abi
+from web3 import Web3
+
+from core.abi import TaskRecord, load_abi, task_manager_codec
+
+TASK = (7, 100, b"\x00", 50)
+
+
+def _task_manager():
+    return Web3().eth.contract(
+        address="0x" + "11" * 20, abi=load_abi("IncredibleSquaringTaskManager")
+    )
+
+
+def _log(topics, data):
+    return {
+        "address": "0x" + "11" * 20,
+        "topics": topics,
+        "data": data,
+        "blockNumber": 101,
+        "blockHash": b"\x02" * 32,
+        "transactionHash": b"\x01" * 32,
+        "transactionIndex": 0,
+        "logIndex": 0,
+    }
+
+
+def test_decode_logs_matches_web3():
+    codec = task_manager_codec()
+    task_manager = _task_manager()
+
+    new_task_log = _log(
+        [codec.new_task_created_topic, (5).to_bytes(32, "big")],
+        eth_abi.encode(["(uint256,uint32,bytes,uint32)"], [TASK]),
+    )
+    record = codec.decode_log(new_task_log)
+    expected = task_manager.events.NewTaskCreated().process_log(new_task_log)
+    assert record.task_index == expected["args"]["taskIndex"] == 5
+    assert record.task == TaskRecord(*expected["args"]["task"].values())
+
+    responded_log = _log(
+        [codec.task_responded_topic],
+        eth_abi.encode(
+            ["(uint32,uint256)", "(uint32,bytes32)"], [(5, 49), (102, b"\x03" * 32)]
+        ),
+    )
+    record = codec.decode_log(responded_log)
+    expected = task_manager.events.TaskResponded().process_log(responded_log)
+    assert record.reference_task_index == 5
+    assert record.number_squared == expected["args"]["taskResponse"]["numberSquared"]
+    assert record.hash_of_non_signers == b"\x03" * 32
+
+
+def test_decode_respond_call():
+    codec = task_manager_codec()
+    non_signer_stakes_and_signature = (
+        [1],
+        [(1, 2), (3, 4)],
+        [(5, 6)],
+        ([7, 8], [9, 10]),
+        (11, 12),
+        [0],
+        [0],
+        [[0]],
+    )
+    calldata = _task_manager().encode_abi(
+        "respondToTask", args=[TASK, (5, 49), non_signer_stakes_and_signature]
+    )
+
+    call = codec.decode_respond_call(bytes.fromhex(calldata[2:]))
+    assert call.function_name == "respondToTask"
+    assert call.tasks == (TaskRecord(*TASK),)
+    assert call.task_responses == ((5, 49),)
+    assert call.non_signer_pubkeys == ((1, 2), (3, 4))
@@ -0,0 +1,59 @@
+import queue
+import threading
+
+import pytest
+
+from core.admission import AdmissionQueue
+
+
+def _occupy(admission):
+    """Keep the only worker busy until the returned event is set."""
+    started, release = threading.Event(), threading.Event()
+    blocker = admission.submit(0, lambda: (started.set(), release.wait()))
+    assert started.wait(timeout=1)
+    return blocker, release
+
+
+def test_admission_queue_runs_most_urgent_first():
+    admission = AdmissionQueue(workers=1, max_pending=10)
+    admission.start()
+    blocker, release = _occupy(admission)
+
+    order = []
+    futures = [
+        admission.submit(priority, order.append, priority) for priority in (30, 10, 20)
+    ]
+    release.set()
+    blocker.result()
+    for future in futures:
+        future.result()
+    admission.stop()
+    assert order == [10, 20, 30]
+
+
+def test_admission_queue_sheds_least_urgent_when_full():
+    admission = AdmissionQueue(workers=1, max_pending=2)
+    admission.start()
+    blocker, release = _occupy(admission)
+
+    late = admission.submit(50, lambda: "late")
+    soon = admission.submit(20, lambda: "soon")
+    # full: less urgent work is refused, more urgent work evicts the latest
+    with pytest.raises(queue.Full):
+        admission.submit(60, lambda: "later")
+    urgent = admission.submit(10, lambda: "urgent")
+    with pytest.raises(queue.Full):
+        late.result(timeout=1)
+
+    release.set()
+    blocker.result()
+    assert (soon.result(timeout=1), urgent.result(timeout=1)) == ("soon", "urgent")
+    assert admission.retry_after() >= 1
+    admission.stop()
+
+
+def test_admission_queue_runs_inline_before_start():
+    admission = AdmissionQueue(workers=2)
+    assert admission.run(5, lambda x: x * 2, 21) == 42
+    with pytest.raises(ValueError):
+        AdmissionQueue(workers=0)
@@ -0,0 +1,220 @@
+from types import SimpleNamespace
+
+import pytest
+
+from challenger import (
+    Challenger,
+    ChallengeWouldRevertError,
+    TaskResponseData,
+    classify_challenge_revert,
+)
+from core.join_buffer import JoinBuffer
+from core.metrics import Counters
+from core.tx_cache import TransactionCache
+
+
+def make_challenger(**attrs):
+    challenger = Challenger.__new__(Challenger)
+    challenger.config = {"challenge_preflight_retry_delay": "0"}
+    challenger.metrics = Counters()
+    challenger.challenger_address = "0xchallenger"
+    for name, value in attrs.items():
+        setattr(challenger, name, value)
+    return challenger
+
+
+class FakeChallengeFunction:
+    """A contract function whose simulations revert with ``reverts`` in turn."""
+
+    def __init__(self, reverts=(), gas=100_000):
+        self.reverts = list(reverts)
+        self.gas = gas
+        self.calls = 0
+
+    def call(self, tx, block_identifier):
+        self.calls += 1
+        if self.reverts:
+            raise Exception(f"execution reverted: {self.reverts.pop(0)}")
+
+    def estimate_gas(self, tx, block_identifier):
+        return self.gas
+
+
+@pytest.mark.parametrize(
+    "revert, reason, retriable",
+    [
+        ("Task hasn't been responded to yet", "not_responded", True),
+        (
+            "Task response does not match the one recorded in the contract",
+            "response_mismatch",
+            False,
+        ),
+        (
+            "The response to this task has already been challenged successfully.",
+            "already_challenged",
+            False,
+        ),
+        (
+            "The challenge period for this task has already expired.",
+            "window_expired",
+            False,
+        ),
+        (
+            "The pubkeys of non-signing operators supplied by the challenger are "
+            "not correct.",
+            "bad_non_signers",
+            False,
+        ),
+    ],
+)
+def test_contract_reverts_map_to_their_reason(revert, reason, retriable):
+    assert classify_challenge_revert(f"execution reverted: {revert}") == (
+        reason,
+        retriable,
+    )
+
+
+def test_unknown_reverts_are_retried():
+    assert classify_challenge_revert("connection reset by peer") == ("unknown", True)
+
+
+def test_final_revert_drops_the_challenge_after_one_simulation():
+    challenger = make_challenger()
+    contract_function = FakeChallengeFunction(
+        ["The challenge period for this task has already expired."]
+    )
+
+    with pytest.raises(ChallengeWouldRevertError) as raised:
+        challenger._preflight_challenge(contract_function)
+
+    assert raised.value.reason == "window_expired"
+    assert contract_function.calls == 1
+    assert challenger.metrics.snapshot() == {
+        "challenges_simulated": 1,
+        "reverts_avoided": 1,
+        "reverts_avoided.window_expired": 1,
+    }
+
+
+def test_retriable_revert_succeeds_on_a_later_attempt():
+    challenger = make_challenger()
+    contract_function = FakeChallengeFunction(
+        ["Task hasn't been responded to yet"], gas=100_001
+    )
+
+    assert challenger._preflight_challenge(contract_function) == int(100_001 * 1.2)
+    assert contract_function.calls == 2
+    assert challenger.metrics.snapshot() == {"challenges_simulated": 2}
+
+
+def test_retriable_revert_is_dropped_once_retries_run_out():
+    challenger = make_challenger()
+    challenger.config["challenge_preflight_retries"] = "1"
+    contract_function = FakeChallengeFunction(["timeout", "timeout"])
+
+    with pytest.raises(ChallengeWouldRevertError) as raised:
+        challenger._preflight_challenge(contract_function)
+
+    assert raised.value.reason == "unknown"
+    assert contract_function.calls == 2
+    assert challenger.metrics.get("reverts_avoided.unknown") == 1
+
+
+def make_auditor(created, responded, head=100):
+    fetched = []
+    challenged = []
+
+    def fetch_events(codec, from_block, to_block):
+        fetched.append((from_block, to_block))
+        return created, responded
+
+    challenger = make_challenger(
+        eth_http_client=SimpleNamespace(eth=SimpleNamespace(block_number=head)),
+        task_response_window_block=5,
+        task_challenge_window_block=10,
+        _fetch_events=fetch_events,
+        _challenge_audited=challenged.extend,
+    )
+    return challenger, fetched, challenged
+
+
+def created_event(task_index, number_to_be_squared):
+    return SimpleNamespace(
+        task_index=task_index,
+        task=SimpleNamespace(number_to_be_squared=number_to_be_squared),
+    )
+
+
+def response_event(task_index, number_squared, task_responsed_block):
+    return SimpleNamespace(
+        reference_task_index=task_index,
+        number_squared=number_squared,
+        task_responsed_block=task_responsed_block,
+        transaction_hash=bytes([task_index]),
+    )
+
+
+def test_audit_challenges_wrong_answers_inside_their_window():
+    created = [created_event(1, 2), created_event(2, 3), created_event(3, 4)]
+    in_window = response_event(1, 5, 95)
+    out_of_window = response_event(2, 10, 90)
+    correct = response_event(3, 16, 95)
+    unmatched = response_event(9, 1, 95)
+    challenger, fetched, challenged = make_auditor(
+        created, [in_window, out_of_window, correct, unmatched]
+    )
+
+    report = challenger.audit()
+
+    assert fetched == [(85, 100)]
+    assert [(entry["task_index"], entry["challengeable"]) for entry in report] == [
+        (1, True),
+        (2, False),
+    ]
+    assert report[0]["transaction_hash"] == "0x01"
+    assert challenged == [(created[0], in_window)]
+
+
+def test_audit_only_reports_without_challenge():
+    created = [created_event(1, 2)]
+    challenger, fetched, challenged = make_auditor(created, [response_event(1, 5, 95)])
+
+    report = challenger.audit(0, 50, challenge=False)
+
+    assert fetched == [(0, 50)]
+    assert report[0]["challengeable"]
+    assert challenged == []
+
+
+def test_missing_non_signer_keys_are_fetched_one_by_one_when_the_batch_fails(
+    tmp_path,
+):
+    tx_hash = "0x" + "01" * 32
+    fetched = []
+
+    def failed_batch():
+        raise ConnectionError("batch requests are not supported")
+
+    def get_transaction(tx_hash):
+        fetched.append(tx_hash)
+        return {"input": tx_hash}
+
+    checked = []
+    challenger = make_challenger(
+        eth_http_client=SimpleNamespace(
+            batch_requests=failed_batch,
+            eth=SimpleNamespace(get_transaction=get_transaction),
+        ),
+        tx_cache=TransactionCache(str(tmp_path / "tx-cache.db")),
+        join_buffer=JoinBuffer(),
+        _decode_non_signer_pub_keys=lambda tx: [{"X": 1, "Y": 2}],
+        check_task=checked.append,
+    )
+    response = TaskResponseData(None, None, None, tx_hash)
+    challenger.join_buffer.add_response(7, response, 100)
+
+    challenger.fetch_missing_pub_keys()
+
+    assert fetched == [tx_hash]
+    assert response.non_signing_operator_pub_keys == [{"X": 1, "Y": 2}]
+    assert checked == [7]
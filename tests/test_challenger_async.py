@@ -0,0 +1,174 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from challenger import TaskResponseData
+from challenger_async import AsyncChallenger
+from core.join_buffer import JoinBuffer
+from core.metrics import Counters
+from core.tx_cache import TransactionCache
+
+
+def make_async_challenger(**attrs):
+    challenger = AsyncChallenger.__new__(AsyncChallenger)
+    challenger.config = {"challenge_preflight_retry_delay": "0"}
+    challenger.metrics = Counters()
+    challenger.join_buffer = JoinBuffer()
+    challenger.challenger_address = "0xchallenger"
+    challenger.challenger_ecdsa_private_key = "0xkey"
+    challenger.log_sample_every = 1
+    challenger.rpc_timeout = 1
+    challenger.async_task_manager = None
+    challenger._challenges_in_flight = set()
+    challenger._challenges_lock = threading.Lock()
+    challenger._challenges = set()
+    challenger._rpc_slots = asyncio.Semaphore(4)
+    challenger._challenge_slots = asyncio.Semaphore(4)
+    challenger._nonce_lock = asyncio.Lock()
+    challenger._nonce = None
+    challenger._chain_id = None
+    for name, value in attrs.items():
+        setattr(challenger, name, value)
+    return challenger
+
+
+async def returning(value):
+    return value
+
+
+class FakeAsyncEth:
+    def __init__(self):
+        self.nonce = 7
+        self.nonce_reads = 0
+        self.failed_sends = 0
+        self.sent = []
+        self.account = SimpleNamespace(
+            sign_transaction=lambda tx, private_key: SimpleNamespace(raw_transaction=tx)
+        )
+
+    @property
+    def chain_id(self):
+        return returning(31337)
+
+    async def get_transaction_count(self, address, block_identifier):
+        self.nonce_reads += 1
+        return self.nonce
+
+    async def send_raw_transaction(self, tx):
+        if self.failed_sends:
+            self.failed_sends -= 1
+            raise ConnectionError("connection reset")
+        self.sent.append(tx)
+        return bytes([tx["nonce"]])
+
+
+class FakeAsyncChallengeFunction:
+    def __init__(self, revert=None):
+        self.revert = revert
+
+    async def call(self, tx, block_identifier):
+        if self.revert:
+            raise Exception(f"execution reverted: {self.revert}")
+
+    async def estimate_gas(self, tx, block_identifier):
+        return 100_000
+
+    async def build_transaction(self, tx):
+        return tx
+
+
+def test_raise_challenge_hands_the_challenge_to_the_event_loop():
+    challenger = make_async_challenger()
+    raised = []
+
+    async def raise_challenge_async(task_index):
+        raised.append((task_index, threading.current_thread()))
+
+    challenger.raise_challenge_async = raise_challenge_async
+
+    async def run():
+        challenger._loop = asyncio.get_running_loop()
+        # verdicts come from the verifier threads, off the event loop
+        await challenger._loop.run_in_executor(None, challenger.raise_challenge, 3)
+        for _ in range(100):
+            if not challenger._challenges:
+                break
+            await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+
+    assert raised == [(3, threading.main_thread())]
+    assert challenger._challenges == set()
+
+
+def test_failed_send_resyncs_the_nonce():
+    eth = FakeAsyncEth()
+    challenger = make_async_challenger(async_web3=SimpleNamespace(eth=eth))
+    contract_function = FakeAsyncChallengeFunction()
+
+    async def run():
+        await challenger._send_transaction_async(contract_function, 100)
+        eth.failed_sends = 1
+        try:
+            await challenger._send_transaction_async(contract_function, 100)
+        except ConnectionError:
+            pass
+        # another transaction of the challenger account was mined meanwhile
+        eth.nonce = 9
+        await challenger._send_transaction_async(contract_function, 100)
+
+    asyncio.run(run())
+
+    assert [tx["nonce"] for tx in eth.sent] == [7, 9]
+    assert eth.nonce_reads == 2
+
+
+def test_dropped_challenge_releases_its_claim():
+    contract_function = FakeAsyncChallengeFunction(
+        "The response to this task has already been challenged successfully."
+    )
+    challenger = make_async_challenger(
+        _challenge_function=lambda task_manager, task, response: contract_function
+    )
+    challenger.join_buffer.add_task(5, SimpleNamespace(), 100)
+    challenger.join_buffer.add_response(
+        5, TaskResponseData(None, None, [], "0x05"), 100
+    )
+
+    asyncio.run(challenger.raise_challenge_async(5))
+
+    assert challenger._challenges_in_flight == set()
+    assert challenger.join_buffer.joined(5) is None
+    assert challenger.metrics.get("reverts_avoided.already_challenged") == 1
+
+
+def test_missing_non_signer_keys_are_refilled_on_poll(tmp_path):
+    tx_hash = "0x" + "05" * 32
+    attempts = []
+
+    async def get_transaction(tx_hash):
+        attempts.append(tx_hash)
+        if len(attempts) == 1:
+            raise TimeoutError("node too slow")
+        return {"input": tx_hash}
+
+    checked = []
+    challenger = make_async_challenger(
+        async_web3=SimpleNamespace(
+            eth=SimpleNamespace(get_transaction=get_transaction)
+        ),
+        tx_cache=TransactionCache(str(tmp_path / "tx-cache.db")),
+        _decode_non_signer_pub_keys=lambda tx: [{"X": 1, "Y": 2}],
+        check_task=checked.append,
+    )
+    response = TaskResponseData(None, None, None, tx_hash)
+    challenger.join_buffer.add_response(5, response, 100)
+
+    asyncio.run(challenger.fetch_missing_pub_keys_async())
+    assert response.non_signing_operator_pub_keys is None
+    assert checked == []
+
+    asyncio.run(challenger.fetch_missing_pub_keys_async())
+    assert response.non_signing_operator_pub_keys == [{"X": 1, "Y": 2}]
+    assert checked == [5]
+    assert attempts == [tx_hash, tx_hash]
@@ -0,0 +1,45 @@
+from core.checkpoint import Checkpoint, PendingBlocks
+
+
+def test_checkpoint_round_trip(tmp_path):
+    path = str(tmp_path / "operator.checkpoint.json")
+    assert Checkpoint(path).load() is None
+
+    Checkpoint(path).save(42)
+    assert Checkpoint(path).load() == 42
+
+
+def test_checkpoint_saves_state_with_block(tmp_path):
+    path = str(tmp_path / "challenger.checkpoint.json")
+    state = {"tasks": [[1, {"number_to_be_squared": 3}, 120]], "responses": []}
+
+    Checkpoint(path).save(42, state)
+    checkpoint = Checkpoint(path)
+    assert checkpoint.load() == 42
+    assert checkpoint.state == state
+
+
+def test_pending_blocks_hold_the_checkpoint_until_done():
+    pending = PendingBlocks()
+    assert pending.safe_block(100) == 100
+
+    pending.add(90)
+    pending.add(90)
+    pending.add(95)
+    assert pending.safe_block(100) == 89
+
+    pending.done(90)
+    assert pending.safe_block(100) == 89
+    pending.done(90)
+    assert pending.safe_block(100) == 94
+    pending.done(95)
+    assert pending.safe_block(100) == 100
+
+
+def test_pending_blocks_expire_gives_up_on_old_blocks():
+    pending = PendingBlocks()
+    pending.add(10)
+    pending.add(50)
+
+    pending.expire(20)
+    assert pending.safe_block(100) == 49
@@ -0,0 +1,44 @@
+from core.deployment_cache import DeploymentCache
+
+SERVICE_MANAGER = "0x1291Be112d480055DaFd8a610b7d1e203891C274"
+
+
+def test_deployment_cache_persists_values(tmp_path):
+    path = str(tmp_path / "operator.deployment.json")
+    DeploymentCache(path, 31337, SERVICE_MANAGER).update(task_manager_address="0xabc")
+
+    cache = DeploymentCache(path, 31337, SERVICE_MANAGER.lower())
+    assert cache.get("task_manager_address") == "0xabc"
+
+
+def test_deployment_cache_ignores_other_deployments(tmp_path):
+    path = str(tmp_path / "operator.deployment.json")
+    DeploymentCache(path, 31337, SERVICE_MANAGER).update(task_manager_address="0xabc")
+
+    assert DeploymentCache(path, 1, SERVICE_MANAGER).get("task_manager_address") is None
+    assert DeploymentCache(path, 31337, "0x0").get("task_manager_address") is None
+
+
+def test_deployment_cache_scopes_values_put_for_a_scope(tmp_path):
+    path = str(tmp_path / "operator.deployment.json")
+    DeploymentCache(path, 31337, SERVICE_MANAGER).put(
+        "operator_id", "0x01", operator_address="0xa", bls_public_key="1 2 3"
+    )
+
+    cache = DeploymentCache(path, 31337, SERVICE_MANAGER)
+    assert (
+        cache.get("operator_id", operator_address="0xa", bls_public_key="1 2 3")
+        == "0x01"
+    )
+    assert cache.get("operator_id", operator_address="0xa", bls_public_key="4") is None
+    assert (
+        cache.get("operator_id", operator_address="0xb", bls_public_key="1 2 3") is None
+    )
+
+
+def test_deployment_cache_ignores_unscoped_values_for_a_scope(tmp_path):
+    path = str(tmp_path / "operator.deployment.json")
+    DeploymentCache(path, 31337, SERVICE_MANAGER).update(operator_id="0x01")
+
+    cache = DeploymentCache(path, 31337, SERVICE_MANAGER)
+    assert cache.get("operator_id", operator_address="0xa") is None
@@ -0,0 +1,127 @@
+import asyncio
+from types import SimpleNamespace
+
+from core.ingestion import AsyncEventIngestor, EventIngestor
+
+CREATED = b"\x01" * 32
+RESPONDED = b"\x02" * 32
+
+
+class FakeChain:
+    """A chain of blocks with at most one log each, which can be reorganized."""
+
+    def __init__(self):
+        self.blocks = [{"hash": b"\x00" * 32, "log": None}]
+        self.get_logs_calls = 0
+
+    def mine(self, topic=None, fork=b"a"):
+        number = len(self.blocks)
+        self.blocks.append({"hash": fork * 31 + bytes([number]), "log": topic})
+
+    def reorg(self, depth, fork):
+        topics = [block["log"] for block in self.blocks[-depth:]]
+        del self.blocks[-depth:]
+        for topic in topics:
+            self.mine(topic, fork)
+
+    def get_block(self, block_identifier):
+        if block_identifier == "latest":
+            block_identifier = len(self.blocks) - 1
+        return {
+            "number": block_identifier,
+            "hash": self.blocks[block_identifier]["hash"],
+            "parentHash": self.blocks[block_identifier - 1]["hash"],
+        }
+
+    def get_logs(self, params):
+        self.get_logs_calls += 1
+        return [
+            {
+                "topics": [self.blocks[number]["log"]],
+                "blockNumber": number,
+                "blockHash": self.blocks[number]["hash"],
+            }
+            for number in range(params["fromBlock"], params["toBlock"] + 1)
+            if self.blocks[number]["log"] is not None
+        ]
+
+
+def make_ingestor(chain):
+    ingestor = EventIngestor(
+        SimpleNamespace(eth=chain),
+        "0x" + "11" * 20,
+        decode=lambda log: (log["blockNumber"], log["blockHash"][0:1]),
+    )
+    events, removed = [], []
+    ingestor.subscribe(CREATED, events.append, removed.append)
+    ingestor.subscribe(RESPONDED, events.append, removed.append)
+    return ingestor, events, removed
+
+
+def test_ingestor_fetches_all_topics_in_one_call_per_poll():
+    chain = FakeChain()
+    ingestor, events, _ = make_ingestor(chain)
+    ingestor.start_at(0)
+    chain.mine(CREATED)
+    chain.mine()
+    chain.mine(RESPONDED)
+
+    assert ingestor.poll() == 2
+    assert events == [(1, b"a"), (3, b"a")]
+    assert chain.get_logs_calls == 1
+    assert ingestor.last_block == 3
+
+    # nothing new, no log request
+    assert ingestor.poll() == 0
+    assert chain.get_logs_calls == 1
+
+
+def test_ingestor_rolls_back_and_replays_reorged_blocks():
+    chain = FakeChain()
+    ingestor, events, removed = make_ingestor(chain)
+    ingestor.start_at(0)
+    chain.mine(CREATED)
+    chain.mine(CREATED)
+    chain.mine(RESPONDED)
+    ingestor.poll()
+
+    chain.reorg(2, fork=b"b")
+    chain.mine()
+    ingestor.poll()
+
+    assert removed == [(3, b"a"), (2, b"a")]
+    assert events[3:] == [(2, b"b"), (3, b"b")]
+    assert ingestor.last_block == 4
+
+
+class AsyncFakeChain:
+    def __init__(self, chain):
+        self.chain = chain
+
+    async def get_block(self, block_identifier):
+        return self.chain.get_block(block_identifier)
+
+    async def get_logs(self, params):
+        return self.chain.get_logs(params)
+
+
+def test_async_ingestor_awaits_event_handlers():
+    chain = FakeChain()
+    ingestor = AsyncEventIngestor(
+        SimpleNamespace(eth=AsyncFakeChain(chain)),
+        "0x" + "11" * 20,
+        decode=lambda log: log["blockNumber"],
+    )
+    events = []
+
+    async def on_event(event):
+        await asyncio.sleep(0)
+        events.append(event)
+
+    ingestor.subscribe(CREATED, on_event)
+    ingestor.start_at(0)
+    chain.mine(CREATED)
+    chain.mine(CREATED)
+
+    assert asyncio.run(ingestor.poll()) == 2
+    assert events == [1, 2]
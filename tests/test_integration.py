@@ -151,9 +151,9 @@ def test_incredible_squaring_e2e():
         assert task_response_hash != empty_bytes, "Task response hash is empty"
 
         print("\nRetrieving task and response from challenger")
-        task = challenger.tasks.get(0)
-        task_response = challenger.task_responses.get(0)
-        challenge_hash = challenger.challenge_hashes.get(0)
+        task = challenger.join_buffer.task(0)
+        task_response = challenger.join_buffer.response(0)
+        challenge_hash = challenger.join_buffer.verdict(0)
 
         assert task is not None, "Task not found in challenger"
         assert task_response is not None, "Task response not found in challenger"
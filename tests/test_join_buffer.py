@@ -0,0 +1,51 @@
+from core.join_buffer import JoinBuffer
+
+
+def test_join_buffer_joins_and_resolves():
+    buffer = JoinBuffer(history_size=1)
+    assert buffer.add_task(1, "task-1", expires_at_block=200) is None
+    assert buffer.add_response(1, "response-1", expires_at_block=300) == (
+        "task-1",
+        "response-1",
+    )
+
+    buffer.resolve(1, verdict="0xchallenge")
+    assert buffer.task(1) == "task-1"
+    assert buffer.verdict(1) == "0xchallenge"
+    # a late duplicate of a resolved task is not buffered again
+    assert buffer.add_response(1, "response-1", expires_at_block=300) is None
+
+    buffer.add_task(2, "task-2", expires_at_block=200)
+    buffer.add_response(2, "response-2", expires_at_block=300)
+    buffer.resolve(2)
+    assert buffer.task(1) is None
+    assert buffer.counts()["resolved"] == 1
+
+
+def test_join_buffer_expires_orphans():
+    buffer = JoinBuffer()
+    buffer.add_task(1, "task-1", expires_at_block=100)
+    buffer.add_response(2, "response-2", expires_at_block=150)
+    buffer.add_task(3, "task-3", expires_at_block=500)
+
+    buffer.expire(120)
+    counts = buffer.counts()
+    assert (counts["tasks"], counts["responses"]) == (1, 1)
+    assert (counts["orphaned_tasks"], counts["orphaned_responses"]) == (1, 0)
+
+    buffer.expire(151)
+    counts = buffer.counts()
+    assert (counts["tasks"], counts["responses"]) == (1, 0)
+    assert counts["orphaned_responses"] == 1
+
+
+def test_join_buffer_lists_pending_entries():
+    buffer = JoinBuffer()
+    buffer.add_task(1, "task-1", expires_at_block=100)
+    buffer.add_task(2, "task-2", expires_at_block=200)
+    buffer.add_response(2, "response-2", expires_at_block=300)
+    buffer.resolve(2)
+    buffer.add_response(3, "response-3", expires_at_block=300)
+    buffer.discard_response(3)
+
+    assert buffer.pending() == ([(1, "task-1", 100)], [])
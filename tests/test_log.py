@@ -0,0 +1,70 @@
+import json
+import logging
+
+from core.log import StructuredFormatter, get_logger
+
+
+class _Capture(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def _logger(name, level=logging.DEBUG):
+    base = logging.getLogger(name)
+    base.handlers[:] = [_Capture()]
+    base.propagate = False
+    base.setLevel(level)
+    return get_logger(name), base.handlers[0].records
+
+
+def test_structured_logger_defers_formatting():
+    class Expensive:
+        formatted = 0
+
+        def __str__(self):
+            Expensive.formatted += 1
+            return "expensive"
+
+    logger, records = _logger("test_log.defer", level=logging.INFO)
+    logger.debug("value: %s", Expensive(), taskIndex=1)
+    assert records == [] and Expensive.formatted == 0
+
+    logger.info("value: %s", Expensive(), taskIndex=1)
+    assert Expensive.formatted == 0
+    assert records[0].getMessage() == "value: expensive"
+    assert records[0].fields == {"taskIndex": 1}
+    assert records[0].funcName == "test_structured_logger_defers_formatting"
+
+
+def test_structured_logger_samples_per_message():
+    logger, records = _logger("test_log.sample")
+    for i in range(10):
+        logger.debug("sampled %s", i, sample_every=4)
+        logger.debug("not sampled %s", i)
+
+    sampled = [r.getMessage() for r in records if r.msg == "sampled %s"]
+    assert sampled == ["sampled 0", "sampled 4", "sampled 8"]
+    assert sum(r.msg == "not sampled %s" for r in records) == 10
+    assert records[0].fields == {"sampled": 4}
+
+
+def test_structured_formatter_renders_fields():
+    logger, records = _logger("test_log.format")
+    logger.warning("Signature processed", taskIndex=3, extra={"operatorId": "0xab"})
+    logging.getLogger("test_log.format").warning("plain", extra={"taskIndex": 4})
+
+    text = StructuredFormatter().format(records[0])
+    assert text.endswith("Signature processed taskIndex=3 operatorId=0xab")
+    assert StructuredFormatter().format(records[1]).endswith("plain taskIndex=4")
+
+    entry = json.loads(StructuredFormatter(as_json=True).format(records[0]))
+    assert entry["message"] == "Signature processed"
+    assert (entry["level"], entry["taskIndex"], entry["operatorId"]) == (
+        "WARNING",
+        3,
+        "0xab",
+    )
@@ -0,0 +1,27 @@
+from types import SimpleNamespace
+
+from core.log_fetcher import LogFetcher
+
+
+class FakeEth:
+    """Serves one log per block and rejects ranges wider than ``max_range``."""
+
+    def __init__(self, max_range):
+        self.max_range = max_range
+
+    def get_logs(self, params):
+        start, end = params["fromBlock"], params["toBlock"]
+        if end - start + 1 > self.max_range:
+            raise ValueError("query returned more than 10000 results")
+        return [
+            {"blockNumber": block, "logIndex": 0} for block in range(start, end + 1)
+        ]
+
+
+def test_log_fetcher_splits_rejected_ranges_and_keeps_order():
+    web3 = SimpleNamespace(eth=FakeEth(max_range=70))
+    fetcher = LogFetcher(web3, "0x" + "11" * 20, [b"\x01" * 32], chunk_size=200)
+
+    logs = fetcher.fetch(10, 1009)
+
+    assert [log["blockNumber"] for log in logs] == list(range(10, 1010))
@@ -0,0 +1,29 @@
+from core.merkle import (
+    merkle_layers,
+    merkle_proof,
+    merkle_root,
+    task_response_leaf,
+    verify_merkle_proof,
+)
+
+
+def test_single_response_root_is_the_single_task_message():
+    leaf = task_response_leaf(7, 49)
+    assert merkle_root([leaf]) == leaf
+
+
+def test_every_leaf_has_a_valid_proof():
+    for size in range(1, 10):
+        leaves = [task_response_leaf(i, i**2) for i in range(size)]
+        layers = merkle_layers(leaves)
+        root = layers[-1][0]
+        for i, leaf in enumerate(leaves):
+            assert verify_merkle_proof(merkle_proof(layers, i), root, leaf)
+
+
+def test_proof_rejects_a_different_response():
+    leaves = [task_response_leaf(i, i**2) for i in range(5)]
+    layers = merkle_layers(leaves)
+    assert not verify_merkle_proof(
+        merkle_proof(layers, 2), layers[-1][0], task_response_leaf(2, 5)
+    )
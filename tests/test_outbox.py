@@ -0,0 +1,34 @@
+from core.outbox import Outbox
+
+
+def test_outbox_keeps_undelivered_responses_across_reopen(tmp_path):
+    path = str(tmp_path / "operator.outbox.db")
+    outbox = Outbox(path)
+    outbox.record(1, 100, {"task_index": 1, "number_squared": 1})
+    outbox.record(2, 101, {"task_index": 2, "number_squared": 4})
+    outbox.mark_delivered(1)
+    outbox.close()
+
+    outbox = Outbox(path)
+    assert outbox.pending() == [(2, 101, {"task_index": 2, "number_squared": 4})]
+
+
+def test_outbox_prune_drops_expired_tasks(tmp_path):
+    outbox = Outbox(str(tmp_path / "operator.outbox.db"))
+    outbox.record(1, 100, {"task_index": 1})
+    outbox.record(2, 150, {"task_index": 2})
+
+    assert outbox.prune(120) == 1
+    assert [index for index, _, _ in outbox.pending()] == [2]
+
+
+def test_outbox_contains_every_task_of_a_batch(tmp_path):
+    outbox = Outbox(str(tmp_path / "operator.outbox.db"))
+    outbox.record(3, 100, {"batch_root": "0x01"}, [3, 4, 5])
+
+    assert all(outbox.contains(i) for i in (3, 4, 5))
+    assert not outbox.contains(6)
+    assert [index for index, _, _ in outbox.pending()] == [3]
+
+    outbox.prune(101)
+    assert not any(outbox.contains(i) for i in (3, 4, 5))
@@ -0,0 +1,59 @@
+import threading
+import time
+
+from core.pipeline import Pipeline, Stage
+
+
+def test_pipeline_runs_stages_in_order_per_item():
+    results = []
+    lock = threading.Lock()
+
+    def collect(item):
+        with lock:
+            results.append(item)
+
+    pipeline = Pipeline(
+        [
+            Stage("double", lambda x: x * 2, workers=2, queue_size=4),
+            Stage("increment", lambda x: x + 1, workers=3, queue_size=4),
+            Stage("collect", collect, workers=1, queue_size=4),
+        ]
+    )
+    pipeline.start()
+    for i in range(20):
+        pipeline.submit(i)
+    pipeline.stop()
+
+    assert sorted(results) == [i * 2 + 1 for i in range(20)]
+
+
+def test_pipeline_processes_items_concurrently():
+    def slow(item):
+        time.sleep(0.2)
+        return item
+
+    pipeline = Pipeline([Stage("slow", slow, workers=10, queue_size=10)])
+    pipeline.start()
+    start = time.monotonic()
+    for i in range(10):
+        pipeline.submit(i)
+    pipeline.stop()
+
+    assert time.monotonic() - start < 1
+
+
+def test_stage_survives_handler_errors():
+    results = []
+
+    def flaky(item):
+        if item == 1:
+            raise ValueError("boom")
+        return item
+
+    pipeline = Pipeline([Stage("flaky", flaky), Stage("collect", results.append)])
+    pipeline.start()
+    for i in range(3):
+        pipeline.submit(i)
+    pipeline.stop()
+
+    assert results == [0, 2]
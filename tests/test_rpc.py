@@ -0,0 +1,163 @@
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+from core.rpc import AsyncMultiplexedHTTPProvider, MultiplexedHTTPProvider
+
+
+class FakeSession:
+    """Answers eth_blockNumber with ``block`` after ``delay`` seconds."""
+
+    def __init__(self, block=16, delay=0.0, fail=False):
+        self.block = block
+        self.delay = delay
+        self.fail = fail
+        self.bodies = []
+
+    def post(self, uri, data, headers, timeout):
+        self.bodies.append(json.loads(data))
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("connection refused")
+        calls = self.bodies[-1]
+        answers = [
+            {"jsonrpc": "2.0", "id": call["id"], "result": hex(self.block)}
+            for call in (calls if isinstance(calls, list) else [calls])
+        ]
+        content = json.dumps(answers if isinstance(calls, list) else answers[0])
+        return SimpleNamespace(content=content.encode(), raise_for_status=lambda: None)
+
+
+def make_provider(sessions, **kwargs):
+    provider = MultiplexedHTTPProvider(
+        [f"http://node-{i}" for i in range(len(sessions))],
+        health_check_interval=0,
+        **kwargs,
+    )
+    for endpoint, session in zip(provider.endpoints, sessions):
+        endpoint.session = session
+    return provider
+
+
+def call_concurrently(provider, calls):
+    results = [None] * len(calls)
+
+    def call(i, method, params):
+        results[i] = provider.make_request(method, params)
+
+    threads = [threading.Thread(target=call, args=(i, *c)) for i, c in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_identical_reads_share_one_request():
+    session = FakeSession(delay=0.2)
+    provider = make_provider([session])
+
+    results = call_concurrently(provider, [("eth_blockNumber", [])] * 5)
+
+    assert [r["result"] for r in results] == ["0x10"] * 5
+    assert len(session.bodies) == 1
+
+
+def test_reads_within_the_batch_window_are_batched():
+    session = FakeSession()
+    provider = make_provider([session], batch_window=0.2)
+
+    results = call_concurrently(
+        provider,
+        [("eth_getBalance", [f"0x{i:040x}", "latest"]) for i in range(3)],
+    )
+
+    assert len(results) == 3
+    assert len(session.bodies) == 1
+    assert len(session.bodies[0]) == 3
+
+
+def test_failed_endpoint_fails_over_and_is_skipped():
+    down, up = FakeSession(fail=True), FakeSession()
+    provider = make_provider([down, up])
+
+    assert provider.make_request("eth_chainId", [])["result"] == "0x10"
+    assert provider.make_request("eth_chainId", [])["result"] == "0x10"
+    assert len(down.bodies) == 1
+    assert len(up.bodies) == 2
+
+
+def test_slow_reads_are_hedged_to_another_endpoint():
+    slow, fast = FakeSession(block=1, delay=1.0), FakeSession(block=2)
+    provider = make_provider([slow, fast], hedge_after=0.05)
+    provider.endpoints[1].latency = 1.0
+
+    assert provider.make_request("eth_blockNumber", [])["result"] == "0x2"
+    assert len(slow.bodies) == 1
+
+
+class FakeAsyncProvider:
+    """Async counterpart of ``FakeSession``."""
+
+    def __init__(self, block=16, delay=0.0, fail=False):
+        self.block = block
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+
+    async def make_request(self, method, params):
+        self.calls.append(method)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("connection refused")
+        return {"jsonrpc": "2.0", "id": 0, "result": hex(self.block)}
+
+
+def make_async_provider(fakes, **kwargs):
+    provider = AsyncMultiplexedHTTPProvider(
+        [f"http://node-{i}" for i in range(len(fakes))],
+        health_check_interval=0,
+        **kwargs,
+    )
+    for endpoint, fake in zip(provider.endpoints, fakes):
+        endpoint.provider = fake
+    return provider
+
+
+def test_async_failed_endpoint_fails_over_and_is_skipped():
+    down, up = FakeAsyncProvider(fail=True), FakeAsyncProvider()
+    provider = make_async_provider([down, up])
+
+    async def run():
+        first = await provider.make_request("eth_chainId", [])
+        second = await provider.make_request("eth_chainId", [])
+        return first["result"], second["result"]
+
+    assert asyncio.run(run()) == ("0x10", "0x10")
+    assert len(down.calls) == 1
+    assert len(up.calls) == 2
+
+
+def test_async_slow_reads_are_hedged_to_another_endpoint():
+    slow, fast = FakeAsyncProvider(block=1, delay=1.0), FakeAsyncProvider(block=2)
+    provider = make_async_provider([slow, fast], hedge_after=0.05)
+    provider.endpoints[1].latency = 1.0
+
+    started = time.monotonic()
+    response = asyncio.run(provider.make_request("eth_blockNumber", []))
+
+    assert response["result"] == "0x2"
+    assert time.monotonic() - started < 0.5
+    assert slow.calls == ["eth_blockNumber"]
+    assert provider.endpoints[0].in_flight == 0
+
+
+def test_async_health_check_skips_lagging_endpoints():
+    behind, ahead = FakeAsyncProvider(block=10), FakeAsyncProvider(block=100)
+    provider = make_async_provider([behind, ahead], max_block_lag=5)
+
+    asyncio.run(provider.check_health())
+
+    assert [e.healthy for e in provider.endpoints] == [False, True]
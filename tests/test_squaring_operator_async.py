@@ -0,0 +1,98 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from core.checkpoint import PendingBlocks
+from squaring_operator_async import AsyncSquaringOperator
+
+
+async def returning(value):
+    return value
+
+
+class FakeAsyncEth:
+    @property
+    def block_number(self):
+        return returning(100)
+
+    async def get_block(self, block_identifier):
+        return {"number": 100, "hash": b"\x01" * 32}
+
+    async def get_logs(self, params):
+        return []
+
+
+def make_async_operator(**attrs):
+    operator = AsyncSquaringOperator.__new__(AsyncSquaringOperator)
+    operator.config = {"max_in_flight_tasks": "2"}
+    operator.log_sample_every = 1
+    operator.task_manager = SimpleNamespace(address="0x" + "11" * 20)
+    operator.async_web3 = SimpleNamespace(eth=FakeAsyncEth())
+    operator.async_task_manager = SimpleNamespace(
+        functions=SimpleNamespace(
+            getTaskResponseWindowBlock=lambda: SimpleNamespace(
+                call=lambda: returning(30)
+            )
+        )
+    )
+    operator.executor = ThreadPoolExecutor(max_workers=1)
+    operator.tracer = SimpleNamespace(close=lambda: None)
+    operator.pending_blocks = PendingBlocks()
+    operator.outbox = None
+    operator._head_block = None
+    operator._stop_flag = False
+    for name, value in attrs.items():
+        setattr(operator, name, value)
+    return operator
+
+
+def task_event(task_index, block_number=90):
+    return SimpleNamespace(task_index=task_index, block_number=block_number)
+
+
+def test_stopping_drains_the_queued_tasks():
+    handled = []
+
+    async def handle_task(event, session):
+        await asyncio.sleep(0.01)
+        handled.append(event.task_index)
+
+    operator = make_async_operator(
+        missed_task_events=lambda to_block: [task_event(i) for i in range(5)],
+        _handle_task=handle_task,
+        _stop_flag=True,
+    )
+
+    asyncio.run(operator.run())
+
+    assert sorted(handled) == [0, 1, 2, 3, 4]
+    assert operator.task_response_window_block == 30
+    assert operator.executor._shutdown
+
+
+def test_worker_survives_failed_tasks_and_routes_batches():
+    handled = []
+
+    async def handle_task(event, session):
+        if event.task_index == 0:
+            raise ValueError("signing failed")
+        handled.append(event.task_index)
+
+    async def handle_task_batch(events, session):
+        handled.append([event.task_index for event in events])
+
+    operator = make_async_operator(
+        _handle_task=handle_task, _handle_task_batch=handle_task_batch
+    )
+
+    async def run():
+        queue = asyncio.Queue()
+        for item in [task_event(0), [task_event(1), task_event(2)], task_event(3)]:
+            queue.put_nowait(item)
+        worker = asyncio.create_task(operator._task_worker(queue, None))
+        await asyncio.wait_for(queue.join(), 1)
+        worker.cancel()
+
+    asyncio.run(run())
+
+    assert handled == [[1, 2], 3]
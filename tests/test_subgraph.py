@@ -0,0 +1,73 @@
+from core.subgraph import SubgraphClient, shard_bounds
+
+OPERATORS = [
+    {"id": f"0x{i:040x}", "operatorId": f"0x{i:064x}", "stake": str(i)}
+    for i in range(0, 2**160, 2**160 // 37)
+]
+
+
+class FakeSubgraph(SubgraphClient):
+    """Answers operator queries from a list, like graph-node would."""
+
+    def __init__(self, rows, **kwargs):
+        super().__init__("http://subgraph", **kwargs)
+        self.rows = rows
+        self.queries = []
+
+    def query(self, query, variables=None):
+        self.queries.append((query, variables))
+        where = variables["where"]
+        rows = sorted(self.rows, key=lambda row: row["id"])
+        for key, value in where.items():
+            field, _, op = key.rpartition("_")
+            rows = [
+                row
+                for row in rows
+                if {
+                    "gt": lambda v: row[field] > v,
+                    "gte": lambda v: row[field] >= v,
+                    "lt": lambda v: row[field] < v,
+                    "in": lambda v: row[field] in v,
+                }[op](value)
+            ]
+        fields = query.split("{ ")[-1].split(" }")[0].split()
+        page = rows[: variables["first"]]
+        return {"operators": [{f: row[f] for f in fields} for row in page]}
+
+
+def test_shard_bounds_cover_the_id_space():
+    assert shard_bounds(1) == [(None, None)]
+    assert shard_bounds(4) == [
+        (None, "0x40"),
+        ("0x40", "0x80"),
+        ("0x80", "0xc0"),
+        ("0xc0", None),
+    ]
+
+
+def test_fetch_all_pages_past_the_page_size():
+    subgraph = FakeSubgraph(OPERATORS, page_size=4, shards=3)
+    rows = subgraph.fetch_all("operators", "Operator", ["stake"], block=12)
+    subgraph.close()
+
+    assert [row["id"] for row in rows] == [row["id"] for row in OPERATORS]
+    assert set(rows[0]) == {"id", "stake"}
+    assert len(subgraph.queries) > 37 // 4
+    query, variables = subgraph.queries[0]
+    assert "$block: Block_height" in query and "$where: Operator_filter" in query
+    assert variables["block"] == {"number": 12}
+
+
+def test_fetch_all_filters_and_projects():
+    wanted = [OPERATORS[3]["id"], OPERATORS[30]["id"]]
+    subgraph = FakeSubgraph(OPERATORS, page_size=1, shards=2)
+    rows = subgraph.fetch_all(
+        "operators", "Operator", ["id", "operatorId"], where={"id_in": wanted}
+    )
+    subgraph.close()
+
+    assert rows == [
+        {"id": OPERATORS[3]["id"], "operatorId": OPERATORS[3]["operatorId"]},
+        {"id": OPERATORS[30]["id"], "operatorId": OPERATORS[30]["operatorId"]},
+    ]
+    assert "block" not in subgraph.queries[0][0]
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from core.task_source import (
+    FileSource,
+    InFlightLimiter,
+    QueueSource,
+    RateSource,
+    SequenceSource,
+    load_task_source,
+)
+
+
+def test_rate_source_shapes():
+    burst = RateSource(rate=100, shape="burst", burst_size=5)
+    started = time.monotonic()
+    assert [burst.next() for _ in range(5)] == [0, 1, 2, 3, 4]
+    assert time.monotonic() - started < 0.04
+    assert burst.next(timeout=0.01) is None
+    assert burst.next() == 5
+    assert time.monotonic() - started >= 0.05
+
+    constant = RateSource(rate=200)
+    started = time.monotonic()
+    assert [constant.next() for _ in range(5)] == [0, 1, 2, 3, 4]
+    assert time.monotonic() - started >= 0.02
+
+    sequence = SequenceSource(interval=60, start=7)
+    assert sequence.next() == 7
+    assert sequence.next(timeout=0) is None
+
+    with pytest.raises(ValueError):
+        RateSource(rate=1, shape="sawtooth")
+
+
+def test_file_source_follows_appended_tasks(tmp_path):
+    path = tmp_path / "tasks.txt"
+    source = FileSource(str(path), poll_interval=0.01)
+    assert source.next(timeout=0.02) is None
+
+    path.write_bytes(b"3\nnot a number\n\n4\n5")
+    assert [source.next(timeout=0.1), source.next(timeout=0.1)] == [3, 4]
+    # the last line is only read once it is complete
+    assert source.next(timeout=0.02) is None
+    with open(path, "ab") as f:
+        f.write(b"0\n6\n")
+    assert [source.next(timeout=0.1), source.next(timeout=0.1)] == [50, 6]
+
+
+def test_load_task_source():
+    assert isinstance(load_task_source({}), SequenceSource)
+    source = load_task_source({"task_source": "endpoint", "task_queue_size": "1"})
+    source.put(9)
+    assert source.next(timeout=0) == 9 and source.next(timeout=0) is None
+    assert isinstance(source, QueueSource)
+    with pytest.raises(ValueError):
+        load_task_source({"task_source": "kafka"})
+
+
+def test_in_flight_limiter_aimd():
+    limiter = InFlightLimiter(initial=2, minimum=1, maximum=3)
+    assert limiter.acquire(timeout=0) and limiter.acquire(timeout=0)
+    assert not limiter.acquire(timeout=0)
+
+    limiter.started(1, deadline=100)
+    limiter.cancel()
+    assert limiter.in_flight == 1
+    assert limiter.acquire(timeout=0)
+    limiter.started(2, deadline=110)
+
+    # additive increase on every task reaching threshold
+    limiter.completed(1)
+    assert limiter.limit == pytest.approx(2.5)
+    limiter.completed(1)
+    assert limiter.limit == pytest.approx(2.5)
+
+    # multiplicative decrease when tasks expire
+    assert limiter.expire(105) == 0
+    assert limiter.expire(110) == 1
+    assert limiter.limit == pytest.approx(1.25)
+    assert limiter.in_flight == 0
+    assert limiter.acquire(timeout=0) and not limiter.acquire(timeout=0)
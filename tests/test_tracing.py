@@ -0,0 +1,81 @@
+import pytest
+
+from core.tracing import Tracer, hop_percentiles, load_spans, task_timelines
+
+
+def test_tracer_writes_spans(tmp_path):
+    path = tmp_path / "traces" / "operator.jsonl"
+    tracer = Tracer(str(path), "operator")
+    with tracer.span("sign_task_response", 3) as span:
+        span["status"] = 200
+    with pytest.raises(ValueError):
+        with tracer.span("deliver", [3, 4]):
+            raise ValueError()
+    tracer.record("create_task", 5, 10.0, 12.5)
+    tracer.close()
+    tracer.record("create_task", 6, 10.0, 12.5)
+    with open(path, "a") as f:
+        f.write('{"service": "operator", "span"')
+
+    spans = load_spans([str(path)])
+    assert [span["span"] for span in spans] == [
+        "sign_task_response",
+        "deliver",
+        "create_task",
+    ]
+    assert spans[0]["tasks"] == [3] and spans[0]["status"] == 200
+    assert spans[0]["start"] <= spans[0]["end"]
+    assert spans[1]["tasks"] == [3, 4] and spans[1]["error"] == "ValueError"
+
+    disabled = Tracer(None, "operator")
+    with disabled.span("deliver", 1) as span:
+        span["status"] = 200
+    assert not disabled.enabled
+
+
+def _span(service, name, tasks, start, end):
+    return {
+        "service": service,
+        "span": name,
+        "tasks": tasks,
+        "start": start,
+        "end": end,
+    }
+
+
+def test_task_timelines_follow_the_critical_path():
+    spans = [
+        _span("aggregator", "create_task", [1, 2], 0.0, 2.0),
+        _span("operator", "sign_task_response", [1], 2.5, 2.6),
+        # the slower operator holds the task back
+        _span("operator", "sign_task_response", [1], 2.5, 3.0),
+        _span("operator", "deliver", [1], 6.0, 6.5),
+        _span("aggregator", "submit_response", [1], 7.0, 9.0),
+        _span("challenger", "call_challenge_module", [1], 10.0, 10.1),
+        _span("operator", "sign_task_response", [2], 3.0, 3.1),
+    ]
+    timelines = task_timelines(spans)
+
+    hops = timelines[1]["hops"]
+    assert [hop["hop"] for hop in hops] == [
+        "aggregator.create_task",
+        "operator.sign_task_response",
+        "operator.deliver",
+        "aggregator.submit_response",
+        "challenger.call_challenge_module",
+    ]
+    assert hops[1]["duration"] == pytest.approx(0.5)
+    assert hops[2]["wait"] == pytest.approx(3.0)
+    assert hops[4]["offset"] == pytest.approx(10.0)
+    assert timelines[1]["total"] == pytest.approx(10.1)
+    assert timelines[2]["total"] == pytest.approx(3.1)
+
+    percentiles = hop_percentiles(timelines)
+    assert percentiles["operator.sign_task_response"]["count"] == 2
+    assert percentiles["operator.sign_task_response"]["duration_p50"] == (
+        pytest.approx(0.1)
+    )
+    assert percentiles["operator.sign_task_response"]["duration_p99"] == (
+        pytest.approx(0.5)
+    )
+    assert percentiles["total"]["duration_p90"] == pytest.approx(10.1)
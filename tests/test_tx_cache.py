@@ -0,0 +1,15 @@
+from core.tx_cache import TransactionCache
+
+
+def test_tx_cache_persists_entries(tmp_path):
+    path = str(tmp_path / "challenger.tx-cache.db")
+    cache = TransactionCache(path)
+    cache.put_many({"0x01": [{"X": 1, "Y": 2}], "0x02": []})
+    cache.close()
+
+    cache = TransactionCache(path)
+    assert cache.get_many(["0x01", "0x02", "0x03"]) == {
+        "0x01": [{"X": 1, "Y": 2}],
+        "0x02": [],
+    }
+    assert cache.get_many([]) == {}
@@ -0,0 +1,55 @@
+import threading
+from types import SimpleNamespace
+
+from web3.exceptions import TransactionNotFound
+
+from core.tx_submitter import TransactionSubmitter
+
+
+class FakeEth:
+    chain_id = 31337
+
+    def __init__(self):
+        self.sent = []
+        self.mined = set()
+        self.account = SimpleNamespace(
+            sign_transaction=lambda tx, private_key: SimpleNamespace(raw_transaction=tx)
+        )
+
+    def get_transaction_count(self, address, block_identifier):
+        return 7
+
+    def send_raw_transaction(self, tx):
+        self.sent.append(tx)
+        return bytes([tx["nonce"]])
+
+    def get_transaction_receipt(self, tx_hash):
+        if tx_hash not in self.mined:
+            raise TransactionNotFound("pending")
+        return {"transactionHash": tx_hash, "status": 1}
+
+
+def test_submitter_assigns_local_nonces_and_reports_receipts():
+    eth = FakeEth()
+    web3 = SimpleNamespace(eth=eth, to_wei=lambda value, unit: int(value))
+    contract_function = SimpleNamespace(build_transaction=lambda tx: tx)
+    submitter = TransactionSubmitter(web3, "0xchallenger", "0xkey", poll_interval=0.01)
+
+    receipts = []
+    done = threading.Event()
+
+    def on_receipt(receipt):
+        receipts.append(receipt)
+        done.set()
+
+    first = submitter.submit(contract_function, gas=100, on_receipt=on_receipt)
+    second = submitter.submit(contract_function, gas=100)
+    assert [tx["nonce"] for tx in eth.sent] == [7, 8]
+    assert submitter.pending() == 2
+
+    submitter.start()
+    eth.mined.add(first)
+    assert done.wait(1)
+    submitter.stop()
+    assert receipts == [{"transactionHash": first, "status": 1}]
+    assert submitter.pending() == 1 and second not in eth.mined
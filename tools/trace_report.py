@@ -0,0 +1,79 @@
+"""Merge the trace files of the services into per-task timelines.
+
+Run from the repository root:
+
+    python -m tools.trace_report data/traces/*.jsonl [--task N] [--slowest K]
+
+Prints the latency percentiles of every hop of the task lifecycle, then the
+critical path of the slowest tasks (or of the given one).
+"""
+
+import argparse
+
+from core.tracing import hop_percentiles, load_spans, task_timelines
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:10.1f}"
+
+
+def _print_percentiles(percentiles):
+    print(
+        f"{'hop':<36} {'count':>6} {'wait p50':>10} {'wait p90':>10} "
+        f"{'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10}"
+    )
+    ordered = sorted(
+        percentiles.items(), key=lambda item: (item[0] == "total", -item[1]["count"])
+    )
+    for hop, stats in ordered:
+        waits = (
+            _ms(stats["wait_p50"]) + " " + _ms(stats["wait_p90"])
+            if "wait_p50" in stats
+            else f"{'':>10} {'':>10}"
+        )
+        print(
+            f"{hop:<36} {stats['count']:>6} {waits} {_ms(stats['duration_p50'])} "
+            f"{_ms(stats['duration_p90'])} {_ms(stats['duration_p99'])}"
+        )
+
+
+def _print_timeline(task_index, timeline):
+    print(f"\ntask {task_index}: {timeline['total'] * 1000:.1f} ms")
+    print(f"  {'hop':<36} {'offset ms':>10} {'wait ms':>10} {'took ms':>10}")
+    for hop in timeline["hops"]:
+        error = f"  {hop['error']}" if hop["error"] else ""
+        print(
+            f"  {hop['hop']:<36} {_ms(hop['offset'])} {_ms(hop['wait'])} "
+            f"{_ms(hop['duration'])}{error}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="trace files of the services")
+    parser.add_argument("--task", type=int, help="show the timeline of this task")
+    parser.add_argument(
+        "--slowest", type=int, default=5, help="show the timelines of the K slowest"
+    )
+    args = parser.parse_args()
+
+    timelines = task_timelines(load_spans(args.paths))
+    if not timelines:
+        print("No spans found")
+        return
+    print(f"{len(timelines)} tasks\n")
+    _print_percentiles(hop_percentiles(timelines))
+
+    if args.task is not None:
+        if args.task not in timelines:
+            print(f"\nNo spans for task {args.task}")
+            return
+        _print_timeline(args.task, timelines[args.task])
+        return
+    slowest = sorted(timelines.items(), key=lambda item: -item[1]["total"])
+    for task_index, timeline in slowest[: args.slowest]:
+        _print_timeline(task_index, timeline)
+
+
+if __name__ == "__main__":
+    main()